@@ -1,6 +1,23 @@
-workers = 2
+import os
+
+from gunicorn.arbiter import Arbiter
+
+# Threads only accept requests; the number of concurrent evaluations is limited by the
+# max_concurrency argument of NsJail, so that queued jobs can be prioritised. Gunicorn hands
+# requests to its threads in the order they arrive, so there are far more threads than slots:
+# waiting requests should be parked in the scheduler, where priority and fairness apply.
+workers = 1
+worker_class = "gthread"
+threads = max(64, 32 * len(os.sched_getaffinity(0)))
 bind = "0.0.0.0:8060"
 logger_class = "snekbox.logging.GunicornLogger"
 access_logformat = "%(m)s %(U)s%(q)s %(s)s %(b)s %(L)ss"
 access_logfile = "-"
-wsgi_app = "snekbox:SnekAPI()"
+wsgi_app = "snekbox:SnekAPI(max_concurrency='auto', pycache_path='/pycache', warmup=True)"
+
+
+def on_starting(server: Arbiter) -> None:
+    """Initialise the host once in the master, so that the workers it forks inherit it."""
+    from snekbox import host
+
+    host.preload()
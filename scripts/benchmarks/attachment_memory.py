@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Compare peak memory of building an /eval response up front and streaming it."""
+import json
+import logging
+import tracemalloc
+from argparse import ArgumentParser, Namespace
+from collections.abc import Callable
+
+from snekbox.api.resources.eval import _ResultStream
+from snekbox.result import EvalResult
+from snekbox.snekio import MemFS
+from snekbox.snekio.filesystem import Size
+
+
+def parse_args() -> Namespace:
+    """Parse the command line arguments."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("-s", "--size", type=int, default=40, help="total file size in MiB")
+    parser.add_argument("-f", "--files", type=int, default=4, help="number of files")
+    parser.add_argument("-o", "--stdout", type=float, default=1, help="stdout size in MiB")
+    parser.add_argument("--root", default="/memfs", help="directory to mount the tmpfs in")
+    return parser.parse_args()
+
+
+def read(memfs: MemFS, stdout: str) -> int:
+    """Read and encode the files and serialise the body in one go, like before."""
+    files = memfs.files_list(limit=None, pattern="**/*", preload_dict=True)
+    body = {"stdout": stdout, "returncode": 0, "files": [f.as_dict for f in files]}
+    return len(json.dumps(body).encode())
+
+
+def mapped(memfs: MemFS, stdout: str) -> int:
+    """Map the files and stream the body, escaping the stdout a chunk at a time."""
+    files = memfs.files_list(limit=None, pattern="**/*", mapped=True)
+    stream = _ResultStream(EvalResult([], 0, stdout, files=files))
+    try:
+        return sum(len(chunk) for chunk in stream)
+    finally:
+        stream.close()
+
+
+def measure(name: str, func: Callable[[MemFS, str], int], memfs: MemFS, stdout: str) -> None:
+    """Print the peak memory allocated while running `func`, excluding the stdout itself."""
+    tracemalloc.start()
+    try:
+        length = func(memfs, stdout)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    print(f"{name:<8} body {length / Size.MiB:6.1f} MiB  peak {peak / Size.MiB:7.2f} MiB")
+
+
+def main() -> None:
+    """Write the files to a tmpfs and measure both methods."""
+    args = parse_args()
+    logging.getLogger("snekbox").setLevel(logging.WARNING)
+    with MemFS(2 * args.size * Size.MiB, args.root) as memfs:
+        for i in range(args.files):
+            (memfs.output / f"file{i}.bin").write_bytes(b"x" * (args.size * Size.MiB // args.files))
+
+        # Quotes and newlines are escaped, so the JSON of the stdout is larger than the stdout.
+        stdout = 'print("x")\n' * int(args.stdout * Size.MiB // 11)
+        measure("read", read, memfs, stdout)
+        measure("mapped", mapped, memfs, stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Compare finding attachments with glob and with the scandir walker on trees of many files."""
+import glob
+import time
+from argparse import ArgumentParser, Namespace
+from collections.abc import Callable
+from pathlib import Path
+
+from snekbox.snekio import GlobMatcher, MemFS
+from snekbox.snekio.filesystem import Size
+from snekbox.snekio.walk import walk_files
+
+PATTERN = "**/[!_]*"
+
+
+def parse_args() -> Namespace:
+    """Parse the command line arguments."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--files", type=int, default=100_000, help="files in each tree")
+    parser.add_argument("-l", "--limit", type=int, default=100, help="attachment limit")
+    parser.add_argument("--root", default="/memfs", help="directory to mount the trees in")
+    return parser.parse_args()
+
+
+def make_tree(root: Path, files: int, fanout: int) -> None:
+    """Create `files` empty files spread over directories with `fanout` entries each."""
+    for i in range(files):
+        parts = []
+        n = i // fanout
+        while n:
+            n, part = divmod(n - 1, fanout)
+            parts.append(f"d{part}")
+        directory = root.joinpath(*reversed(parts))
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"f{i}.txt").touch()
+
+
+def glob_files(root: Path, limit: int | None) -> int:
+    """Select files like MemFS.files did before the walker, without reading them."""
+    count = 0
+    for file in (Path(root, f) for f in glob.iglob(PATTERN, root_dir=root, recursive=True)):
+        if not file.is_file():
+            continue
+        file.stat(follow_symlinks=True)
+        count += 1
+        if limit is not None and count >= limit:
+            break
+    return count
+
+
+def walk(root: Path, limit: int | None) -> int:
+    """Select files with the walker, without reading them."""
+    count = 0
+    for entry, _ in walk_files(root, GlobMatcher(PATTERN)):
+        entry.stat(follow_symlinks=True)
+        count += 1
+        if limit is not None and count >= limit:
+            break
+    return count
+
+
+def timed(func: Callable[[Path, int | None], int], root: Path, limit: int | None) -> str:
+    """Run `func` and return a description of the time it took."""
+    start = time.perf_counter()
+    try:
+        count = func(root, limit)
+    except RecursionError:
+        return "RecursionError"
+    return f"{(time.perf_counter() - start) * 1000:9.1f}ms ({count} files)"
+
+
+def main() -> None:
+    """Create flat, bushy, and deep trees and time both methods on each."""
+    args = parse_args()
+    # Paths in the deep tree must stay within PATH_MAX.
+    trees = {"flat": (args.files, args.files), "bushy": (args.files, 30), "deep": (1000, 1)}
+
+    for name, (files, fanout) in trees.items():
+        # Unmounting is much faster than deleting each file, and isn't limited by recursion.
+        with MemFS(Size.GiB, args.root) as memfs:
+            root = memfs.output
+            make_tree(root, files, fanout)
+
+            for limit in (None, args.limit):
+                label = f"{name} ({files} files, limit {limit})"
+                print(f"{label:<40} glob {timed(glob_files, root, limit)}")
+                print(f"{'':<40} walk {timed(walk, root, limit)}")
+
+
+if __name__ == "__main__":
+    main()
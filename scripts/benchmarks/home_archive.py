@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Compare writing a project's files one at a time with extracting them from an archive."""
+import io
+import statistics
+import tarfile
+import time
+import zipfile
+from argparse import ArgumentParser, Namespace
+from base64 import b64decode, b64encode
+from collections.abc import Callable
+from pathlib import Path
+
+from snekbox.snekio import ArchiveFormat, FileAttachment, HomeArchive, MemFS
+from snekbox.snekio.filesystem import Size
+
+
+def parse_args() -> Namespace:
+    """Parse the command line arguments."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--runs", type=int, default=50, help="projects to write")
+    parser.add_argument("-f", "--files", type=int, default=500, help="files in the project")
+    parser.add_argument("-d", "--dirs", type=int, default=25, help="packages in the project")
+    parser.add_argument("-b", "--file-size", type=int, default=512, help="bytes in each file")
+    parser.add_argument("--root", default="/memfs", help="directory to mount instances in")
+    return parser.parse_args()
+
+
+def make_project(args: Namespace) -> dict[str, bytes]:
+    """Return the paths and contents of a project spread over nested packages."""
+    return {
+        f"pkg{i % args.dirs}/sub{i % 3}/mod{i}.py": b"x" * args.file_size for i in range(args.files)
+    }
+
+
+def write_files(home: Path, body: list[dict[str, str]]) -> None:
+    """Parse and write each file in a request body, as `NsJail._write_files` does."""
+    for data in body:
+        f_path = FileAttachment.from_dict(data).save_to(home)
+        f_path.chmod(0o777)
+        f_path.stat()
+
+
+def extract_archive(home: Path, content: str, archive_format: ArchiveFormat) -> None:
+    """Decode, validate, and extract an archive, as `/eval` does for `home_archive`."""
+    archive = HomeArchive(io.BytesIO(b64decode(content)), archive_format)
+    try:
+        archive.extract_to(home)
+    finally:
+        archive.close()
+
+
+def run(name: str, write: Callable[[Path], None], args: Namespace) -> float:
+    """Time `args.runs` calls of `write` on an empty home directory and return the mean."""
+    timings = []
+    for _ in range(args.runs):
+        with MemFS(64 * Size.MiB, args.root) as memfs:
+            start = time.perf_counter()
+            write(memfs.home)
+            timings.append(time.perf_counter() - start)
+
+    mean = statistics.mean(timings)
+    print(f"{name:<8} mean {mean * 1e3:7.2f}ms  min {min(timings) * 1e3:7.2f}ms")
+    return mean
+
+
+def main() -> None:
+    """Run the benchmark for each way of sending the files and print the speed-ups."""
+    args = parse_args()
+    project = make_project(args)
+
+    body = [{"path": p, "content": b64encode(c).decode()} for p, c in project.items()]
+    tar_buffer = io.BytesIO()
+    with tarfile.open(fileobj=tar_buffer, mode="w") as tar:
+        for path, content in project.items():
+            info = tarfile.TarInfo(path)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w") as zf:
+        for path, content in project.items():
+            zf.writestr(path, content)
+
+    tar_content = b64encode(tar_buffer.getvalue()).decode()
+    zip_content = b64encode(zip_buffer.getvalue()).decode()
+
+    print(f"{args.files} files of {args.file_size} bytes in {args.dirs * 3} directories")
+    files = run("files", lambda home: write_files(home, body), args)
+    tar = run("tar", lambda home: extract_archive(home, tar_content, ArchiveFormat.TAR), args)
+    zip_ = run("zip", lambda home: extract_archive(home, zip_content, ArchiveFormat.ZIP), args)
+    print(f"speed-up: tar {files / tar:.1f}x, zip {files / zip_:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Compare import latency with and without the import index, given many installed packages."""
+import os
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from scripts import import_index
+
+INDEX_SCRIPT = Path(import_index.__file__)
+
+
+def parse_args() -> Namespace:
+    """Parse the command line arguments."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--runs", type=int, default=20, help="runs of each case")
+    parser.add_argument("-d", "--dists", type=int, default=60, help="distributions to install")
+    parser.add_argument(
+        "-p", "--pth", type=int, default=10, help="distributions added to the path by .pth files"
+    )
+    parser.add_argument("--executable", default=sys.executable, help="interpreter to benchmark")
+    return parser.parse_args()
+
+
+def make_user_base(root: Path, args: Namespace) -> Path:
+    """Install fake distributions to a user base, as pip would, and return its site-packages."""
+    result = subprocess.run(
+        [args.executable, "-c", "import site; print(site.getusersitepackages())"],
+        env={"PYTHONUSERBASE": str(root)},
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    site_packages = Path(result.stdout.strip())
+    site_packages.mkdir(parents=True)
+
+    for i in range(args.dists):
+        if i < args.pth:
+            # Like an egg or an editable install: its own directory, added by a .pth file.
+            directory = site_packages / f"dist{i}"
+            (site_packages / f"dist{i}.pth").write_text(f"{directory}\n")
+        else:
+            directory = site_packages
+        package = directory / f"pkg{i}"
+        package.mkdir(parents=True)
+        (package / "__init__.py").write_text(f"VALUE = {i}\n")
+        (package / "util.py").write_text("pass\n")
+        info = site_packages / f"pkg{i}-1.0.dist-info"
+        info.mkdir()
+        (info / "METADATA").write_text(f"Name: pkg{i}\nVersion: 1.0\n")
+        (info / "RECORD").write_text("")
+        (info / "top_level.txt").write_text(f"pkg{i}\n")
+
+    return site_packages
+
+
+def run(code: str, env: dict[str, str], args: Namespace) -> float:
+    """Return the mean time to run `code` with the interpreter."""
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        subprocess.run([args.executable, "-c", code], env=env, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.mean(timings)
+
+
+def main() -> None:
+    """Time importing every package, and starting alone, without and with the index."""
+    args = parse_args()
+    cases = {
+        "start-up": "pass",
+        f"import {args.dists} packages": "; ".join(f"import pkg{i}" for i in range(args.dists)),
+        f"import {args.dists} submodules": "; ".join(
+            f"import pkg{i}.util" for i in range(args.dists)
+        ),
+    }
+
+    with TemporaryDirectory() as root:
+        site_packages = make_user_base(Path(root), args)
+        env = {"PYTHONUSERBASE": root}
+        # Compile the packages' bytecode up front, so that both cases read it.
+        subprocess.run([args.executable, "-m", "compileall", "-q", root], check=True)
+
+        without = {name: run(code, env, args) for name, code in cases.items()}
+        subprocess.run([args.executable, INDEX_SCRIPT], env=env, check=True)
+        check = "import sys; assert any(type(f).__name__ == 'IndexFinder' for f in sys.meta_path)"
+        subprocess.run([args.executable, "-c", check], env=env, check=True)
+        with_index = {name: run(code, env, args) for name, code in cases.items()}
+
+        print(f"{args.dists} distributions, {args.pth} on their own path entries")
+        print(f"{len(os.listdir(site_packages))} entries in the user site-packages")
+        for name in cases:
+            print(
+                f"{name:<24} without {without[name] * 1e3:7.1f}ms  "
+                f"with {with_index[name] * 1e3:7.1f}ms  "
+                f"speed-up {without[name] / with_index[name]:.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
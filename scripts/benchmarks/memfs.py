@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Compare the per-request cost of mounting a new MemFS with reusing one from a MemFSPool."""
+import statistics
+import time
+from argparse import ArgumentParser, Namespace
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+
+from snekbox.snekio import MemFS, MemFSPool
+from snekbox.snekio.filesystem import Size
+
+
+def parse_args() -> Namespace:
+    """Parse the command line arguments."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--requests", type=int, default=500, help="requests to simulate")
+    parser.add_argument("-f", "--files", type=int, default=10, help="files written per request")
+    parser.add_argument(
+        "-j", "--job-time", type=float, default=5, help="milliseconds each job holds the tmpfs"
+    )
+    parser.add_argument("-s", "--size", type=int, default=48, help="tmpfs size in MiB")
+    parser.add_argument("--root", default="/memfs", help="directory to mount instances in")
+    return parser.parse_args()
+
+
+def run(
+    name: str, acquire: Callable[[], AbstractContextManager[MemFS]], args: Namespace
+) -> list[float]:
+    """
+    Time the setup and teardown of `args.requests` filesystems obtained from `acquire`.
+
+    Between setup and teardown, files are written to each filesystem and it's held for the
+    duration of a job, like a sandbox would. That time is excluded.
+    """
+    timings = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        context = acquire()
+        memfs = context.__enter__()
+        setup = time.perf_counter() - start
+
+        for i in range(args.files):
+            (memfs.home / f"file{i}.txt").write_bytes(b"x" * 4096)
+        time.sleep(args.job_time / 1000)
+
+        start = time.perf_counter()
+        context.__exit__(None, None, None)
+        timings.append(setup + time.perf_counter() - start)
+
+    timings.sort()
+    print(
+        f"{name:<8} mean {statistics.mean(timings) * 1e6:8.1f}us"
+        f"  p50 {timings[len(timings) // 2] * 1e6:8.1f}us"
+        f"  p99 {timings[int(len(timings) * 0.99)] * 1e6:8.1f}us"
+    )
+    return timings
+
+
+def main() -> None:
+    """Run the benchmark for both strategies and print the speed-up."""
+    args = parse_args()
+    size = args.size * Size.MiB
+
+    mount = run("mount", lambda: MemFS(size, args.root), args)
+
+    pool = MemFSPool(size, args.root, size=2)
+    try:
+        pooled = run("pool", pool.acquire, args)
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    print(f"pool: {stats}")
+    print(f"speed-up: {statistics.mean(mount) / statistics.mean(pooled):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
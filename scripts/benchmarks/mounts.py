@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Time the creation of jails against the number of mounts they set up."""
+import statistics
+import subprocess
+import time
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from google.protobuf import text_format
+
+from snekbox.config_pb2 import MountPt, NsJailConfig
+from snekbox.host import read_config
+from snekbox.snekio import SandboxRoot
+
+
+def parse_args() -> Namespace:
+    """Parse the command line arguments."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--runs", type=int, default=20, help="jails to create per config")
+    parser.add_argument(
+        "-m",
+        "--mounts",
+        type=int,
+        nargs="*",
+        default=[0, 8, 16, 32, 64],
+        help="numbers of read-only bind mounts to add to the config",
+    )
+    parser.add_argument("--nsjail", default="/usr/sbin/nsjail", help="path to the NsJail binary")
+    parser.add_argument(
+        "--config", default="./config/snekbox.cfg", help="NsJail config to start from"
+    )
+    parser.add_argument(
+        "--executable", default="/usr/local/bin/python", help="interpreter to run in the jails"
+    )
+    return parser.parse_args()
+
+
+def run(args: Namespace, config_path: Path, home: str) -> float | None:
+    """Return the mean time to run an empty script in a jail, or None if it fails."""
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [
+                args.nsjail,
+                "--config",
+                str(config_path),
+                "--quiet",
+                "--bindmount",
+                f"{home}:home",  # noqa: E231
+                "--",
+                args.executable,
+                "-S",
+                "-c",
+                "pass",
+            ],
+            capture_output=True,
+        )
+        timings.append(time.perf_counter() - start)
+        if result.returncode:
+            return None
+    return statistics.mean(timings)
+
+
+def with_binds(config: NsJailConfig, count: int) -> NsJailConfig:
+    """Return a copy of `config` with `count` more read-only binds of the same directory."""
+    extended = NsJailConfig()
+    extended.CopyFrom(config)
+    for i in range(count):
+        extended.mount.append(MountPt(src="/usr/lib", dst=f"/bench/{i}", is_bind=True, rw=False))
+    return extended
+
+
+def _format(mean: float | None) -> str:
+    """Format a mean time in milliseconds."""
+    return "   failed" if mean is None else f"{mean * 1e3:7.1f}ms"
+
+
+def main() -> None:
+    """Time jails with the config plus more and more binds, then with a consolidated root."""
+    args = parse_args()
+    config = read_config(args.config)
+
+    with TemporaryDirectory() as temp, TemporaryDirectory() as home:
+        print(f"{'mounts':>7}  {'consolidated':>12}  {'mean':>9}")
+        for count in args.mounts:
+            extended = with_binds(config, count)
+            path = Path(temp, f"{count}.cfg")
+            path.write_text(text_format.MessageToString(extended), encoding="utf-8")
+            mean = run(args, path, home)
+            print(f"{len(extended.mount):>7}  {'no':>12}  " + _format(mean))
+
+            root = SandboxRoot(Path(temp, f"root-{count}"), extended, [("home", True)])
+            try:
+                mean = run(args, root.build(), home)
+            finally:
+                root.cleanup()
+            print(f"{len(root.config.mount):>7}  {'yes':>12}  " + _format(mean))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Compare spawn latency under concurrency with fresh and with pooled network namespaces."""
+import os
+import statistics
+import subprocess
+import time
+from argparse import ArgumentParser, Namespace
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from tempfile import TemporaryDirectory
+
+from snekbox.namespaces import NetnsPool, NetworkNamespace
+
+
+def parse_args() -> Namespace:
+    """Parse the command line arguments."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--runs", type=int, default=50, help="spawns per thread")
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        nargs="*",
+        default=[1, 4, 16],
+        help="numbers of threads spawning at once",
+    )
+    parser.add_argument("--nsjail", default="/usr/sbin/nsjail", help="path to the NsJail binary")
+    parser.add_argument("--config", default="./config/snekbox.cfg", help="NsJail config to use")
+    parser.add_argument(
+        "--executable", default="/usr/local/bin/python", help="interpreter to run in the jails"
+    )
+    return parser.parse_args()
+
+
+def measure(spawn: Callable[[], None], concurrency: int, runs: int) -> list[float]:
+    """Call `spawn` `runs` times from each of `concurrency` threads and return each latency."""
+
+    def worker() -> list[float]:
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            spawn()
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        futures = [executor.submit(worker) for _ in range(concurrency)]
+        return [timing for future in futures for timing in future.result()]
+
+
+def report(name: str, concurrency: int, timings: list[float]) -> None:
+    """Print the median and 99th percentile of `timings` in milliseconds."""
+    p99 = statistics.quantiles(timings, n=100)[98] if len(timings) > 1 else timings[0]
+    print(
+        f"  {name:<8} {concurrency:>4} threads  "
+        f"p50 {statistics.median(timings) * 1e3:8.2f}ms  p99 {p99 * 1e3:8.2f}ms"
+    )
+
+
+def fresh_namespace() -> None:
+    """Create a namespace and close it, as NsJail does for each jail."""
+    NetworkNamespace.create().close()
+
+
+def jail(args: Namespace, home: str, pool: NetnsPool | None) -> Callable[[], None]:
+    """Return a function which runs an empty script in a jail, in a pooled namespace if given."""
+    command = [args.nsjail, "--config", args.config, "--quiet", "--bindmount", f"{home}:home"]
+    if pool is not None:
+        command.append("--disable_clone_newnet")
+    command += ["--", args.executable, "-S", "-c", "pass"]
+
+    def spawn() -> None:
+        with pool.acquire() if pool else nullcontext() as netns:
+            with netns.entered() if netns else nullcontext():
+                process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+            process.wait()
+
+    return spawn
+
+
+def main() -> None:
+    """Time namespaces on their own, then whole jails if NsJail is installed."""
+    args = parse_args()
+
+    print("network namespaces")
+    for concurrency in args.concurrency:
+        report("fresh", concurrency, measure(fresh_namespace, concurrency, args.runs))
+        pool = NetnsPool(size=concurrency)
+        try:
+
+            def pooled() -> None:
+                with pool.acquire():
+                    pass
+
+            report("pooled", concurrency, measure(pooled, concurrency, args.runs))
+        finally:
+            pool.close()
+
+    if not os.path.exists(args.nsjail):
+        print(f"jails: skipped, {args.nsjail} not found")
+        return
+
+    print("jails")
+    with TemporaryDirectory() as home:
+        for concurrency in args.concurrency:
+            report("fresh", concurrency, measure(jail(args, home, None), concurrency, args.runs))
+            pool = NetnsPool(size=concurrency)
+            try:
+                spawn = jail(args, home, pool)
+                report("pooled", concurrency, measure(spawn, concurrency, args.runs))
+            finally:
+                pool.close()
+
+
+if __name__ == "__main__":
+    main()
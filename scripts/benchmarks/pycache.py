@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Compare interpreter start-up with and without the precompiled bytecode cache."""
+import os
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser, Namespace
+from tempfile import TemporaryDirectory
+
+from snekbox.interpreters import BytecodeCache, InterpreterRegistry
+
+SNIPPETS = {"pass": "pass", "import asyncio": "import asyncio", "import numpy": "import numpy"}
+
+
+def parse_args() -> Namespace:
+    """Parse the command line arguments."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--runs", type=int, default=20, help="runs of each snippet")
+    parser.add_argument(
+        "executables",
+        nargs="*",
+        help="interpreters to benchmark; defaults to those in /snekbin/python, or this one",
+    )
+    parser.add_argument(
+        "--user-base", default="/snekbox/user_base", help="PYTHONUSERBASE of the sandbox"
+    )
+    return parser.parse_args()
+
+
+def run(executable: str, code: str, env: dict[str, str], runs: int) -> float | None:
+    """Return the mean time to run `code` with `executable`, or None if it fails."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([executable, "-c", code], env=env, capture_output=True)
+        timings.append(time.perf_counter() - start)
+        if result.returncode:
+            return None
+    return statistics.mean(timings)
+
+
+def main() -> None:
+    """Build a cache for each interpreter, then time each snippet without and with it."""
+    args = parse_args()
+    registry = InterpreterRegistry()
+    registry.refresh()
+    executables = args.executables or registry.executables or [sys.executable]
+
+    with TemporaryDirectory() as root, TemporaryDirectory() as empty:
+        # As in the sandbox: bytecode is never written, so it's only read from the prefix.
+        env = {"PYTHONDONTWRITEBYTECODE": "true", "PYTHONUSERBASE": args.user_base}
+        cache = BytecodeCache(root, env)
+        start = time.perf_counter()
+        cache.update(executables)
+        print(f"built the cache in {time.perf_counter() - start:.1f}s")
+
+        for executable in executables:
+            directory = cache.directory(os.path.realpath(executable))
+            if directory is None:
+                print(f"{executable}: failed to build the cache")
+                continue
+
+            print(executable)
+            for name, code in SNIPPETS.items():
+                # An empty prefix hides any bytecode next to the sources, as if it was deleted.
+                cold = run(executable, code, {**env, "PYTHONPYCACHEPREFIX": empty}, args.runs)
+                warm = run(executable, code, {**env, "PYTHONPYCACHEPREFIX": directory}, args.runs)
+                if cold is None or warm is None:
+                    print(f"  {name:<14} failed")
+                    continue
+                print(
+                    f"  {name:<14} without {cold * 1e3:7.1f}ms  with {warm * 1e3:7.1f}ms"
+                    f"  speed-up {cold / warm:.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Compare CPU-bound threaded snippets with and without the GIL on each interpreter."""
+import os
+import subprocess
+import sys
+from argparse import ArgumentParser, Namespace
+
+from snekbox.interpreters import Interpreter, InterpreterRegistry
+
+# Each snippet splits a fixed amount of work between `threads` threads and prints the time taken.
+_TEMPLATE = """\
+import sys, threading, time
+threads = int(sys.argv[1])
+def work(n):
+{body}
+start = time.perf_counter()
+workers = [threading.Thread(target=work, args=({size} // threads,)) for _ in range(threads)]
+for worker in workers:
+    worker.start()
+for worker in workers:
+    worker.join()
+print(time.perf_counter() - start)
+"""
+
+_GIL_SCRIPT = "import sysconfig; print(int(bool(sysconfig.get_config_var('Py_GIL_DISABLED'))))"
+
+SNIPPETS = {
+    "loop": ("    total = 0\n    for i in range(n):\n        total += i * i", 8_000_000),
+    "primes": (
+        "    found = 0\n"
+        "    for i in range(2, n // 8):\n"
+        "        if all(i % d for d in range(2, int(i ** 0.5) + 1)):\n"
+        "            found += 1",
+        1_600_000,
+    ),
+    "dict": ("    d = {}\n    for i in range(n):\n        d[i] = str(i)", 2_000_000),
+}
+
+
+def parse_args() -> Namespace:
+    """Parse the command line arguments."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--runs", type=int, default=3, help="runs of each snippet")
+    parser.add_argument(
+        "-t", "--threads", type=int, default=4, help="threads, and CPUs, to run with in parallel"
+    )
+    parser.add_argument(
+        "executables",
+        nargs="*",
+        help="interpreters to benchmark; defaults to those in /snekbin/python, or this one",
+    )
+    return parser.parse_args()
+
+
+def run(executable: str, code: str, threads: int, env: dict[str, str], runs: int) -> float | None:
+    """Return the fastest time `code` took with `threads` threads, or None if it failed."""
+    timings = []
+    cpus = sorted(os.sched_getaffinity(0))[:threads]
+    for _ in range(runs):
+        result = subprocess.run(
+            [executable, "-c", code, str(threads)],
+            env=env,
+            capture_output=True,
+            text=True,
+            # Like NsJail's --max_cpus, which the sandbox of a free-threaded job is given.
+            preexec_fn=lambda: os.sched_setaffinity(0, cpus),
+        )
+        if result.returncode:
+            return None
+        timings.append(float(result.stdout))
+    return min(timings)
+
+
+def probe(executable: str) -> Interpreter:
+    """Describe an interpreter which isn't in the registry; only its GIL matters here."""
+    result = subprocess.run(
+        [executable, "-c", _GIL_SCRIPT], capture_output=True, check=True, text=True
+    )
+    real_path = os.path.realpath(executable)
+    return Interpreter(executable, executable, real_path, "", "", result.stdout == "1\n", False)
+
+
+def interpreters(executables: list[str]) -> list[Interpreter]:
+    """Return the given interpreters, or else one of each in the registry, or else this one."""
+    if executables:
+        return [probe(executable) for executable in executables]
+
+    registry = InterpreterRegistry()
+    registry.refresh()
+    unique = {}
+    for interpreter in registry.interpreters:
+        unique.setdefault(interpreter.real_path, interpreter)
+    return list(unique.values()) or [probe(sys.executable)]
+
+
+def main() -> None:
+    """Time each snippet with one thread and with several, with and without the GIL."""
+    args = parse_args()
+    threads = min(args.threads, len(os.sched_getaffinity(0)))
+    print(f"{threads} threads on {threads} CPUs; speed-up over 1 thread")
+
+    for interpreter in interpreters(args.executables):
+        modes = {"GIL": "1", "no GIL": "0"} if interpreter.free_threading else {"GIL": None}
+        for mode, gil in modes.items():
+            env = {"PYTHON_GIL": gil} if gil else {}
+            print(f"{interpreter.name} ({mode})")
+            for name, (body, size) in SNIPPETS.items():
+                code = _TEMPLATE.format(body=body, size=size)
+                serial = run(interpreter.real_path, code, 1, env, args.runs)
+                parallel = run(interpreter.real_path, code, threads, env, args.runs)
+                if serial is None or parallel is None:
+                    print(f"  {name:<8} failed")
+                    continue
+                print(
+                    f"  {name:<8} 1 thread {serial * 1e3:8.1f}ms  {threads} threads "
+                    f"{parallel * 1e3:8.1f}ms  speed-up {serial / parallel:.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Build an index of the top-level modules an interpreter can import, and a finder which uses it.
+
+Run with each interpreter, with the sandbox's `PYTHONUSERBASE`, after packages are installed:
+
+    PYTHONUSERBASE=/snekbox/user_base /snekbin/python/3.14/bin/python scripts/import_index.py
+
+This writes a copy of this module, with the index appended, to the user site-packages, along with
+a .pth file which installs its finder when the interpreter starts. Each interpreter sharing the
+user site-packages has an index of its own, keyed by its prefix.
+
+The finder resolves a top-level import with a single lookup, rather than the path finder listing
+every directory on `sys.path` until it finds the module. It only answers for modules which were
+indexed, and defers to the path finder if the import path or any indexed directory changed since
+the index was built, so it never finds a different module than the path finder would.
+
+This module runs inside the sandbox, with any supported version of Python, so it may only use the
+standard library.
+"""
+from __future__ import annotations
+
+import os
+import sys
+
+# The frozen modules behind importlib are already loaded when the interpreter starts, whereas
+# importing importlib.machinery or importlib.util would cost more than the index saves.
+from _frozen_importlib import ModuleSpec
+from _frozen_importlib_external import (
+    BYTECODE_SUFFIXES,
+    EXTENSION_SUFFIXES,
+    SOURCE_SUFFIXES,
+    PathFinder,
+    spec_from_file_location,
+)
+
+MODULE_NAME = "_snekbox_import_index"
+DATA_MARKER = "# Index data; generated by scripts/import_index.py.\nINDEXES = "
+
+# The same order as the path finder tries them in.
+SUFFIXES = (*EXTENSION_SUFFIXES, *SOURCE_SUFFIXES, *BYTECODE_SUFFIXES)
+
+# Maps the prefixes of interpreters to their indexes; replaced in the generated copy.
+INDEXES = {}
+
+
+class IndexFinder:
+    """A meta path finder for the top-level modules in an index."""
+
+    def __init__(self, modules: dict[str, tuple[str, str, bool]]):
+        # Maps module names to the path entry, file, and whether it's a package.
+        self.modules = modules
+        self.entries = {entry for entry, _, _ in modules.values()}
+
+    def find_spec(
+        self, name: str, path: list[str] | None = None, target: object = None
+    ) -> ModuleSpec | None:
+        """Return the spec of the module `name` if it's a top-level module in the index."""
+        if path is not None:
+            return None
+        location = self.modules.get(name)
+        if location is None:
+            return None
+
+        entry, origin, is_package = location
+        # Entries which weren't indexed, such as the script's directory, can still shadow it.
+        unknown = []
+        for sys_entry in sys.path:
+            if sys_entry == entry:
+                break
+            if sys_entry not in self.entries:
+                unknown.append(sys_entry)
+        else:
+            return None
+
+        if unknown:
+            spec = PathFinder.find_spec(name, unknown, target)
+            # Namespace portions are only used if there's no module or package anywhere.
+            if spec is not None and spec.loader is not None:
+                return spec
+
+        locations = [os.path.dirname(origin)] if is_package else None
+        return spec_from_file_location(name, origin, submodule_search_locations=locations)
+
+    def invalidate_caches(self) -> None:
+        """Do nothing; the index is only valid while its directories are unchanged."""
+
+
+def install() -> None:
+    """Insert the finder of this interpreter's index before the others, if it's still valid."""
+    index = INDEXES.get(sys.prefix)
+    if not index:
+        return
+
+    for entry, mtime in index["entries"].items():
+        try:
+            if os.stat(entry).st_mtime_ns != mtime:
+                return
+        except OSError:
+            return
+
+    sys.meta_path.insert(0, IndexFinder(index["modules"]))
+
+
+def _find_top_level(directory: str, name: str, is_dir: bool) -> tuple[str, str, bool] | None:
+    """Return the module name, its file, and whether it's a package, if `name` is importable."""
+    path = os.path.join(directory, name)
+    if is_dir:
+        if not name.isidentifier():
+            return None
+        for suffix in SUFFIXES:
+            init = os.path.join(path, "__init__" + suffix)
+            if os.path.isfile(init):
+                return name, init, True
+        return None
+
+    for suffix in SUFFIXES:
+        if name.endswith(suffix):
+            module = name[: -len(suffix)]
+            if module.isidentifier():
+                return module, path, False
+    return None
+
+
+def build() -> dict:
+    """Return the index of the current interpreter's import path."""
+    from importlib.machinery import FrozenImporter
+
+    builtins = set(sys.builtin_module_names)
+    modules = {}
+    entries = {}
+    paths = sys.path
+    if paths and paths[0] == os.path.dirname(os.path.abspath(__file__)):
+        # The directory of this script, which isn't on the path when the sandbox runs.
+        paths = paths[1:]
+
+    for entry in paths:
+        if not entry or not os.path.isabs(entry):
+            continue
+        if not os.path.isdir(entry):
+            if os.path.exists(entry):
+                # Names in a zip file can't be cheaply indexed, and it can shadow later entries.
+                break
+            continue
+
+        entries[entry] = os.stat(entry).st_mtime_ns
+        found = {}
+        with os.scandir(entry) as it:
+            for dir_entry in it:
+                result = _find_top_level(entry, dir_entry.name, dir_entry.is_dir())
+                if result is None:
+                    continue
+                module, origin, is_package = result
+                previous = found.get(module)
+                # Within a directory, a package wins over a module, and suffixes win in order.
+                if previous is None or _rank(origin, is_package) < _rank(*previous):
+                    found[module] = (origin, is_package)
+
+        for module, (origin, is_package) in found.items():
+            if module in builtins or FrozenImporter.find_spec(module) is not None:
+                continue
+            modules.setdefault(module, (entry, origin, is_package))
+
+    return {"entries": entries, "modules": modules}
+
+
+def _rank(origin: str, is_package: bool) -> tuple[int, int]:
+    if is_package:
+        return (0, 0)
+    return (1, next(i for i, suffix in enumerate(SUFFIXES) if origin.endswith(suffix)))
+
+
+def _read_indexes(path: str) -> dict:
+    """Return the indexes in the generated module at `path`, or an empty dict."""
+    import ast
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+    except OSError:
+        return {}
+
+    _, marker, data = source.partition(DATA_MARKER)
+    if not marker:
+        return {}
+    try:
+        return ast.literal_eval(data)
+    except (SyntaxError, ValueError):
+        return {}
+
+
+def main() -> None:
+    """Write this interpreter's index, along with the others', to the user site-packages."""
+    import site
+
+    user_site = site.getusersitepackages()
+    os.makedirs(user_site, exist_ok=True)
+    module_path = os.path.join(user_site, MODULE_NAME + ".py")
+    pth_path = os.path.join(user_site, MODULE_NAME + ".pth")
+
+    indexes = _read_indexes(module_path)
+    # Create the files before building the index, and then only rewrite them in place, so that
+    # the modification time of the directory, which the index is validated against, is final.
+    # That includes the directory the module's bytecode is written to when it's first imported.
+    os.makedirs(os.path.join(user_site, "__pycache__"), exist_ok=True)
+    for path in (module_path, pth_path):
+        if not os.path.exists(path):
+            open(path, "w").close()
+    index = indexes[sys.prefix] = build()
+
+    with open(__file__, encoding="utf-8") as f:
+        source, _, _ = f.read().partition(DATA_MARKER)
+    with open(module_path, "w", encoding="utf-8") as f:
+        f.write(source + DATA_MARKER + repr(indexes) + "\n")
+    with open(pth_path, "w", encoding="utf-8") as f:
+        f.write(f"import {MODULE_NAME}; {MODULE_NAME}.install()\n")
+
+    print(
+        f"Indexed {len(index['modules'])} modules in {len(index['entries'])} directories "
+        f"for {sys.prefix}."
+    )
+
+
+if __name__ == "__main__":
+    main()
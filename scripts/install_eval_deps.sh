@@ -1,5 +1,21 @@
 set -euo pipefail
 
+# Install the requirements in $1 into the user base $PYTHONUSERBASE with every interpreter, and
+# then index the modules once everything is installed, since interpreters of the same version
+# share their user site-packages, and the index is only valid while its directories are unchanged.
+install() {
+    find /snekbin/python -mindepth 1 -maxdepth 1 -type d -print0 | xargs -0I{} bash -c \
+        "{}/bin/python -m pip install --user -U -r '$1'" \;
+    find /snekbin/python -mindepth 1 -maxdepth 1 -type d -print0 | xargs -0I{} bash -c \
+        '{}/bin/python scripts/import_index.py' \;
+}
+
 export PYTHONUSERBASE=/snekbox/user_base
-find /snekbin/python -mindepth 1 -maxdepth 1 -type d -print0 | xargs -0I{} bash -c \
-    '{}/bin/python -m pip install --user -U -r requirements/eval-deps.pip' \;
+install requirements/eval-deps.pip
+
+# Each named environment is a user base of its own, which requests can select instead.
+for requirements in requirements/environments/*.pip; do
+    [[ -e "$requirements" ]] || continue
+    export PYTHONUSERBASE="/environments/$(basename "$requirements" .pip)"
+    install "$requirements"
+done
@@ -1,3 +1,20 @@
+from .blobs import BlobResource, BlobsResource
+from .bundles import BundlesResource
+from .downloads import DownloadResource
+from .environments import EnvironmentsResource
 from .eval import EvalResource
+from .interpreters import InterpretersResource
+from .ready import ReadyResource
+from .stats import StatsResource
 
-__all__ = ("EvalResource",)
+__all__ = (
+    "BlobResource",
+    "BlobsResource",
+    "BundlesResource",
+    "DownloadResource",
+    "EnvironmentsResource",
+    "EvalResource",
+    "InterpretersResource",
+    "ReadyResource",
+    "StatsResource",
+)
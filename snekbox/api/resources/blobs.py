@@ -0,0 +1,87 @@
+import logging
+
+import falcon
+
+from snekbox.nsjail import NsJail
+from snekbox.snekio import BlobTooLargeError
+
+__all__ = ("BlobsResource", "BlobResource")
+
+log = logging.getLogger(__name__)
+
+
+class BlobsResource:
+    """
+    Upload of files to be referenced by later evaluations.
+
+    Supported methods:
+
+    - POST /blobs
+        Store the request body as a blob and return its SHA-256 digest
+    """
+
+    def __init__(self, nsjail: NsJail):
+        self.nsjail = nsjail
+
+    def on_post(self, req: falcon.Request, resp: falcon.Response) -> None:
+        """
+        Store the raw request body as a blob.
+
+        Files in `POST /eval` requests can then set `blob` to the digest instead of sending the
+        content. Blobs are kept in a size-bounded store and the least recently used are evicted,
+        so clients should be prepared to upload a blob again if an evaluation refers to one
+        which no longer exists. Blobs may not be larger than the sandbox's file system.
+
+        Response format:
+
+        >>> {
+        ...     "sha256": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+        ...     "size": 4
+        ... }
+
+        Status codes:
+
+        - 201
+            The blob was stored
+        - 413
+            The blob is too large
+        """
+        max_size = self.nsjail.blobs.max_blob_size
+        try:
+            if req.content_length is not None and req.content_length > max_size:
+                raise BlobTooLargeError(f"Blobs may not be larger than {max_size} bytes")
+            digest, size = self.nsjail.blobs.add(req.bounded_stream)
+        except BlobTooLargeError as e:
+            raise falcon.HTTPError(falcon.HTTP_413, title="Blob too large", description=str(e))
+
+        resp.status = falcon.HTTP_201
+        resp.location = f"/blobs/{digest}"
+        resp.media = {"sha256": digest, "size": size}
+
+
+class BlobResource:
+    """
+    A stored blob.
+
+    Supported methods:
+
+    - HEAD /blobs/{digest}
+        Check whether a blob is stored
+    """
+
+    def __init__(self, nsjail: NsJail):
+        self.nsjail = nsjail
+
+    def on_head(self, req: falcon.Request, resp: falcon.Response, digest: str) -> None:
+        """
+        Check whether the blob with SHA-256 `digest` is stored.
+
+        Status codes:
+
+        - 200
+            The blob is stored
+        - 404
+            The blob isn't stored, or has been evicted
+        """
+        if digest not in self.nsjail.blobs:
+            raise falcon.HTTPNotFound
@@ -0,0 +1,44 @@
+import falcon
+
+from snekbox.nsjail import NsJail
+
+__all__ = ("BundlesResource",)
+
+
+class BundlesResource:
+    """
+    Read-only datasets which evaluations can mount.
+
+    Supported methods:
+
+    - GET /bundles
+        List the configured bundles
+    """
+
+    def __init__(self, nsjail: NsJail):
+        self.nsjail = nsjail
+
+    def on_get(self, req: falcon.Request, resp: falcon.Response) -> None:
+        """
+        List the bundles which `POST /eval` requests can mount with `bundles`.
+
+        `path` is where the bundle is mounted in the sandbox. `files` and `size` are the number of
+        files in the bundle and their total size in bytes, counted when snekbox started.
+
+        Response format:
+
+        >>> [
+        ...     {
+        ...         "name": "words",
+        ...         "path": "/bundles/words",
+        ...         "files": 3,
+        ...         "size": 4980736
+        ...     }
+        ... ]
+
+        Status codes:
+
+        - 200
+            Successful retrieval of the bundles
+        """
+        resp.media = [bundle.as_dict for bundle in self.nsjail.bundles.values()]
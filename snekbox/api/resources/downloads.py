@@ -0,0 +1,45 @@
+from pathlib import PurePosixPath
+
+import falcon
+
+from snekbox.nsjail import NsJail
+
+__all__ = ("DownloadResource",)
+
+
+class DownloadResource:
+    """
+    An output file retained for download.
+
+    Supported methods:
+
+    - GET /downloads/{token}
+        Return the content of a retained output file
+    """
+
+    def __init__(self, nsjail: NsJail):
+        self.nsjail = nsjail
+
+    def on_get(self, req: falcon.Request, resp: falcon.Response, token: str) -> None:
+        """
+        Return the raw content of the output file retained as `token`.
+
+        The URLs are given by `POST /eval` requests with `attachments` set to `"link"`. The file
+        is sent with `sendfile` where the server supports it, and is typed by its extension.
+
+        Status codes:
+
+        - 200
+            Successful retrieval of the file
+        - 404
+            The file doesn't exist, or has expired
+        """
+        try:
+            download, file = self.nsjail.downloads.open(token)
+        except KeyError:
+            raise falcon.HTTPNotFound
+
+        resp.content_type = download.mime_type
+        resp.content_length = download.size
+        resp.downloadable_as = PurePosixPath(download.path).name
+        resp.stream = file
@@ -0,0 +1,44 @@
+import falcon
+
+from snekbox.nsjail import NsJail
+
+__all__ = ("EnvironmentsResource",)
+
+
+class EnvironmentsResource:
+    """
+    Package environments which evaluations can use.
+
+    Supported methods:
+
+    - GET /environments
+        List the configured environments
+    """
+
+    def __init__(self, nsjail: NsJail):
+        self.nsjail = nsjail
+
+    def on_get(self, req: falcon.Request, resp: falcon.Response) -> None:
+        """
+        List the environments which `POST /eval` requests can select with `environment`.
+
+        `path` is the user base of the environment, which is mounted at the same path in the
+        sandbox. `sites` lists the versions of the interpreters which it has packages for, with
+        a `t` suffix for free-threaded interpreters.
+
+        Response format:
+
+        >>> [
+        ...     {
+        ...         "name": "scientific",
+        ...         "path": "/environments/scientific",
+        ...         "sites": ["3.13", "3.14", "3.14t"]
+        ...     }
+        ... ]
+
+        Status codes:
+
+        - 200
+            Successful retrieval of the environments
+        """
+        resp.media = [environment.as_dict for environment in self.nsjail.environments.values()]
@@ -1,18 +1,323 @@
 from __future__ import annotations
 
+import functools
+import io
+import itertools
+import json
 import logging
+import math
+import queue
+import socket
+import threading
+import time
+from base64 import b64decode
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from pathlib import Path
 
 import falcon
 from falcon.media.validators.jsonschema import validate
 
 from snekbox.nsjail import DEFAULT_EXECUTABLE_PATH, NsJail
-from snekbox.snekio import FileAttachment, ParsingError
+from snekbox.result import EvalResult
+from snekbox.scheduling import DEFAULT_CLIENT, DeadlineExceededError, Priority, QuotaExceededError
+from snekbox.snekio import (
+    ArchiveFormat,
+    BlobAttachment,
+    FileAttachment,
+    HomeArchive,
+    MemFSLimitError,
+    ParsingError,
+    safe_path,
+)
 
 __all__ = ("EvalResource",)
 
 log = logging.getLogger(__name__)
 
+# Characters of stdout escaped at a time when streaming a response.
+STDOUT_CHUNK_SIZE = 64 * 1024
+# Parts of a streamed response smaller than this are joined before they're written.
+WRITE_BUFFER_SIZE = 64 * 1024
+# Maximum number of interpreters which a request can run its code with at once.
+MAX_EXECUTABLE_PATHS = 8
+
+
+def _disconnect_check(req: falcon.Request) -> Callable[[], bool] | None:
+    """
+    Return a function which checks if the client of `req` has disconnected.
+
+    Return None if the server doesn't expose the client's socket.
+    """
+    sock: socket.socket | None = req.env.get("gunicorn.socket")
+    if sock is None:
+        return None
+
+    def disconnected() -> bool:
+        try:
+            # The request has been read in full, so the client shouldn't send anything else
+            # until it receives the response. An orderly shutdown reads as b"".
+            return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b""
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True
+
+    return disconnected
+
+
+def _stdout_parts(stdout: str | None) -> Iterator[bytes]:
+    """Yield `stdout` as a JSON string, escaped `STDOUT_CHUNK_SIZE` characters at a time."""
+    if stdout is None:
+        yield b"null"
+        return
+
+    yield b'"'
+    for start in range(0, len(stdout), STDOUT_CHUNK_SIZE):
+        chunk = stdout[start : start + STDOUT_CHUNK_SIZE]
+        yield json.dumps(chunk, ensure_ascii=False)[1:-1].encode()
+    yield b'"'
+
+
+def _file_parts(file: FileAttachment, first: bool) -> Iterator[bytes | FileAttachment]:
+    """Yield the parts of the JSON of `file`, with the attachment standing in for its content."""
+    path = json.dumps(file.path, ensure_ascii=False)
+    separator = "" if first else ", "
+    yield f'{separator}{{"path": {path}, "size": {file.size}, "content": "'.encode()
+    yield file
+    yield b'"}'
+
+
+def _result_parts(result: EvalResult, **fields: object) -> Iterator[bytes | FileAttachment]:
+    """Yield the parts of the JSON of `result`, after any other `fields` of the object."""
+    yield b"{"
+    for name, value in fields.items():
+        yield f"{json.dumps(name)}: {json.dumps(value, ensure_ascii=False)}, ".encode()
+    yield b'"stdout": '
+    yield from _stdout_parts(result.stdout)
+    yield f', "returncode": {json.dumps(result.returncode)}, "files": ['.encode()
+
+    for i, file in enumerate(result.files):
+        yield from _file_parts(file, first=not i)
+
+    yield b"]}"
+
+
+def _coalesce(parts: Iterable[bytes | FileAttachment]) -> Iterator[bytes]:
+    """Encode attachments and join parts smaller than `WRITE_BUFFER_SIZE` bytes."""
+    buffer = bytearray()
+    for part in parts:
+        chunks = part.iter_base64() if isinstance(part, FileAttachment) else (part,)
+        for chunk in chunks:
+            if len(chunk) >= WRITE_BUFFER_SIZE:
+                if buffer:
+                    yield bytes(buffer)
+                    buffer.clear()
+                yield chunk
+                continue
+
+            buffer += chunk
+            if len(buffer) >= WRITE_BUFFER_SIZE:
+                yield bytes(buffer)
+                buffer.clear()
+
+    if buffer:
+        yield bytes(buffer)
+
+
+class _ResultStream:
+    """
+    The JSON body of an evaluation result, produced incrementally.
+
+    The stdout is escaped and attachments are base64-encoded a chunk at a time while the body is
+    sent, and small parts are joined up to `WRITE_BUFFER_SIZE` bytes before they're written. The
+    result is closed once the server is done with the body, even if it's never iterated.
+    """
+
+    def __init__(self, result: EvalResult):
+        self.result = result
+
+    def _parts(self) -> Iterator[bytes | FileAttachment]:
+        """Yield the parts of the body, with attachments standing in for their encoded content."""
+        return _result_parts(self.result)
+
+    @property
+    def content_length(self) -> int:
+        """Length of the body in bytes."""
+        return sum(
+            part.encoded_size if isinstance(part, FileAttachment) else len(part)
+            for part in self._parts()
+        )
+
+    def __iter__(self) -> Iterator[bytes]:
+        return _coalesce(self._parts())
+
+    def close(self) -> None:
+        """Release the attachments; called by the server once the body is sent."""
+        self.result.close()
+
+
+class _MatrixStream(_ResultStream):
+    """The JSON body of the results of running the same code with several interpreters."""
+
+    def __init__(self, results: Iterable[tuple[str, EvalResult]]):
+        self.results = list(results)
+
+    def _parts(self) -> Iterator[bytes | FileAttachment]:
+        """Yield the parts of the body, with attachments standing in for their encoded content."""
+        yield b'{"results": ['
+        for i, (executable_path, result) in enumerate(self.results):
+            if i:
+                yield b", "
+            yield from _result_parts(
+                result,
+                executable_path=executable_path,
+                duration=result.duration,
+                cpu_time=result.cpu_time,
+            )
+        yield b"]}"
+
+    def close(self) -> None:
+        """Release the attachments of every result; called by the server once the body is sent."""
+        for _, result in self.results:
+            result.close()
+
+
+def _run_matrix(
+    run: Callable[..., EvalResult], executable_paths: Sequence[str], **kwargs: object
+) -> list[EvalResult]:
+    """
+    Call `run` with each of `executable_paths` in a thread of its own and return the results.
+
+    If any call raises, the results of the others are closed and the first exception is raised.
+    """
+    with ThreadPoolExecutor(len(executable_paths), thread_name_prefix="matrix") as executor:
+        futures = [executor.submit(run, executable_path=p, **kwargs) for p in executable_paths]
+        wait(futures)
+
+    results = [future.result() for future in futures if future.exception() is None]
+    if len(results) < len(futures):
+        for result in results:
+            result.close()
+        raise next(future.exception() for future in futures if future.exception() is not None)
+    return results
+
+
+@dataclass
+class _JobEnd:
+    """The end of a live job, with its result or the exception it raised."""
+
+    result: EvalResult | None = None
+    error: BaseException | None = None
+
+
+class _LiveJob:
+    """
+    An evaluation run in a background thread, whose output files are sent while it runs.
+
+    The body lists the files first, as they're delivered, followed by the files found after
+    exit, and then the stdout and return code. Its length isn't known up front, so it's sent
+    with chunked transfer encoding. The job is cancelled if the server stops sending the body.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[Callable[[FileAttachment], None], Callable[[], bool]], EvalResult],
+        disconnected: Callable[[], bool] | None = None,
+    ):
+        """
+        Start the job in a thread.
+
+        Args:
+            run: Called with the function to deliver files to and a check for cancellation.
+            disconnected: Check for whether the client has disconnected, if it's known.
+        """
+        self._queue: queue.SimpleQueue[FileAttachment | _JobEnd] = queue.SimpleQueue()
+        self._closed = threading.Event()
+        self._disconnected = disconnected
+        self._first: FileAttachment | None = None
+        self._result: EvalResult | None = None
+        self._thread = threading.Thread(target=self._run, args=(run,), name="live-eval")
+        self._thread.start()
+
+    def _run(
+        self, run: Callable[[Callable[[FileAttachment], None], Callable[[], bool]], EvalResult]
+    ) -> None:
+        try:
+            self._queue.put(_JobEnd(result=run(self._queue.put, self._cancelled)))
+        except BaseException as e:
+            self._queue.put(_JobEnd(error=e))
+
+    def _cancelled(self) -> bool:
+        """Return True if the body is no longer being sent or the client has disconnected."""
+        if self._closed.is_set():
+            return True
+        return self._disconnected is not None and self._disconnected()
+
+    def wait(self) -> EvalResult | None:
+        """
+        Wait for the first file or the end of the job.
+
+        Return the result if the job ended before any files were delivered, or None otherwise.
+
+        Raises:
+            Exception: Whatever the job raised.
+        """
+        item = self._queue.get()
+        if isinstance(item, FileAttachment):
+            self._first = item
+            return None
+
+        self._thread.join()
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield b'{"files": ['
+        item, count = self._first, 0
+        while isinstance(item, FileAttachment):
+            # Flush each file, so that it isn't held back while waiting for the next.
+            try:
+                yield from _coalesce(_file_parts(item, first=not count))
+            finally:
+                item.close()
+            count += 1
+            item = self._queue.get()
+
+        if item.error is not None:
+            # The status has already been sent, so the body can only be cut short.
+            log.error("An exception occurred while running a live job", exc_info=item.error)
+            raise item.error
+
+        self._result = result = item.result
+        files = (_file_parts(file, not count + i) for i, file in enumerate(result.files))
+        yield from _coalesce(
+            itertools.chain(
+                itertools.chain.from_iterable(files),
+                (b'], "stdout": ',),
+                _stdout_parts(result.stdout),
+                (f', "returncode": {json.dumps(result.returncode)}}}'.encode(),),
+            )
+        )
+
+    def close(self) -> None:
+        """Cancel the job if it's still running, wait for it, and release what it produced."""
+        self._closed.set()
+        self._thread.join()
+        if self._first is not None:
+            self._first.close()
+        while not self._queue.empty():
+            item = self._queue.get()
+            if isinstance(item, FileAttachment):
+                item.close()
+            elif item.result is not None:
+                self._result = item.result
+
+        if self._result is not None:
+            self._result.close()
+
 
 class EvalResource:
     """
@@ -40,11 +345,40 @@ class EvalResource:
                             "pattern": r"^(?!/)(?!.*\\0).*$",
                         },
                         "content": {"type": "string"},
+                        "blob": {"type": "string", "pattern": "^[0-9a-f]{64}$"},
                     },
                     "required": ["path"],
+                    "not": {"required": ["content", "blob"]},
                 },
             },
+            "home_archive": {
+                "type": "object",
+                "properties": {
+                    "format": {"enum": [f.value for f in ArchiveFormat]},
+                    "content": {"type": "string"},
+                    "blob": {"type": "string", "pattern": "^[0-9a-f]{64}$"},
+                },
+                "required": ["format"],
+                "oneOf": [{"required": ["content"]}, {"required": ["blob"]}],
+            },
             "executable_path": {"type": "string"},
+            "environment": {"type": "string"},
+            "executable_paths": {
+                "type": "array",
+                "items": {"type": "string", "minLength": 1},
+                "minItems": 1,
+                "maxItems": MAX_EXECUTABLE_PATHS,
+                "uniqueItems": True,
+            },
+            "priority": {"enum": [p.value for p in Priority]},
+            "deadline_ms": {"type": "integer", "minimum": 1},
+            "bundles": {"type": "array", "items": {"type": "string"}, "uniqueItems": True},
+            "attachments": {"enum": ["inline", "link"]},
+            "archive": {"enum": [f.value for f in ArchiveFormat]},
+            "compress": {"type": "boolean"},
+            "stream_files": {"type": "boolean"},
+            "jit": {"type": "boolean"},
+            "free_threading": {"type": "boolean"},
         },
         "anyOf": [
             {"required": ["input"]},
@@ -55,6 +389,104 @@ class EvalResource:
     def __init__(self, nsjail: NsJail):
         self.nsjail = nsjail
 
+    def _parse_file(self, data: dict[str, str]) -> FileAttachment | BlobAttachment:
+        """
+        Convert a file in the request body to an attachment, opening its blob if it has one.
+
+        Raises:
+            ParsingError: If the content is invalid or the blob isn't in the store.
+        """
+        if "blob" not in data:
+            return FileAttachment.from_dict(data)
+
+        path = safe_path(data["path"])
+        try:
+            return self.nsjail.blobs.open(data["blob"], path)
+        except KeyError:
+            raise ParsingError(f"Unknown blob '{data['blob']}' for file '{path}'") from None
+
+    def _parse_home_archive(self, data: dict[str, str]) -> HomeArchive:
+        """
+        Open and validate the home archive in the request body, from its content or its blob.
+
+        Raises:
+            ParsingError: If the archive is invalid or the blob isn't in the store.
+        """
+        if "blob" in data:
+            try:
+                file = self.nsjail.blobs.open(data["blob"], "").blob
+            except KeyError:
+                raise ParsingError(f"Unknown blob '{data['blob']}' for the home archive") from None
+        else:
+            try:
+                file = io.BytesIO(b64decode(data["content"]))
+            except (TypeError, ValueError) as e:
+                raise ParsingError("Invalid base64 encoding for the home archive") from e
+
+        try:
+            return HomeArchive(file, ArchiveFormat(data["format"]))
+        except BaseException:
+            file.close()
+            raise
+
+    def _resolve_executable(
+        self,
+        executable_path: str,
+        jit: bool | None,
+        free_threading: bool | None,
+        environment: str | None,
+    ) -> str:
+        """
+        Return the path of the executable to run, checking that it supports the options.
+
+        Raises:
+            falcon.HTTPBadRequest: If the executable isn't valid or doesn't support an option.
+        """
+        if (interpreter := self.nsjail.interpreters.get(executable_path)) is not None:
+            # Registered interpreters were checked when they were discovered.
+            if executable_path != DEFAULT_EXECUTABLE_PATH:
+                executable_path = interpreter.real_path
+        elif executable_path != DEFAULT_EXECUTABLE_PATH:
+            path = Path(executable_path)
+            if not path.exists():
+                raise falcon.HTTPBadRequest(title="executable_path does not exist")
+            if not path.is_file():
+                raise falcon.HTTPBadRequest(title="executable_path is not a file")
+            if not path.stat().st_mode & 0o100 == 0o100:
+                raise falcon.HTTPBadRequest(title="executable_path is not executable")
+            executable_path = path.resolve().as_posix()
+            interpreter = self.nsjail.interpreters.get(executable_path)
+
+        if jit and not (interpreter and interpreter.jit):
+            raise falcon.HTTPBadRequest(title="The interpreter doesn't have a JIT compiler")
+        if free_threading and not (interpreter and interpreter.free_threading):
+            raise falcon.HTTPBadRequest(title="The interpreter isn't free-threaded")
+        if (
+            environment is not None
+            and interpreter is not None
+            and not self.nsjail.environments[environment].supports(interpreter)
+        ):
+            raise falcon.HTTPBadRequest(
+                title="The environment isn't built for the interpreter",
+                description=f"See GET /environments for the interpreters of '{environment}'",
+            )
+        return executable_path
+
+    def _respond_with_links(self, resp: falcon.Response, result: EvalResult) -> None:
+        """Retain the attachments of `result` for download and respond with their metadata."""
+        files = []
+        with result:
+            try:
+                for file in result.files:
+                    download = self.nsjail.downloads.add(file)
+                    url = f"/downloads/{download.token}" if download.token else None
+                    files.append({**download.as_dict, "url": url})
+            except OSError:
+                log.exception("An exception occurred while retaining the attachments")
+                raise falcon.HTTPInternalServerError
+
+        resp.media = {"stdout": result.stdout, "returncode": result.returncode, "files": files}
+
     @validate(REQ_SCHEMA)
     def on_post(self, req: falcon.Request, resp: falcon.Response) -> None:
         """
@@ -67,6 +499,69 @@ class EvalResource:
 
         Either `input` or `args` must be specified.
 
+        The `priority` of the job can be `"interactive"` (the default) or `"batch"`. Batch jobs
+        only run on the sandbox slots that are not reserved for interactive jobs, and wait for
+        all queued interactive jobs to start first.
+
+        The client can identify itself with the `X-Snekbox-Client` header. Clients share the
+        sandbox slots fairly according to their configured weights, and may be limited by a quota
+        of sandbox CPU time. Requests without the header share the `anonymous` client.
+
+        If the client disconnects before the response is sent, the job is cancelled and the
+        NsJail process is terminated.
+
+        A whole directory tree can be sent as `home_archive`: a tar (which may be compressed) or
+        zip archive, given as base64 `content` or as a `blob`, which is extracted into the home
+        directory before `files` are written. Its paths are validated without touching the
+        host's file system, and it may only contain regular files and directories.
+
+        Instead of `content`, a file can have a `blob`: the SHA-256 digest of content previously
+        uploaded to `POST /blobs`. The blob is copied into the sandbox without being sent again.
+
+        If `attachments` is `"link"` rather than `"inline"` (the default), output files are
+        not included in the response. Instead, each file has its SHA-256 digest, MIME type, and
+        a `url` from which its raw content can be downloaded until it expires; see
+        `GET /downloads/{token}`. The URL is null if the file is too large to be retained.
+
+        If `archive` is `"tar"` or `"zip"`, the output files are packed into a single archive,
+        which is the only file in the response: `output.tar` or `output.zip`. Setting `compress`
+        to true compresses it, with gzip (`output.tar.gz`) or deflate respectively. Files are
+        limited and matched as usual, and there are no files if none match.
+
+        If `stream_files` is true, each output file is sent as soon as the code closes it after
+        writing, while the code is still running. The response is then sent in chunks, and its
+        `files` come before `stdout` and `returncode`. A file which is changed again after it's
+        sent is sent again; the last copy is the final content. If no file is written before
+        the code exits, the response is the same as without `stream_files`. It can't be
+        combined with `archive` or with linked `attachments`.
+
+        `jit` enables or disables the experimental JIT compiler, and `free_threading` runs a
+        free-threaded interpreter without or with the GIL. Either is left at the interpreter's
+        default if omitted. If either is true and `executable_path` isn't given, the default
+        interpreter is used if it supports the option, or otherwise the newest which does; see
+        `GET /interpreters`. Code run by a free-threaded interpreter without the GIL can use
+        several CPUs, and its thread and process limits are raised to match.
+
+        Instead of `executable_path`, `executable_paths` can list up to 8 interpreters to run the
+        code with at once, each in a sandbox of its own, to compare how it behaves or performs.
+        The response then has a result for each interpreter, in the same order, with the path
+        as given, the time in seconds the sandbox ran for (`duration`) and the CPU time it used
+        (`cpu_time`). If any of them can't run, e.g. because the deadline passed, the request
+        fails as a whole. It can't be combined with `stream_files` or with linked
+        `attachments`.
+
+        `environment` selects an operator-provided package environment, whose packages are
+        used instead of those installed for every request; see `GET /environments`. It must
+        have been built for the interpreter.
+
+        `bundles` lists the names of operator-provided datasets to mount read-only at
+        `/bundles/<name>` in the sandbox; see `GET /bundles`.
+
+        `deadline_ms` is the number of milliseconds, from when the request is received, within
+        which the job must finish. It is capped by NsJail's configured time limit. The job is
+        dropped if the deadline passes before it starts, and killed if it passes while it runs;
+        the latter results in a return code of 137.
+
         The return codes mostly resemble those of a Unix shell. Some noteworthy cases:
 
         - None
@@ -86,16 +581,62 @@ class EvalResource:
         ...    "args": ["-c", "print('Hello')"]
         ... }
 
+        >>> {
+        ...    "input": "print('Hello')",
+        ...    "priority": "batch"
+        ... }
+
+        >>> {
+        ...    "input": "print('Hello')",
+        ...    "deadline_ms": 1500
+        ... }
+
+        >>> {
+        ...    "input": "import sys; print(sys._is_gil_enabled())",
+        ...    "free_threading": true
+        ... }
+
+        >>> {
+        ...    "input": "print(open('/bundles/words/en.txt').readline())",
+        ...    "bundles": ["words"]
+        ... }
+
+        >>> {
+        ...    "args": ["-m", "project"],
+        ...    "home_archive": {
+        ...        "format": "tar",
+        ...        "content": "H4sIAAA...="  # Base64
+        ...    }
+        ... }
+
+        >>> {
+        ...    "input": "...",
+        ...    "archive": "tar",
+        ...    "compress": true
+        ... }
+
         >>> {
         ...    "args": ["main.py"],
         ...    "files": [
         ...        {
         ...            "path": "main.py",
         ...            "content": "SGVsbG8...="  # Base64
+        ...        },
+        ...        {
+        ...            "path": "data.csv",
+        ...            "blob": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
         ...        }
         ...    ]
         ... }
 
+        >>> {
+        ...    "args": ["-m", "timeit", "sum(range(1000))"],
+        ...    "executable_paths": [
+        ...        "/snekbin/python/3.13/bin/python",
+        ...        "/snekbin/python/3.14/bin/python"
+        ...    ]
+        ... }
+
         Response format:
 
         >>> {
@@ -110,48 +651,198 @@ class EvalResource:
         ...     ]
         ... }
 
+        >>> {
+        ...     "stdout": "",
+        ...     "returncode": 0,
+        ...     "files": [
+        ...         {
+        ...             "path": "output.png",
+        ...             "size": 57344,
+        ...             "sha256": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f0...",
+        ...             "mime_type": "image/png",
+        ...             "url": "/downloads/Hx2a0pVQ1nD3bE4T-5jzqW8yLk6cRfGs"
+        ...         }
+        ...     ]
+        ... }
+
+        >>> {
+        ...     "results": [
+        ...         {
+        ...             "executable_path": "/snekbin/python/3.13/bin/python",
+        ...             "duration": 0.412,
+        ...             "cpu_time": 0.398,
+        ...             "stdout": "50000 loops, best of 5: 5.9 usec per loop",
+        ...             "returncode": 0,
+        ...             "files": []
+        ...         },
+        ...         ...
+        ...     ]
+        ... }
+
         Status codes:
 
         - 200
             Successful evaluation; not indicative that the input code itself works
         - 400
-           Input JSON schema is invalid
+           Input JSON schema is invalid, a file or the home archive is invalid or refers to an
+           unknown blob, a bundle or environment is unknown, the options are incompatible, or
+           the interpreter doesn't support `jit`, `free_threading`, or the environment
         - 415
             Unsupported content type; only application/JSON is supported
+        - 429
+            The client's CPU time quota is used up; see the Retry-After header
+        - 503
+            Every file system is held by a job or by a response which is still being sent
+        - 504
+            The deadline passed before the job could start
         """
+        received_at = time.monotonic()
         body: dict[str, str | list[str] | list[dict[str, str]]] = req.media
         # If `input` is supplied, default `args` to `-c`
         if "input" in body:
             body.setdefault("args", ["-c"])
             body["args"].append(body["input"])
 
+        jit = body.get("jit")
+        free_threading = body.get("free_threading")
+        environment = body.get("environment")
+        if environment is not None and environment not in self.nsjail.environments:
+            raise falcon.HTTPBadRequest(
+                title="Unknown environment", description=f"No environment is named '{environment}'"
+            )
+        options = (jit, free_threading, environment)
+
         executable_path = body.get("executable_path")
-        if not executable_path:
-            executable_path = DEFAULT_EXECUTABLE_PATH
+        executable_paths = body.get("executable_paths")
+        if executable_paths and executable_path:
+            raise falcon.HTTPBadRequest(
+                title="Incompatible options",
+                description="executable_path and executable_paths can't be combined",
+            )
+        if executable_paths:
+            executable_paths = [
+                self._resolve_executable(path, *options) for path in executable_paths
+            ]
+        elif not executable_path and (jit or free_threading):
+            interpreter = self.nsjail.interpreters.select(
+                DEFAULT_EXECUTABLE_PATH, free_threading=bool(free_threading), jit=bool(jit)
+            )
+            if interpreter is None:
+                raise falcon.HTTPBadRequest(
+                    title="No interpreter supports the requested options",
+                    description="See GET /interpreters for the capabilities of each interpreter",
+                )
+            executable_path = self._resolve_executable(interpreter.path, *options)
         else:
-            executable_path = Path(executable_path)
-            if not executable_path.exists():
-                raise falcon.HTTPBadRequest(title="executable_path does not exist")
-            if not executable_path.is_file():
-                raise falcon.HTTPBadRequest(title="executable_path is not a file")
-            if not executable_path.stat().st_mode & 0o100 == 0o100:
-                raise falcon.HTTPBadRequest(title="executable_path is not executable")
-            executable_path = executable_path.resolve().as_posix()
+            executable_path = self._resolve_executable(
+                executable_path or DEFAULT_EXECUTABLE_PATH, *options
+            )
+
+        bundles = body.get("bundles", [])
+        for name in bundles:
+            if name not in self.nsjail.bundles:
+                raise falcon.HTTPBadRequest(
+                    title="Unknown bundle", description=f"No bundle is named '{name}'"
+                )
 
+        deadline = None
+        if "deadline_ms" in body:
+            timeout = body["deadline_ms"] / 1000
+            if self.nsjail.config.time_limit:
+                timeout = min(timeout, self.nsjail.config.time_limit)
+            deadline = received_at + timeout
+
+        stream_files = body.get("stream_files", False)
+        if stream_files and ("archive" in body or body.get("attachments") == "link"):
+            raise falcon.HTTPBadRequest(
+                title="Incompatible options",
+                description="stream_files can't be combined with archive or linked attachments",
+            )
+        if executable_paths and (stream_files or body.get("attachments") == "link"):
+            raise falcon.HTTPBadRequest(
+                title="Incompatible options",
+                description="executable_paths can't be combined with stream_files or linked "
+                "attachments",
+            )
+
+        files = []
+        home_archive = None
+        job = None
         try:
-            result = self.nsjail.python3(
+            if "home_archive" in body:
+                home_archive = self._parse_home_archive(body["home_archive"])
+            for file in body.get("files", []):
+                files.append(self._parse_file(file))
+
+            run = functools.partial(
+                self.nsjail.python3,
                 py_args=body["args"],
-                files=[FileAttachment.from_dict(file) for file in body.get("files", [])],
+                files=files,
                 executable_path=executable_path,
+                priority=Priority(body.get("priority", Priority.INTERACTIVE)),
+                client=req.get_header("X-Snekbox-Client", default=DEFAULT_CLIENT),
+                deadline=deadline,
+                bundles=bundles,
+                archive=ArchiveFormat(body["archive"]) if "archive" in body else None,
+                compress=body.get("compress", False),
+                home_archive=home_archive,
+                jit=jit,
+                free_threading=free_threading,
+                environment=environment,
             )
+            if executable_paths:
+                results = _run_matrix(run, executable_paths, cancelled=_disconnect_check(req))
+                stream = _MatrixStream(zip(body["executable_paths"], results))
+            elif stream_files:
+                job = _LiveJob(
+                    lambda on_file, cancelled: run(on_file=on_file, cancelled=cancelled),
+                    _disconnect_check(req),
+                )
+                # The input files are written before the code runs, so they can be closed once
+                # the first output file arrives.
+                result = job.wait()
+            else:
+                result = run(cancelled=_disconnect_check(req))
         except ParsingError as e:
             raise falcon.HTTPBadRequest(title="Request file is invalid", description=str(e))
+        except QuotaExceededError as e:
+            raise falcon.HTTPTooManyRequests(
+                title="CPU time quota exceeded",
+                description=str(e),
+                retry_after=math.ceil(e.retry_after),
+            )
+        except DeadlineExceededError as e:
+            raise falcon.HTTPGatewayTimeout(title="Deadline exceeded", description=str(e))
+        except MemFSLimitError as e:
+            raise falcon.HTTPServiceUnavailable(
+                title="No file system available", description=str(e), retry_after=1
+            )
         except Exception:
             log.exception("An exception occurred while trying to process the request")
             raise falcon.HTTPInternalServerError
+        finally:
+            if home_archive is not None:
+                home_archive.close()
+            for file in files:
+                if isinstance(file, BlobAttachment):
+                    file.close()
+
+        if executable_paths:
+            resp.content_type = falcon.MEDIA_JSON
+            resp.content_length = stream.content_length
+            resp.stream = stream
+            return
+
+        if result is None:
+            resp.content_type = falcon.MEDIA_JSON
+            resp.stream = job
+            return
+
+        if body.get("attachments") == "link":
+            self._respond_with_links(resp, result)
+            return
 
-        resp.media = {
-            "stdout": result.stdout,
-            "returncode": result.returncode,
-            "files": [f.as_dict for f in result.files],
-        }
+        stream = _ResultStream(result)
+        resp.content_type = falcon.MEDIA_JSON
+        resp.content_length = stream.content_length
+        resp.stream = stream
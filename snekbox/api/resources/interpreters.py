@@ -0,0 +1,60 @@
+import falcon
+
+from snekbox.nsjail import NsJail
+
+__all__ = ("InterpretersResource",)
+
+
+class InterpretersResource:
+    """
+    Interpreters which evaluations can run.
+
+    Supported methods:
+
+    - GET /interpreters
+        List the installed interpreters
+    """
+
+    def __init__(self, nsjail: NsJail):
+        self.nsjail = nsjail
+
+    def on_get(self, req: falcon.Request, resp: falcon.Response) -> None:
+        """
+        List the interpreters which `POST /eval` requests can select with `executable_path`.
+
+        The interpreters are discovered when snekbox starts. `free_threading` is true for builds
+        without the GIL, and `jit` is true for builds with the experimental JIT compiler. Names
+        which link to another interpreter, such as `default`, are listed separately.
+
+        The response has an ETag which only changes when the interpreters do, so clients can
+        cache it and revalidate it with If-None-Match.
+
+        Response format:
+
+        >>> [
+        ...     {
+        ...         "name": "3.14t",
+        ...         "path": "/snekbin/python/3.14t/bin/python",
+        ...         "version": "3.14.0",
+        ...         "implementation": "cpython",
+        ...         "free_threading": true,
+        ...         "jit": false
+        ...     }
+        ... ]
+
+        Status codes:
+
+        - 200
+            Successful retrieval of the interpreters
+        - 304
+            The interpreters haven't changed since the ETag in If-None-Match
+        """
+        registry = self.nsjail.interpreters
+        resp.etag = registry.etag
+        if req.if_none_match and any(
+            tag == "*" or tag == registry.etag for tag in req.if_none_match
+        ):
+            resp.status = falcon.HTTP_304
+            return
+
+        resp.media = [interpreter.as_dict for interpreter in registry.interpreters]
@@ -0,0 +1,53 @@
+import falcon
+
+from snekbox.nsjail import NsJail
+
+__all__ = ("ReadyResource",)
+
+# Seconds after which clients are told to check again while snekbox is getting ready.
+RETRY_AFTER = 1
+
+
+class ReadyResource:
+    """
+    Readiness to accept evaluations, for load balancers and orchestrators.
+
+    Supported methods:
+
+    - GET /ready
+        Check whether the bytecode was built and the interpreters were warmed up
+    """
+
+    def __init__(self, nsjail: NsJail):
+        self.nsjail = nsjail
+
+    def on_get(self, req: falcon.Request, resp: falcon.Response) -> None:
+        """
+        Report whether snekbox is ready, i.e. whether the bytecode was built and it was warmed up.
+
+        If enabled, snekbox precompiles the modules of each interpreter when it starts, and then
+        runs each interpreter, so that the first evaluations after a deploy or restart don't pay
+        for compiling modules or reading them from disk. It can evaluate code meanwhile, but only
+        slowly, so it shouldn't be sent traffic until this returns 200.
+
+        Response format:
+
+        >>> {
+        ...     "ready": true
+        ... }
+
+        Status codes:
+
+        - 200
+            The bytecode was built and the warm-up finished, or they were disabled
+        - 503
+            The bytecode is still being built, or the interpreters are still being warmed up
+        """
+        if not self.nsjail.ready:
+            raise falcon.HTTPServiceUnavailable(
+                title="Not ready",
+                description="The bytecode is being built or the interpreters are being warmed up.",
+                retry_after=RETRY_AFTER,
+            )
+
+        resp.media = {"ready": True}
@@ -0,0 +1,146 @@
+import falcon
+
+from snekbox.nsjail import NsJail
+
+__all__ = ("StatsResource",)
+
+
+class StatsResource:
+    """
+    Runtime statistics for monitoring.
+
+    Supported methods:
+
+    - GET /stats
+        Return the state of the job scheduler, job counters, concurrency estimate, MemFS pool,
+        network namespace pool, blob store, download store, and interpreter warm-up
+    """
+
+    def __init__(self, nsjail: NsJail):
+        self.nsjail = nsjail
+
+    def on_get(self, req: falcon.Request, resp: falcon.Response) -> None:
+        """
+        Return statistics about the sandbox slots and the jobs queued for them.
+
+        Wait times are in seconds and are tracked separately for each priority class.
+        `cancelled` counts the jobs dropped or terminated because the client disconnected,
+        `expired` the jobs dropped because their deadline passed before they started, and
+        `deadline_killed` the jobs killed because their deadline passed while they ran.
+
+        `capacity` holds the inputs and result of the last concurrency estimate if the
+        concurrency is sized automatically, and is null otherwise. Memory is in bytes.
+
+        `memfs` counts the tmpfs instances which were mounted, reused from the pool, and
+        unmounted, either because the pool was full or because they failed their integrity check.
+        `held` is the number of instances held by jobs or by responses still being sent, and
+        `limit` the maximum number which can be held at once.
+        `netns` likewise counts the network namespaces which jails joined if they're pooled, and
+        is null otherwise.
+
+        `blobs` holds the number and total size in bytes of the stored blobs, and counts the blobs
+        added and evicted and the references to blobs which were and weren't stored.
+
+        `downloads` holds the number and total size in bytes of the output files retained for
+        download, and counts the files added, served, expired, and evicted to make space.
+
+        `warmup` holds whether the interpreters were warmed up, how long that took in total, and
+        the time of the first (cold) and second (warm) evaluation with each interpreter. Its
+        `duration` is null until it finishes, and `interpreters` is empty if it's disabled.
+
+        Response format:
+
+        >>> {
+        ...     "blobs": {
+        ...         "count": 2,
+        ...         "size": 1048576,
+        ...         "max_size": 1073741824,
+        ...         "added": 3,
+        ...         "hits": 25,
+        ...         "misses": 1,
+        ...         "evicted": 1
+        ...     },
+        ...     "capacity": {
+        ...         "cpus": 4.0,
+        ...         "memory_limit": 4294967296,
+        ...         "memory_available": 3221225472,
+        ...         "cpu_per_job": 1.0,
+        ...         "memory_per_job": 123731968,
+        ...         "running": 1,
+        ...         "concurrency": 4
+        ...     },
+        ...     "downloads": {
+        ...         "count": 1,
+        ...         "size": 57344,
+        ...         "max_size": 1073741824,
+        ...         "added": 4,
+        ...         "served": 2,
+        ...         "expired": 3,
+        ...         "evicted": 0
+        ...     },
+        ...     "jobs": {
+        ...         "cancelled": 3,
+        ...         "expired": 1,
+        ...         "deadline_killed": 2
+        ...     },
+        ...     "memfs": {
+        ...         "size": 2,
+        ...         "idle": 1,
+        ...         "created": 3,
+        ...         "reused": 40,
+        ...         "discarded": 1,
+        ...         "held": 1,
+        ...         "limit": 2
+        ...     },
+        ...     "netns": {
+        ...         "size": 2,
+        ...         "idle": 2,
+        ...         "created": 3,
+        ...         "reused": 41,
+        ...         "discarded": 0
+        ...     },
+        ...     "scheduler": {
+        ...         "capacity": 2,
+        ...         "reserved_interactive": 1,
+        ...         "running": 1,
+        ...         "lanes": {
+        ...             "interactive": {
+        ...                 "queued": 0,
+        ...                 "running": 1,
+        ...                 "started": 12,
+        ...                 "wait_time_total": 0.02,
+        ...                 "wait_time_max": 0.01,
+        ...                 "wait_time_last": 0.0
+        ...             },
+        ...             "batch": {...}
+        ...         },
+        ...         "clients": {
+        ...             "bot": {"weight": 1.0, "active": 1, "cpu_time": 0.0, "quota": null}
+        ...         }
+        ...     },
+        ...     "warmup": {
+        ...         "ready": true,
+        ...         "duration": 1.3,
+        ...         "interpreters": {
+        ...             "3.14": {"cold": 0.48, "warm": 0.05, "returncode": 0}
+        ...         }
+        ...     }
+        ... }
+
+        Status codes:
+
+        - 200
+            Successful retrieval of the statistics
+        """
+        capacity = self.nsjail.capacity
+        netns_pool = self.nsjail.netns_pool
+        resp.media = {
+            "blobs": self.nsjail.blobs.stats(),
+            "capacity": capacity.as_dict if capacity else None,
+            "downloads": self.nsjail.downloads.stats(),
+            "jobs": self.nsjail.counters.as_dict(),
+            "memfs": self.nsjail.memfs_pool.stats(),
+            "netns": netns_pool.stats() if netns_pool else None,
+            "scheduler": self.nsjail.scheduler.stats(),
+            "warmup": self.nsjail.warmup.stats(),
+        }
@@ -2,7 +2,17 @@ import falcon
 
 from snekbox.nsjail import NsJail
 
-from .resources import EvalResource
+from .resources import (
+    BlobResource,
+    BlobsResource,
+    BundlesResource,
+    DownloadResource,
+    EnvironmentsResource,
+    EvalResource,
+    InterpretersResource,
+    ReadyResource,
+    StatsResource,
+)
 
 
 class SnekAPI(falcon.App):
@@ -15,6 +25,22 @@ class SnekAPI(falcon.App):
 
     - /eval
         Evaluation of Python code
+    - /blobs
+        Upload of files to be referenced by evaluations
+    - /blobs/{digest}
+        A stored blob
+    - /bundles
+        Read-only datasets which evaluations can mount
+    - /downloads/{token}
+        An output file retained for download
+    - /environments
+        Package environments which evaluations can use
+    - /interpreters
+        Interpreters which evaluations can run
+    - /ready
+        Readiness to accept evaluations
+    - /stats
+        Runtime statistics for monitoring
 
     Error response format:
 
@@ -29,3 +55,11 @@ class SnekAPI(falcon.App):
 
         nsjail = NsJail(*args, **kwargs)
         self.add_route("/eval", EvalResource(nsjail))
+        self.add_route("/blobs", BlobsResource(nsjail))
+        self.add_route("/blobs/{digest}", BlobResource(nsjail))
+        self.add_route("/bundles", BundlesResource(nsjail))
+        self.add_route("/downloads/{token}", DownloadResource(nsjail))
+        self.add_route("/environments", EnvironmentsResource(nsjail))
+        self.add_route("/interpreters", InterpretersResource(nsjail))
+        self.add_route("/ready", ReadyResource(nsjail))
+        self.add_route("/stats", StatsResource(nsjail))
@@ -0,0 +1,134 @@
+"""Initialisation of the host, done once and shared by every NsJail created afterwards."""
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from dataclasses import dataclass
+from functools import cached_property
+
+from google.protobuf import text_format
+
+from snekbox import limits
+from snekbox.config_pb2 import NsJailConfig
+from snekbox.interpreters import InterpreterRegistry
+
+__all__ = ("DEFAULT_CONFIG_PATH", "Host", "get", "preload", "read_config")
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = "./config/snekbox.cfg"
+
+# Hosts initialised by `preload`, by the real path of their config.
+_preloaded: dict[str, Host] = {}
+
+
+def _read_config_text(config_path: str) -> str:
+    """Read the NsJail config at `config_path`, exiting if it can't be read."""
+    try:
+        with open(config_path, encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        log.fatal(f"The NsJail config at {config_path!r} could not be found.")
+        sys.exit(1)
+    except OSError as e:
+        log.fatal(f"The NsJail config at {config_path!r} could not be read.", exc_info=e)
+        sys.exit(1)
+
+
+def _parse_config(config_path: str, config_text: str) -> NsJailConfig:
+    """Parse the text of the NsJail config at `config_path`, exiting if it's invalid."""
+    config = NsJailConfig()
+    try:
+        text_format.Parse(config_text, config)
+    except text_format.ParseError as e:
+        log.fatal(f"The NsJail config at {config_path!r} could not be parsed.", exc_info=e)
+        sys.exit(1)
+
+    return config
+
+
+def read_config(config_path: str) -> NsJailConfig:
+    """Read the NsJail config at `config_path` and return a protobuf Message object."""
+    return _parse_config(config_path, _read_config_text(config_path))
+
+
+@dataclass(frozen=True)
+class Host:
+    """
+    The parsed NsJail config, and the state of the host which follows from it.
+
+    Initialising the host sets up the cgroups for NsJail, probes the swap controller, which
+    creates and removes a cgroup, and probes every interpreter.
+    """
+
+    config_path: str
+    config_text: str
+    config: NsJailConfig
+    cgroup_version: int
+    ignore_swap_limits: bool
+    # The environment variables which the config gives the sandbox.
+    env: dict[str, str]
+    interpreters: InterpreterRegistry
+
+    @classmethod
+    def init(cls, config_path: str = DEFAULT_CONFIG_PATH) -> Host:
+        """Read the config at `config_path` and initialise the host for it."""
+        config_text = _read_config_text(config_path)
+        return cls._init(config_path, config_text)
+
+    @classmethod
+    def _init(cls, config_path: str, config_text: str) -> Host:
+        """Initialise the host for the config at `config_path`, which has already been read."""
+        config = _parse_config(config_path, config_text)
+        cgroup_version = limits.cgroup.init(config)
+        ignore_swap_limits = limits.swap.should_ignore_limit(config, cgroup_version)
+        log.info(f"Assuming cgroup version {cgroup_version}.")
+
+        env = dict(var.partition("=")[::2] for var in config.envar)
+        interpreters = InterpreterRegistry(env=env)
+        interpreters.refresh()
+
+        return cls(
+            config_path, config_text, config, cgroup_version, ignore_swap_limits, env, interpreters
+        )
+
+    @cached_property
+    def nsjail_args(self) -> tuple[str, ...]:
+        """The arguments which every jail is started with for this host, ahead of the others."""
+        args: tuple[str, ...] = ()
+        if self.cgroup_version == 2:
+            args += ("--use_cgroupv2",)
+
+        if self.ignore_swap_limits:
+            args += ("--cgroup_mem_memsw_max", "0", "--cgroup_mem_swap_max", "-1")
+
+        return args
+
+
+def preload(config_path: str = DEFAULT_CONFIG_PATH) -> Host:
+    """
+    Initialise the host for `config_path` and keep it for the NsJail instances created later.
+
+    When Gunicorn's master calls this before forking its workers, they inherit the host rather
+    than each initialising it again.
+    """
+    host = Host.init(config_path)
+    _preloaded[os.path.realpath(config_path)] = host
+    log.info(f"Preloaded the host for {config_path!r}.")
+    return host
+
+
+def get(config_path: str = DEFAULT_CONFIG_PATH) -> Host:
+    """
+    Return the host preloaded for `config_path`, or else initialise one.
+
+    A preloaded host is only used if its config is unchanged; otherwise the config was edited
+    since it was preloaded, and the host is initialised again, but not kept.
+    """
+    config_text = _read_config_text(config_path)
+    host = _preloaded.get(os.path.realpath(config_path))
+    if host is not None and host.config_text == config_text:
+        return host
+
+    return Host._init(config_path, config_text)
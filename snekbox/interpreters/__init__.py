@@ -0,0 +1,14 @@
+from .environments import Environment, load_environments
+from .pycache import BytecodeCache
+from .registry import Interpreter, InterpreterRegistry
+from .warmup import Warmup, WarmupTiming
+
+__all__ = (
+    "BytecodeCache",
+    "Environment",
+    "Interpreter",
+    "InterpreterRegistry",
+    "Warmup",
+    "WarmupTiming",
+    "load_environments",
+)
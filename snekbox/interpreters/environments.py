@@ -0,0 +1,97 @@
+"""Named package environments which requests can select instead of the shared user base."""
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from snekbox.interpreters.registry import Interpreter
+
+__all__ = ("ENVIRONMENTS_ROOT", "Environment", "load_environments")
+
+log = logging.getLogger(__name__)
+
+ENVIRONMENTS_ROOT = Path("/environments")
+NAME_PATTERN = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]*")
+# Matches the directories of the user site-packages of each interpreter, e.g. lib/python3.14t.
+_SITE_PATTERN = re.compile(r"python(\d+\.\d+t?)")
+
+
+@dataclass(frozen=True)
+class Environment:
+    """
+    A user base with packages installed for one or more interpreters.
+
+    It's mounted read-only at the same path in the sandbox as on the host, and `PYTHONUSERBASE`
+    points at it, so the bytecode and import index built on the host remain valid.
+    """
+
+    name: str
+    path: Path
+    # The versions whose user site-packages are in the environment, e.g. "3.14t".
+    sites: frozenset[str]
+
+    @property
+    def as_dict(self) -> dict[str, str | list[str]]:
+        """Convert the environment to a dict."""
+        return {"name": self.name, "path": str(self.path), "sites": sorted(self.sites)}
+
+    def supports(self, interpreter: Interpreter) -> bool:
+        """Return whether the environment has packages for `interpreter`."""
+        return _site_name(interpreter) in self.sites
+
+    @classmethod
+    def from_path(cls, path: Path) -> Environment:
+        """
+        Create an environment from a user base directory, named after it.
+
+        Raises:
+            ValueError: If the name or path is invalid.
+        """
+        if not NAME_PATTERN.fullmatch(path.name):
+            raise ValueError(f"Invalid environment name {path.name!r}")
+        # NsJail separates the source and destination of mounts with a colon.
+        if ":" in str(path):
+            raise ValueError(f"Path of environment {path.name!r} may not contain a colon")
+
+        sites = frozenset(
+            match[1]
+            for site in path.glob("lib/python*/site-packages")
+            if (match := _SITE_PATTERN.fullmatch(site.parent.name))
+        )
+        return cls(path.name, path, sites)
+
+
+def _site_name(interpreter: Interpreter) -> str:
+    """Return the version in the name of the user site-packages of `interpreter`."""
+    major, minor = interpreter.version_info[:2]
+    return f"{major}.{minor}{'t' if interpreter.free_threading else ''}"
+
+
+def load_environments(root: str | Path | None = ENVIRONMENTS_ROOT) -> dict[str, Environment]:
+    """
+    Create an environment from each directory in `root`, or none if it's None or missing.
+
+    Directories with invalid names are logged and skipped.
+    """
+    if root is None:
+        return {}
+
+    root = Path(root)
+    try:
+        paths = sorted(path for path in root.iterdir() if path.is_dir())
+    except FileNotFoundError:
+        return {}
+
+    environments = {}
+    for path in paths:
+        try:
+            environment = Environment.from_path(path)
+        except ValueError as e:
+            log.warning(f"Skipping environment: {e}")
+            continue
+        log.info(f"Loaded environment {environment.name!r} for {sorted(environment.sites)}.")
+        environments[environment.name] = environment
+
+    return environments
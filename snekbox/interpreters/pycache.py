@@ -0,0 +1,236 @@
+"""Precompiled bytecode of the interpreters' standard libraries and installed packages."""
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from pathlib import Path, PurePosixPath
+
+log = logging.getLogger(__name__)
+
+__all__ = ("BytecodeCache",)
+
+PYCACHE_DIR = PurePosixPath("/pycache")
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".lock"
+BUILD_PREFIX = ".build-"
+# Maximum time in seconds to compile the modules of one interpreter.
+COMPILE_TIMEOUT = 600
+
+# Prints the directories an interpreter imports from, including the user site-packages.
+_PATHS_SCRIPT = "import json, site, sys; print(json.dumps([*sys.path, site.getusersitepackages()]))"
+
+
+def _source_dirs(paths: Iterable[str]) -> list[str]:
+    """Return the existing directories among `paths`, without any nested within another."""
+    dirs: list[str] = []
+    for path in sorted({os.path.normpath(p) for p in paths if os.path.isabs(p)}):
+        if not os.path.isdir(path):
+            continue
+        if dirs and (path + "/").startswith(dirs[-1] + "/"):
+            continue
+        dirs.append(path)
+    return dirs
+
+
+def _fingerprint(executable: str, dirs: Iterable[str]) -> tuple[str, int]:
+    """
+    Return a digest of the interpreter and the sources in `dirs`, and the number of sources.
+
+    The digest covers the path, size, and modification time of every module, so it changes
+    whenever a package is installed, upgraded, or removed.
+    """
+    digest = hashlib.sha256()
+    st = os.stat(executable)
+    digest.update(f"{executable}\0{st.st_size}\0{st.st_mtime_ns}\0".encode())
+
+    count = 0
+    for directory in dirs:
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+            for name in sorted(filenames):
+                if not name.endswith(".py"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                digest.update(f"{path}\0{st.st_size}\0{st.st_mtime_ns}\0".encode())
+                count += 1
+
+    return digest.hexdigest(), count
+
+
+class BytecodeCache:
+    """
+    A read-only tree of precompiled bytecode for each interpreter, outside the source tree.
+
+    The interpreters are built without bytecode and the sandbox can't write any, so otherwise
+    every module imported is compiled from source by every sandbox. Instead, the modules of each
+    interpreter, including the packages in the user base, are compiled once on the host into a
+    directory of their own. It's mounted read-only in the sandbox, and `PYTHONPYCACHEPREFIX`
+    points the interpreter at it.
+
+    Each directory has a manifest with a fingerprint of the sources it was built from. It's
+    verified when the cache is updated, and the directory is rebuilt if any module was added,
+    removed, or changed. The bytecode is validated against the source's timestamp as usual, so
+    a stale cache is only slower, never wrong.
+
+    Building the cache can take minutes, so it's usually done in a background thread. Sandboxes
+    started meanwhile run without the bytecode of the interpreters which aren't done yet.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        env: Mapping[str, str] | None = None,
+        user_bases: Iterable[str | Path] = (),
+    ):
+        """
+        Create a cache in `root`; it's empty until it's updated.
+
+        Args:
+            root: Directory to keep the bytecode in.
+            env: Environment variables of the sandbox, which the interpreters are run with to
+                find their import paths, such as `PYTHONUSERBASE`.
+            user_bases: Other user bases which sandboxes may use instead, such as those of
+                named environments, whose packages are compiled as well.
+        """
+        self.root = Path(root)
+        self.env = {k: v for k, v in (env or {}).items() if k != "PYTHONPYCACHEPREFIX"}
+        self.user_bases = [str(path) for path in user_bases]
+        # Maps the resolved paths of executables to the directories of their bytecode.
+        self._dirs: dict[str, Path] = {}
+        self._done = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        """Whether the cache was updated since it was created."""
+        return self._done.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait for the cache to be updated and return whether it has."""
+        return self._done.wait(timeout)
+
+    def start(self, executables: Iterable[str]) -> threading.Thread:
+        """Update the bytecode of `executables` in a thread of its own and return the thread."""
+        thread = threading.Thread(
+            target=self.update, args=(tuple(executables),), name="pycache", daemon=True
+        )
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _name(executable: str) -> str:
+        """Return the name of the directory for the resolved path `executable`."""
+        return hashlib.sha256(executable.encode()).hexdigest()[:16]
+
+    def directory(self, real_path: str) -> Path | None:
+        """Return the directory of bytecode for the resolved path of an executable, if any."""
+        return self._dirs.get(real_path)
+
+    def update(self, executables: Iterable[str]) -> None:
+        """
+        Verify the bytecode of each of `executables`, and rebuild any which is missing or stale.
+
+        Processes updating the same cache wait for each other, so only one of them builds it.
+        Interpreters which fail to run are logged and left without a cache. The cache is ready
+        afterwards, even if it failed.
+        """
+        try:
+            self._update_all(executables)
+        finally:
+            self._done.set()
+
+    def _update_all(self, executables: Iterable[str]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / LOCK_NAME, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            for path in self.root.glob(f"{BUILD_PREFIX}*"):
+                # Left over by a build which was interrupted.
+                shutil.rmtree(path, ignore_errors=True)
+
+            for executable in executables:
+                real_path = os.path.realpath(executable)
+                try:
+                    self._dirs[real_path] = self._update(real_path)
+                except (OSError, subprocess.SubprocessError, ValueError) as e:
+                    log.warning(f"Failed to precompile the modules of {executable!r}.", exc_info=e)
+                    self._dirs.pop(real_path, None)
+
+    def _import_dirs(self, executable: str) -> list[str]:
+        """Return the directories `executable` imports from with any of the user bases."""
+        paths = []
+        for env in (self.env, *({**self.env, "PYTHONUSERBASE": b} for b in self.user_bases)):
+            result = subprocess.run(
+                [executable, "-c", _PATHS_SCRIPT],
+                env=env,
+                capture_output=True,
+                check=True,
+                text=True,
+                timeout=COMPILE_TIMEOUT,
+            )
+            paths += json.loads(result.stdout)
+        return _source_dirs(paths)
+
+    def _update(self, executable: str) -> Path:
+        """Verify or rebuild the bytecode of `executable` and return its directory."""
+        directory = self.root / self._name(executable)
+        dirs = self._import_dirs(executable)
+        fingerprint, count = _fingerprint(executable, dirs)
+
+        try:
+            manifest = json.loads((directory / MANIFEST_NAME).read_text("utf-8"))
+        except (OSError, ValueError):
+            manifest = {}
+        if manifest.get("fingerprint") == fingerprint:
+            log.info(f"Precompiled bytecode of {executable!r} is up to date.")
+            return directory
+
+        log.info(f"Precompiling {count} modules of {executable!r} in {dirs}.")
+        start = time.monotonic()
+        build = Path(tempfile.mkdtemp(prefix=BUILD_PREFIX, dir=self.root))
+        try:
+            result = subprocess.run(
+                [executable, "-m", "compileall", "-q", "-j", "0", *dirs],
+                env={**self.env, "PYTHONPYCACHEPREFIX": str(build)},
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                timeout=COMPILE_TIMEOUT,
+            )
+            if result.returncode:
+                # Some packages ship modules which don't compile, such as test data.
+                failed = result.stdout.count("*** Error compiling")
+                log.info(f"{failed} modules of {executable!r} failed to compile.")
+                log.debug(result.stdout)
+
+            manifest = {"executable": executable, "fingerprint": fingerprint, "modules": count}
+            (build / MANIFEST_NAME).write_text(json.dumps(manifest), "utf-8")
+            # The sandbox's user has to be able to read it; mkdtemp only allows the owner.
+            build.chmod(0o755)
+
+            # Swap the directories rather than build in place, so that sandboxes started in the
+            # meantime see either all or none of the new bytecode.
+            old = None
+            if directory.exists():
+                old = Path(tempfile.mkdtemp(prefix=BUILD_PREFIX, dir=self.root))
+                directory.rename(old / "old")
+            build.rename(directory)
+        except BaseException:
+            shutil.rmtree(build, ignore_errors=True)
+            raise
+
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+        log.info(f"Precompiled the modules of {executable!r} in {time.monotonic() - start:.1f}s.")
+        return directory
@@ -0,0 +1,166 @@
+"""Discovery of the interpreters installed for the sandbox."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import subprocess
+import threading
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+__all__ = ("INTERPRETERS_ROOT", "Interpreter", "InterpreterRegistry")
+
+INTERPRETERS_ROOT = Path("/snekbin/python")
+# Maximum time in seconds for an interpreter to describe itself.
+PROBE_TIMEOUT = 30
+
+# Prints the version and capabilities of an interpreter.
+_PROBE_SCRIPT = """\
+import json, platform, sys, sysconfig
+jit = getattr(sys, "_jit", None)
+print(json.dumps({
+    "version": platform.python_version(),
+    "implementation": sys.implementation.name,
+    "free_threading": bool(sysconfig.get_config_var("Py_GIL_DISABLED")),
+    "jit": jit.is_available() if jit else "--enable-experimental-jit" in (
+        sysconfig.get_config_var("CONFIG_ARGS") or ""
+    ),
+}))
+"""
+
+
+@dataclass(frozen=True)
+class Interpreter:
+    """An interpreter installed in its own directory, such as `/snekbin/python/3.14t`."""
+
+    name: str
+    path: str
+    real_path: str
+    version: str
+    implementation: str
+    free_threading: bool
+    jit: bool
+
+    @property
+    def version_info(self) -> tuple[int, ...]:
+        """The numeric parts of the version, e.g. (3, 14, 0) for 3.14.0rc1."""
+        return tuple(int(part) for part in re.findall(r"\d+", self.version)[:3])
+
+    @property
+    def as_dict(self) -> dict[str, str | bool]:
+        """Convert the interpreter to a dict, without its resolved path on the host."""
+        data = asdict(self)
+        del data["real_path"]
+        return data
+
+
+class InterpreterRegistry:
+    """
+    The interpreters in `INTERPRETERS_ROOT`, probed once rather than checked on every request.
+
+    Each directory with an executable `bin/python` is an interpreter, named after the directory.
+    Directories which link to the same interpreter, such as `default`, are listed under each
+    name but only probed once.
+    """
+
+    def __init__(self, root: str | Path = INTERPRETERS_ROOT, env: Mapping[str, str] | None = None):
+        """
+        Create an empty registry of the interpreters in `root`; it's filled when it's refreshed.
+
+        Args:
+            root: Directory containing a directory for each interpreter.
+            env: Environment variables to run the interpreters with.
+        """
+        self.root = Path(root)
+        self.env = dict(env or {})
+        self._lock = threading.Lock()
+        # Maps the paths of the executables, as given and resolved, to their interpreters.
+        self._by_path: dict[str, Interpreter] = {}
+        self._interpreters: tuple[Interpreter, ...] = ()
+        self.etag = ""
+
+    def _probe(self, real_path: str) -> dict[str, str | bool]:
+        """Run the interpreter at `real_path` and return its version and capabilities."""
+        result = subprocess.run(
+            [real_path, "-c", _PROBE_SCRIPT],
+            env=self.env,
+            capture_output=True,
+            check=True,
+            text=True,
+            timeout=PROBE_TIMEOUT,
+        )
+        return json.loads(result.stdout)
+
+    def refresh(self) -> None:
+        """Discover the interpreters again, replacing those found before."""
+        probed: dict[str, dict[str, str | bool] | None] = {}
+        interpreters = []
+        for path in sorted(self.root.glob("*/bin/python")):
+            if not os.access(path, os.X_OK):
+                continue
+
+            real_path = os.path.realpath(path)
+            if real_path not in probed:
+                try:
+                    probed[real_path] = self._probe(real_path)
+                except (OSError, subprocess.SubprocessError, ValueError) as e:
+                    log.warning(f"Failed to probe the interpreter at {str(path)!r}.", exc_info=e)
+                    probed[real_path] = None
+
+            info = probed[real_path]
+            if info is not None:
+                name = path.parent.parent.name
+                interpreters.append(Interpreter(name, str(path), real_path, **info))
+
+        by_path = {}
+        for interpreter in interpreters:
+            by_path.setdefault(interpreter.path, interpreter)
+            by_path.setdefault(interpreter.real_path, interpreter)
+
+        listing = json.dumps([i.as_dict for i in interpreters], sort_keys=True)
+        with self._lock:
+            self._interpreters = tuple(interpreters)
+            self._by_path = by_path
+            self.etag = hashlib.sha256(listing.encode()).hexdigest()[:16]
+
+        names = ", ".join(f"{i.name} ({i.version})" for i in interpreters) or "none"
+        log.info(f"Found interpreters: {names}.")
+
+    @property
+    def interpreters(self) -> tuple[Interpreter, ...]:
+        """The interpreters, sorted by name."""
+        return self._interpreters
+
+    @property
+    def executables(self) -> list[str]:
+        """The paths of the distinct executables, sorted by path."""
+        return sorted({interpreter.real_path for interpreter in self._interpreters})
+
+    def get(self, path: str) -> Interpreter | None:
+        """Return the interpreter whose executable is at `path`, as given or resolved, if any."""
+        return self._by_path.get(path)
+
+    def select(
+        self, default: str, *, free_threading: bool = False, jit: bool = False
+    ) -> Interpreter | None:
+        """
+        Return an interpreter with the given capabilities, preferring the one at `default`.
+
+        If the default interpreter lacks any of them, return the newest one which has them all,
+        or None if there's no such interpreter.
+        """
+        candidates = [
+            interpreter
+            for interpreter in self._interpreters
+            if (interpreter.free_threading or not free_threading) and (interpreter.jit or not jit)
+        ]
+        preferred = self.get(default)
+        if preferred in candidates:
+            return preferred
+        return max(candidates, key=lambda i: i.version_info, default=None)
@@ -0,0 +1,151 @@
+"""Warm-up evaluations run with each interpreter before snekbox reports itself ready."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import asdict, dataclass
+
+from snekbox.interpreters.registry import Interpreter
+from snekbox.result import EvalResult
+
+log = logging.getLogger(__name__)
+
+__all__ = ("Warmup", "WarmupTiming")
+
+# Imports each of the modules given as arguments, ignoring those which aren't installed.
+_WARMUP_SCRIPT = """\
+import sys
+for name in sys.argv[1:]:
+    try:
+        __import__(name)
+    except ImportError:
+        pass
+"""
+
+
+@dataclass(frozen=True)
+class WarmupTiming:
+    """Time in seconds of the first and second warm-up evaluation with an interpreter."""
+
+    cold: float
+    warm: float
+    returncode: int | None
+
+
+class Warmup:
+    """
+    Evaluations which load each interpreter, and optionally some modules, into the page cache.
+
+    After a deploy, the first evaluations with each interpreter read its binary, shared
+    libraries, and packages from disk. Instead, each interpreter is run twice when snekbox
+    starts, and it's only ready once every interpreter was. The time of the first run is
+    the cold start-up, and that of the second the warm start-up which requests will see.
+    """
+
+    def __init__(self, modules: Iterable[str] = ()):
+        """
+        Create a warm-up which hasn't run yet; it isn't ready until it runs or is skipped.
+
+        Args:
+            modules: Names of modules to import in each warm-up evaluation. Modules which
+                an interpreter can't import are ignored.
+        """
+        self.modules = tuple(modules)
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._timings: dict[str, WarmupTiming] = {}
+        self._duration: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether every interpreter was warmed up, or the warm-up was skipped."""
+        return self._done.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait for the warm-up to finish and return whether it has."""
+        return self._done.wait(timeout)
+
+    def skip(self) -> None:
+        """Report ready without warming up any interpreter."""
+        self._done.set()
+
+    def start(
+        self,
+        evaluate: Callable[[str, Sequence[str]], EvalResult],
+        interpreters: Iterable[Interpreter],
+        after: Callable[[], object] | None = None,
+    ) -> threading.Thread:
+        """
+        Warm up `interpreters` in a thread of its own and return the thread.
+
+        Args:
+            evaluate: Function which evaluates the given Python arguments with the interpreter
+                at the given resolved path.
+            interpreters: Interpreters to warm up. Those which share an executable are only
+                run once.
+            after: Function which the thread calls first, and which blocks until the warm-up
+                can begin, such as until the bytecode is built.
+        """
+        interpreters = tuple(interpreters)
+
+        def target() -> None:
+            if after is not None:
+                after()
+            self.run(evaluate, interpreters)
+
+        thread = threading.Thread(target=target, name="warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def run(
+        self,
+        evaluate: Callable[[str, Sequence[str]], EvalResult],
+        interpreters: Iterable[Interpreter],
+    ) -> None:
+        """Warm up `interpreters` and then report ready, even if some of them failed."""
+        start = time.monotonic()
+        timings: dict[str, WarmupTiming] = {}
+        try:
+            for interpreter in interpreters:
+                if interpreter.real_path not in timings:
+                    timings[interpreter.real_path] = self._warm_up(evaluate, interpreter)
+                with self._lock:
+                    self._timings[interpreter.name] = timings[interpreter.real_path]
+        finally:
+            self._duration = time.monotonic() - start
+            self._done.set()
+            log.info(f"Warmed up {len(timings)} interpreters in {self._duration:.1f}s.")
+
+    def _warm_up(
+        self, evaluate: Callable[[str, Sequence[str]], EvalResult], interpreter: Interpreter
+    ) -> WarmupTiming:
+        """Evaluate the warm-up script twice with `interpreter` and return the timings."""
+        args = ["-c", _WARMUP_SCRIPT, *self.modules]
+        durations = []
+        returncode = None
+        for _ in range(2):
+            start = time.monotonic()
+            try:
+                result = evaluate(interpreter.real_path, args)
+            except Exception as e:
+                log.warning(f"Failed to warm up the interpreter {interpreter.name!r}.", exc_info=e)
+                returncode = None
+            else:
+                with result:
+                    returncode = result.returncode
+            durations.append(time.monotonic() - start)
+
+        timing = WarmupTiming(*durations, returncode)
+        log.info(
+            f"Warmed up {interpreter.name!r}: cold {timing.cold * 1e3:.0f}ms, "
+            f"warm {timing.warm * 1e3:.0f}ms, returncode {timing.returncode}."
+        )
+        return timing
+
+    def stats(self) -> dict[str, object]:
+        """Return whether the warm-up finished, how long it took, and each interpreter's timings."""
+        with self._lock:
+            timings = {name: asdict(timing) for name, timing in self._timings.items()}
+        return {"ready": self.ready, "duration": self._duration, "interpreters": timings}
@@ -1,3 +1,3 @@
-from . import cgroup, swap, timed
+from . import capacity, cgroup, swap, timed
 
-__all__ = ("cgroup", "swap", "timed")
+__all__ = ("capacity", "cgroup", "swap", "timed")
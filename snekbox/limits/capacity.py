@@ -0,0 +1,181 @@
+"""Estimate how many sandboxes the host can run concurrently."""
+from __future__ import annotations
+
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+
+from snekbox.config_pb2 import NsJailConfig
+
+__all__ = ("Capacity", "estimate", "get_cpus", "get_memory")
+
+# Memory kept free for snekbox itself, which isn't accounted for in the per-job limits.
+MEMORY_RESERVE = 256 * 1024**2
+
+
+@dataclass(frozen=True)
+class Capacity:
+    """The inputs and result of a concurrency estimate."""
+
+    cpus: float
+    memory_limit: int
+    memory_available: int
+    cpu_per_job: float
+    memory_per_job: int
+    running: int
+    concurrency: int
+
+    @property
+    def as_dict(self) -> dict[str, float | int]:
+        """Convert the estimate to a dict."""
+        return {
+            "cpus": self.cpus,
+            "memory_limit": self.memory_limit,
+            "memory_available": self.memory_available,
+            "cpu_per_job": self.cpu_per_job,
+            "memory_per_job": self.memory_per_job,
+            "running": self.running,
+            "concurrency": self.concurrency,
+        }
+
+
+def _own_cgroups() -> dict[str, PurePosixPath]:
+    """Return a mapping of cgroup controller names to the cgroup of this process."""
+    cgroups = {}
+    with open("/proc/self/cgroup", encoding="utf-8") as f:
+        for line in f:
+            _, controllers, path = line.rstrip("\n").split(":", 2)
+            for controller in controllers.split(",") if controllers else ("",):
+                cgroups[controller] = PurePosixPath(path)
+
+    return cgroups
+
+
+def _read_hierarchy(mount: str, cgroup: PurePosixPath | None, filename: str) -> list[str]:
+    """
+    Read `filename` from `cgroup` and each of its ancestors up to the root at `mount`.
+
+    The cgroup paths in /proc/self/cgroup may not exist within a container's cgroup
+    namespace, in which case only the root is read.
+    """
+    values = []
+    paths = [cgroup, *cgroup.parents] if cgroup is not None else [PurePosixPath("/")]
+    for path in paths:
+        file = Path(mount, path.relative_to("/"), filename)
+        try:
+            values.append(file.read_text().strip())
+        except OSError:
+            continue
+
+    return values
+
+
+def get_cpus(config: NsJailConfig, cgroup_version: int) -> float:
+    """Return the number of CPUs available to this process, accounting for cgroup quotas."""
+    cpus = float(len(os.sched_getaffinity(0)))
+    try:
+        cgroups = _own_cgroups()
+    except OSError:
+        return cpus
+
+    if cgroup_version == 2:
+        for value in _read_hierarchy(config.cgroupv2_mount, cgroups.get(""), "cpu.max"):
+            quota, period = value.split()
+            if quota != "max":
+                cpus = min(cpus, int(quota) / int(period))
+    else:
+        mount = config.cgroup_cpu_mount
+        quotas = _read_hierarchy(mount, cgroups.get("cpu"), "cpu.cfs_quota_us")
+        periods = _read_hierarchy(mount, cgroups.get("cpu"), "cpu.cfs_period_us")
+        for quota, period in zip(quotas, periods):
+            if int(quota) > 0:
+                cpus = min(cpus, int(quota) / int(period))
+
+    return cpus
+
+
+def _meminfo() -> dict[str, int]:
+    """Return the values in /proc/meminfo in bytes."""
+    info = {}
+    with open("/proc/meminfo", "rb") as f:
+        for line in f:
+            name, value, *_ = line.split()
+            info[name.rstrip(b":").decode()] = int(value) * 1024
+
+    return info
+
+
+def get_memory(config: NsJailConfig, cgroup_version: int) -> tuple[int, int]:
+    """
+    Return the memory limit of this process and the amount of it currently available in bytes.
+
+    The limit is the lowest of the system's total memory and any cgroup limits; the available
+    memory is likewise bounded by the system's available memory and the cgroup's usage.
+    """
+    meminfo = _meminfo()
+    limit = meminfo["MemTotal"]
+    available = meminfo.get("MemAvailable", meminfo["MemFree"])
+    try:
+        cgroups = _own_cgroups()
+    except OSError:
+        return limit, available
+
+    if cgroup_version == 2:
+        cgroup, mount = cgroups.get(""), config.cgroupv2_mount
+        limits = _read_hierarchy(mount, cgroup, "memory.max")
+        usages = _read_hierarchy(mount, cgroup, "memory.current")
+    else:
+        cgroup, mount = cgroups.get("memory"), config.cgroup_mem_mount
+        limits = _read_hierarchy(mount, cgroup, "memory.limit_in_bytes")
+        usages = _read_hierarchy(mount, cgroup, "memory.usage_in_bytes")
+
+    for cgroup_limit, usage in zip(limits, usages):
+        if cgroup_limit != "max" and int(cgroup_limit) < limit:
+            limit = int(cgroup_limit)
+            available = min(available, limit - int(usage))
+
+    return limit, max(available, 0)
+
+
+def estimate(
+    config: NsJailConfig,
+    cgroup_version: int,
+    memfs_instance_size: int,
+    running: int = 0,
+) -> Capacity:
+    """
+    Estimate how many sandboxes can run concurrently with the limits in `config`.
+
+    Each job is assumed to use up to its memory cgroup limit plus a full tmpfs instance, and the
+    CPU time allowed by its CPU cgroup limit, or one CPU without a limit. Memory used by the
+    `running` jobs is counted as available, since it will be freed for the next jobs.
+
+    Args:
+        config: The NsJail config with the per-job limits.
+        cgroup_version: The cgroup version in use.
+        memfs_instance_size: Size in bytes of each job's tmpfs instance.
+        running: Number of jobs currently running.
+    """
+    cpus = get_cpus(config, cgroup_version)
+    memory_limit, memory_available = get_memory(config, cgroup_version)
+
+    cpu_per_job = config.cgroup_cpu_ms_per_sec / 1000 if config.cgroup_cpu_ms_per_sec else 1.0
+    job_memory = config.cgroup_mem_max or config.rlimit_as * 1024**2
+    memory_per_job = job_memory + memfs_instance_size
+
+    cpu_slots = math.floor(cpus / cpu_per_job)
+    memory_budget = min(memory_limit - MEMORY_RESERVE, memory_available + running * memory_per_job)
+    memory_slots = memory_budget // memory_per_job
+
+    concurrency = max(1, min(cpu_slots, memory_slots))
+
+    return Capacity(
+        cpus=cpus,
+        memory_limit=memory_limit,
+        memory_available=memory_available,
+        cpu_per_job=cpu_per_job,
+        memory_per_job=memory_per_job,
+        running=running,
+        concurrency=concurrency,
+    )
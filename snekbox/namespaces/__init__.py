@@ -0,0 +1,4 @@
+from .netns import NetworkNamespace
+from .pool import NetnsPool
+
+__all__ = ("NetnsPool", "NetworkNamespace")
@@ -0,0 +1,136 @@
+"""Network namespaces which are created ahead of the jails that run in them."""
+from __future__ import annotations
+
+import ctypes
+import fcntl
+import os
+import socket
+import struct
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
+from ctypes.util import find_library
+
+__all__ = ("NetworkNamespace",)
+
+libc = ctypes.CDLL(find_library("c"), use_errno=True)
+libc.unshare.argtypes = (ctypes.c_int,)
+libc.setns.argtypes = (ctypes.c_int, ctypes.c_int)
+
+CLONE_NEWNET = 0x40000000
+SIOCGIFFLAGS = 0x8913
+IFF_UP = 0x1
+# struct ifreq: the interface name, then a union of which only the flags are used.
+_IFREQ = struct.Struct("16sH22x")
+# Tables of the sockets in a namespace, which only contain a header if it has none.
+_SOCKET_TABLES = ("tcp", "tcp6", "udp", "udp6", "raw", "raw6", "unix", "packet")
+
+
+def _setns(fd: int) -> None:
+    """
+    Move the calling thread into the network namespace which `fd` refers to.
+
+    Raises:
+        OSError: If the thread couldn't be moved.
+    """
+    if libc.setns(fd, CLONE_NEWNET) < 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"Error joining network namespace: {os.strerror(errno)}")
+
+
+def _current() -> int:
+    """Return a file descriptor of the network namespace of the calling thread."""
+    return os.open("/proc/thread-self/ns/net", os.O_RDONLY | os.O_CLOEXEC)
+
+
+class NetworkNamespace:
+    """
+    An empty network namespace, which is kept alive by a file descriptor rather than a process.
+
+    It only has a loopback interface, which is down, like the namespace NsJail creates with
+    `iface_no_lo`. The namespace belongs to the host's user namespace, so a jail, which runs in
+    a user namespace of its own, has no capabilities over it and can't configure it.
+    """
+
+    def __init__(self, fd: int):
+        """Take ownership of `fd`, a file descriptor of a network namespace."""
+        self.fd = fd
+
+    def __repr__(self):
+        return f"<NetworkNamespace fd={self.fd}>"
+
+    @classmethod
+    def create(cls) -> NetworkNamespace:
+        """
+        Create a namespace from a short-lived thread, so that no other thread is moved into it.
+
+        Raises:
+            OSError: If the namespace couldn't be created.
+        """
+        result: list[int | OSError] = []
+
+        def unshare() -> None:
+            if libc.unshare(CLONE_NEWNET) < 0:
+                errno = ctypes.get_errno()
+                result.append(
+                    OSError(errno, f"Error creating network namespace: {os.strerror(errno)}")
+                )
+            else:
+                result.append(_current())
+
+        thread = threading.Thread(target=unshare, name="netns-create")
+        thread.start()
+        thread.join()
+
+        if isinstance(result[0], OSError):
+            raise result[0]
+        return cls(result[0])
+
+    @contextmanager
+    def entered(self) -> Generator[None, None, None]:
+        """
+        Move the calling thread into the namespace within the context.
+
+        Processes the thread starts within the context are created in the namespace, while the
+        other threads stay where they are.
+
+        Raises:
+            OSError: If the thread couldn't be moved.
+        """
+        previous = _current()
+        try:
+            _setns(self.fd)
+            try:
+                yield
+            finally:
+                _setns(previous)
+        finally:
+            os.close(previous)
+
+    def is_pristine(self) -> bool:
+        """Return whether it still only has a loopback interface, which is down, and no sockets."""
+        with self.entered():
+            if [name for _, name in socket.if_nameindex()] != ["lo"]:
+                return False
+
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                ifreq = fcntl.ioctl(sock, SIOCGIFFLAGS, _IFREQ.pack(b"lo", 0))
+            if _IFREQ.unpack(ifreq)[1] & IFF_UP:
+                return False
+
+            for table in _SOCKET_TABLES:
+                try:
+                    with open(f"/proc/thread-self/net/{table}", encoding="utf-8") as f:
+                        if len(f.readlines()) > 1:
+                            return False
+                except FileNotFoundError:
+                    # The protocol, such as IPv6, isn't available on the host.
+                    continue
+
+        return True
+
+    def close(self) -> None:
+        """Close the file descriptor, which frees the namespace once no process is in it."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
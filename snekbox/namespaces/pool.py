@@ -0,0 +1,40 @@
+"""Pool of empty network namespaces which jails join instead of creating their own."""
+from __future__ import annotations
+
+from snekbox.namespaces.netns import NetworkNamespace
+from snekbox.utils.pool import Pool
+
+__all__ = ("NetnsPool",)
+
+
+class NetnsPool(Pool[NetworkNamespace]):
+    """
+    A pool of empty network namespaces which are handed out to one jail at a time.
+
+    Creating a network namespace, and above all destroying one, is slow and serialised by the
+    kernel. Instead, namespaces are created ahead of time, and a released namespace returns to
+    the pool only once it passes a check that it's still pristine; otherwise it's closed. When the
+    last idle namespace is handed out, another one is created in the background.
+    """
+
+    def __init__(self, size: int = 4) -> None:
+        """
+        Initialize an empty pool.
+
+        Args:
+            size: Maximum number of idle namespaces to keep. If 0, each namespace is closed as
+                soon as it's released.
+        """
+        super().__init__(size, thread_name_prefix="netns-pool")
+
+    def _new(self) -> NetworkNamespace:
+        """Create a new namespace."""
+        return NetworkNamespace.create()
+
+    def _reset(self, netns: NetworkNamespace) -> bool:
+        """Return whether `netns` is still pristine; there's nothing to wipe."""
+        return netns.is_pristine()
+
+    def _close(self, netns: NetworkNamespace) -> None:
+        """Close `netns`."""
+        netns.close()
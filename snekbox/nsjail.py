@@ -1,21 +1,44 @@
 import logging
+import math
+import os
 import re
+import signal
 import subprocess
 import sys
-from collections.abc import Iterable, Sequence
-from contextlib import nullcontext
-from pathlib import Path
+import threading
+import time
+from collections.abc import Callable, Generator, Iterable, Sequence
+from contextlib import ExitStack, contextmanager, nullcontext
+from pathlib import Path, PurePosixPath
 from tempfile import NamedTemporaryFile
+from typing import Literal
 
-from google.protobuf import text_format
-
-from snekbox import DEBUG, limits
-from snekbox.config_pb2 import NsJailConfig
+from snekbox import DEBUG, host, limits
+from snekbox.interpreters import BytecodeCache, Environment, Interpreter, Warmup, load_environments
+from snekbox.interpreters.pycache import PYCACHE_DIR
+from snekbox.limits.capacity import Capacity
 from snekbox.limits.timed import time_limit
+from snekbox.namespaces import NetnsPool
 from snekbox.result import EvalError, EvalResult
-from snekbox.snekio import FileAttachment, MemFS
-from snekbox.snekio.errors import IllegalPathError
+from snekbox.scheduling import DEFAULT_CLIENT, DeadlineExceededError, Job, Priority, Scheduler
+from snekbox.snekio import (
+    ArchiveFormat,
+    BlobAttachment,
+    BlobStore,
+    DownloadStore,
+    FileAttachment,
+    GlobMatcher,
+    HomeArchive,
+    MemFS,
+    MemFSPool,
+    OutputWatcher,
+    SandboxRoot,
+    write_archive,
+)
+from snekbox.snekio.bundles import Bundle, load_bundles
+from snekbox.snekio.errors import DepthLimitError, IllegalPathError, ParsingError
 from snekbox.snekio.filesystem import Size
+from snekbox.utils.counters import Counters
 from snekbox.utils.iter import iter_lstrip
 
 __all__ = ("NsJail",)
@@ -27,6 +50,16 @@ LOG_PATTERN = re.compile(
     r"\[(?P<level>(I)|[DWEF])\]\[.+?\](?(2)|(?P<func>\[\d+\] .+?:\d+ )) ?(?P<msg>.+)"
 )
 DEFAULT_EXECUTABLE_PATH = "/snekbin/python/default/bin/python"
+# How often, in seconds, to check whether a running job has been cancelled.
+CANCEL_POLL_INTERVAL = 0.1
+# How long, in seconds, NsJail is given to clean up the jail after a SIGTERM before it's killed.
+TERMINATE_TIMEOUT = 1.0
+# How often, in seconds, to re-estimate the concurrency when it's sized automatically.
+CAPACITY_REFRESH_INTERVAL = 30
+# How long, in seconds, a job waits for a MemFS instance while the limit of instances are held.
+MEMFS_WAIT_TIMEOUT = 5.0
+# Client which the warm-up evaluations are scheduled as.
+WARMUP_CLIENT = "snekbox-warmup"
 
 
 class NsJail:
@@ -39,7 +72,7 @@ class NsJail:
     def __init__(
         self,
         nsjail_path: str = "/usr/sbin/nsjail",
-        config_path: str = "./config/snekbox.cfg",
+        config_path: str = host.DEFAULT_CONFIG_PATH,
         max_output_size: int = 1_000_000,
         read_chunk_size: int = 10_000,
         memfs_instance_size: int = 48 * Size.MiB,
@@ -48,13 +81,36 @@ class NsJail:
         files_limit: int | None = 100,
         files_timeout: float | None = 5,
         files_pattern: str = "**/[!_]*",
+        files_depth_limit: int | None = 100,
+        max_concurrency: int | Literal["auto"] = 2,
+        reserved_interactive: int = 1,
+        client_weights: dict[str, float] | None = None,
+        cpu_quota: float | None = None,
+        cpu_quota_rate: float = 1.0,
+        memfs_pool_size: int | None = None,
+        memfs_limit: int | None = None,
+        blob_store_path: str = "/blobs",
+        blob_store_size: int = 1 * Size.GiB,
+        bundles: dict[str, str] | None = None,
+        download_store_path: str = "/downloads",
+        download_store_size: int = 1 * Size.GiB,
+        download_ttl: float = 300,
+        pycache_path: str | None = None,
+        warmup: bool = False,
+        warmup_modules: Iterable[str] = (),
+        parallel_threads: int = 4,
+        environments_path: str | None = "/environments",
+        sandbox_root: str | None = None,
+        netns_pool_size: int | None = 0,
     ):
         """
         Initialize NsJail.
 
         Args:
             nsjail_path: Path to the NsJail binary.
-            config_path: Path to the NsJail configuration file.
+            config_path: Path to the NsJail configuration file. If the host was preloaded for it,
+                and it's unchanged since, the parsed config and the host's state are shared with
+                the other instances; see `snekbox.host.preload`.
             max_output_size: Maximum size of the output in bytes.
             read_chunk_size: Size of the read buffer in bytes.
             memfs_instance_size: Size of the tmpfs instance in bytes.
@@ -64,6 +120,45 @@ class NsJail:
             files_limit: Maximum number of output files to parse.
             files_timeout: Maximum time in seconds to wait for output files to be read.
             files_pattern: Pattern to match files to attach within the output directory.
+            files_depth_limit: Maximum number of directories to descend into when looking for
+                files to attach.
+            max_concurrency: Maximum number of NsJail processes that can run at once, or "auto"
+                to estimate it from the host's CPUs and memory and the per-job limits.
+            reserved_interactive: Number of concurrent slots reserved for interactive jobs,
+                which batch jobs can never use. At least one slot is always left for batch jobs.
+            client_weights: Fair-share weights of clients; clients not listed have a weight of 1.
+            cpu_quota: Maximum CPU seconds a client can use in a burst, or None for no quota.
+            cpu_quota_rate: CPU seconds per second added back to each client's quota.
+            memfs_pool_size: Maximum number of idle tmpfs instances kept mounted to be wiped and
+                reused, or None to follow the max concurrency. If 0, instances aren't reused.
+            memfs_limit: Maximum number of tmpfs instances held at once, or None to follow the max
+                concurrency. Instances are held until their attachments have been sent, so this
+                bounds their memory when clients read responses slowly.
+            blob_store_path: Directory to store uploaded blobs in.
+            blob_store_size: Maximum total size in bytes of the uploaded blobs.
+            bundles: Names and host paths of files or directories which requests can have
+                mounted read-only at /bundles/<name> in the sandbox.
+            download_store_path: Directory to retain output files in until they're downloaded.
+            download_store_size: Maximum total size in bytes of the retained output files.
+            download_ttl: Time in seconds for which output files are retained.
+            pycache_path: Directory to keep precompiled bytecode of the interpreters in, or None
+                to have every sandbox compile the modules it imports. It's built in a background
+                thread, and snekbox only reports ready once that's done.
+            warmup: Whether to evaluate code with each interpreter in a background thread, once
+                the bytecode is built, and only report ready once that's done. Otherwise, it's
+                ready immediately.
+            warmup_modules: Names of modules to import in the warm-up evaluations.
+            parallel_threads: Number of CPUs which the threads of a free-threaded interpreter can
+                run on in parallel, capped by the host's CPUs. The thread and pids limits of
+                its jobs are adjusted to match.
+            environments_path: Directory containing a user base for each named environment
+                which requests can use instead of the default one, or None for no environments.
+            sandbox_root: Directory to mount the read-only bind mounts of the NsJail config at
+                once, for every jail to mount with a single bind, or None to have NsJail make
+                each of them for every jail.
+            netns_pool_size: Maximum number of idle empty network namespaces kept for jails to
+                join instead of having NsJail create one for each jail, or None to follow the
+                max concurrency. If 0, NsJail creates them.
         """
         self.nsjail_path = nsjail_path
         self.config_path = config_path
@@ -76,35 +171,137 @@ class NsJail:
         self.files_limit = files_limit
         self.files_timeout = files_timeout
         self.files_pattern = files_pattern
+        self.files_matcher = GlobMatcher(files_pattern)
+        self.files_depth_limit = files_depth_limit
+
+        # Shared with the other instances in the process if it was preloaded; see `host.preload`.
+        self.host = host.get(config_path)
+        self.config = self.host.config
+        self.cgroup_version = self.host.cgroup_version
+        self.ignore_swap_limits = self.host.ignore_swap_limits
+
+        self.auto_concurrency = max_concurrency == "auto"
+        self.capacity: Capacity | None = None
+        self._capacity_updated = 0.0
+        if self.auto_concurrency:
+            self.capacity = self._estimate_capacity()
+            max_concurrency = self.capacity.concurrency
+
+        self.scheduler = Scheduler(
+            max_concurrency,
+            # Leave at least one slot for batch jobs on small hosts.
+            min(reserved_interactive, max_concurrency - 1),
+            client_weights=client_weights,
+            cpu_quota=cpu_quota,
+            cpu_quota_rate=cpu_quota_rate,
+        )
+        self.counters = Counters("cancelled", "expired", "deadline_killed")
 
-        self.config = self._read_config(config_path)
-        self.cgroup_version = limits.cgroup.init(self.config)
-        self.ignore_swap_limits = limits.swap.should_ignore_limit(self.config, self.cgroup_version)
+        self.blobs = BlobStore(blob_store_path, blob_store_size, self.memfs_instance_size)
+        self.bundles = load_bundles(bundles)
+        self.downloads = DownloadStore(download_store_path, download_store_size, download_ttl)
 
-        log.info(f"Assuming cgroup version {self.cgroup_version}.")
+        env = self.host.env
+        # Variables which size the thread pools of native libraries, such as OpenMP and BLAS.
+        self.thread_vars = [name for name in env if name.endswith("_THREADS")]
+        cpus = limits.capacity.get_cpus(self.config, self.cgroup_version)
+        self.parallel_threads = max(1, min(parallel_threads, math.floor(cpus)))
 
-    @staticmethod
-    def _read_config(config_path: str) -> NsJailConfig:
-        """Read the NsJail config at `config_path` and return a protobuf Message object."""
-        config = NsJailConfig()
+        self.interpreters = self.host.interpreters
 
-        try:
-            with open(config_path, encoding="utf-8") as f:
-                config_text = f.read()
-        except FileNotFoundError:
-            log.fatal(f"The NsJail config at {config_path!r} could not be found.")
-            sys.exit(1)
-        except OSError as e:
-            log.fatal(f"The NsJail config at {config_path!r} could not be read.", exc_info=e)
-            sys.exit(1)
+        self.environments = load_environments(environments_path)
 
-        try:
-            text_format.Parse(config_text, config)
-        except text_format.ParseError as e:
-            log.fatal(f"The NsJail config at {config_path!r} could not be parsed.", exc_info=e)
-            sys.exit(1)
+        self.pycache: BytecodeCache | None = None
+        if pycache_path is not None:
+            user_bases = [environment.path for environment in self.environments.values()]
+            self.pycache = BytecodeCache(pycache_path, env, user_bases)
+            self.pycache.start(self.interpreters.executables)
+
+        self.sandbox_root: SandboxRoot | None = None
+        if sandbox_root is not None:
+            self.sandbox_root = SandboxRoot(sandbox_root, self.config, self._mount_points())
+            self.sandbox_root.build()
+
+        self.memfs_pool_size = memfs_pool_size
+        self.memfs_limit = memfs_limit
+        self.memfs_pool = MemFSPool(
+            instance_size=self.memfs_instance_size,
+            home=self.memfs_home,
+            output=self.memfs_output,
+            size=max_concurrency if memfs_pool_size is None else memfs_pool_size,
+            limit=max_concurrency if memfs_limit is None else memfs_limit,
+        )
+
+        self.netns_pool_size = netns_pool_size
+        self.netns_pool: NetnsPool | None = None
+        if netns_pool_size != 0 and self.config.clone_newnet:
+            self.netns_pool = NetnsPool(
+                size=max_concurrency if netns_pool_size is None else netns_pool_size
+            )
 
-        return config
+        self.warmup = Warmup(warmup_modules)
+        if warmup:
+            # Warm up once the bytecode is built, so that it's loaded into the page cache as well.
+            self.warmup.start(
+                self._warmup_eval,
+                self.interpreters.interpreters,
+                after=self.pycache.wait if self.pycache is not None else None,
+            )
+        else:
+            self.warmup.skip()
+
+    @property
+    def ready(self) -> bool:
+        """Whether the bytecode was built and the interpreters were warmed up, if enabled."""
+        return (self.pycache is None or self.pycache.ready) and self.warmup.ready
+
+    def _mount_points(self) -> list[tuple[PurePosixPath, bool]]:
+        """Return the paths in the sandbox of the mounts made besides those in the config."""
+        mount_points = [(PurePosixPath("/home"), True)]
+        if self.pycache is not None:
+            mount_points.append((PYCACHE_DIR, True))
+        for bundle in self.bundles.values():
+            mount_points.append((bundle.mount_point, bundle.path.is_dir()))
+        for environment in self.environments.values():
+            mount_points.append((PurePosixPath(environment.path), True))
+        return mount_points
+
+    def _warmup_eval(self, executable_path: str, py_args: Sequence[str]) -> EvalResult:
+        """Evaluate warm-up code as a batch job of its own client, apart from those of requests."""
+        return self.python3(
+            py_args,
+            executable_path=executable_path,
+            priority=Priority.BATCH,
+            client=WARMUP_CLIENT,
+        )
+
+    def _estimate_capacity(self) -> Capacity:
+        """Estimate the concurrency from the host's resources and log the inputs used."""
+        running = self.scheduler.running if self.capacity else 0
+        capacity = limits.capacity.estimate(
+            self.config, self.cgroup_version, self.memfs_instance_size, running
+        )
+        self._capacity_updated = time.monotonic()
+        if self.capacity is None or capacity.concurrency != self.capacity.concurrency:
+            log.info(f"Estimated concurrency: {capacity}")
+
+        return capacity
+
+    def _update_capacity(self) -> None:
+        """Resize the scheduler if the concurrency is sized automatically and is due a refresh."""
+        if not self.auto_concurrency:
+            return
+        if time.monotonic() - self._capacity_updated < CAPACITY_REFRESH_INTERVAL:
+            return
+
+        self.capacity = self._estimate_capacity()
+        self.scheduler.resize(self.capacity.concurrency)
+        if self.memfs_pool_size is None:
+            self.memfs_pool.size = self.capacity.concurrency
+        if self.memfs_limit is None:
+            self.memfs_pool.limit = self.capacity.concurrency
+        if self.netns_pool is not None and self.netns_pool_size is None:
+            self.netns_pool.size = self.capacity.concurrency
 
     @staticmethod
     def _parse_log(log_lines: Iterable[str]) -> None:
@@ -147,26 +344,100 @@ class NsJail:
         output_size = 0
         output = []
 
-        # Context manager will wait for process to terminate and close file descriptors.
-        with nsjail:
-            # We'll consume STDOUT as long as the NsJail subprocess is running.
-            while nsjail.poll() is None:
-                try:
-                    chars = nsjail.stdout.read(self.read_chunk_size)
-                except UnicodeDecodeError as e:
-                    raise EvalError("UnicodeDecodeError: invalid Unicode in output pipe") from e
+        # We'll consume STDOUT until it's closed, which happens once NsJail has exited.
+        # The process isn't reaped here so that its resource usage can be collected afterwards.
+        while True:
+            try:
+                chars = nsjail.stdout.read(self.read_chunk_size)
+            except UnicodeDecodeError as e:
+                raise EvalError("UnicodeDecodeError: invalid Unicode in output pipe") from e
+
+            if not chars:
+                break
+
+            output_size += sys.getsizeof(chars)
+            output.append(chars)
+
+            if output_size > self.max_output_size:
+                # Terminate the NsJail subprocess with SIGTERM.
+                # This in turn reaps and kills children with SIGKILL.
+                log.info("Output exceeded the output limit. Sending SIGTERM to NsJail.")
+                nsjail.terminate()
+                break
+
+        return "".join(output)
+
+    @staticmethod
+    def _wait(nsjail: subprocess.Popen) -> float:
+        """
+        Wait for NsJail to exit and return the CPU time in seconds used by it and the sandbox.
 
-                output_size += sys.getsizeof(chars)
-                output.append(chars)
+        `os.wait4` is used rather than `Popen.wait` because it also returns the resource usage
+        of the process, which includes all descendants it has waited for.
+        """
+        _, status, rusage = os.wait4(nsjail.pid, 0)
+        nsjail.returncode = os.waitstatus_to_exitcode(status)
+        return rusage.ru_utime + rusage.ru_stime
+
+    @contextmanager
+    def _watchdog(
+        self,
+        nsjail: subprocess.Popen,
+        cancelled: Callable[[], bool] | None,
+        deadline: float | None,
+    ) -> Generator[threading.Event, None, None]:
+        """
+        Stop NsJail if the job is cancelled or its deadline passes while within the context.
+
+        NsJail is sent a SIGTERM, upon which it kills the sandboxed process and removes the jail's
+        cgroups. It's only sent a SIGKILL, which leaves them behind, if it's still running after
+        `TERMINATE_TIMEOUT` seconds.
 
-                if output_size > self.max_output_size:
-                    # Terminate the NsJail subprocess with SIGTERM.
+        The context's value is an event which is set if the deadline passed. The watchdog is
+        stopped when leaving the context, so the process has to be reaped afterwards; otherwise
+        its PID could be reused by the time it's signalled.
+        """
+        expired = threading.Event()
+        if cancelled is None and deadline is None:
+            yield expired
+            return
+
+        done = threading.Event()
+
+        def watch() -> None:
+            while True:
+                timeout = CANCEL_POLL_INTERVAL if cancelled else None
+                if deadline is not None:
+                    remaining = max(0.0, deadline - time.monotonic())
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+
+                if done.wait(timeout):
+                    return
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    log.info("The job's deadline passed. Sending SIGTERM to NsJail.")
+                    self.counters.increment("deadline_killed")
+                    expired.set()
+                    nsjail.terminate()
+                    if not done.wait(TERMINATE_TIMEOUT):
+                        log.warning("NsJail is still running after SIGTERM. Sending SIGKILL.")
+                        nsjail.kill()
+                    return
+
+                if cancelled is not None and cancelled():
                     # This in turn reaps and kills children with SIGKILL.
-                    log.info("Output exceeded the output limit. Sending SIGTERM to NsJail.")
+                    log.info("The job was cancelled. Sending SIGTERM to NsJail.")
+                    self.counters.increment("cancelled")
                     nsjail.terminate()
-                    break
+                    return
 
-        return "".join(output)
+        thread = threading.Thread(target=watch, name="nsjail-watchdog", daemon=True)
+        thread.start()
+        try:
+            yield expired
+        finally:
+            done.set()
+            thread.join()
 
     def _build_args(
         self,
@@ -175,19 +446,47 @@ class NsJail:
         log_path: str,
         fs_home: str,
         executable_path: str,
+        bundles: Iterable[Bundle] = (),
+        jit: bool | None = None,
+        free_threading: bool | None = None,
+        environment: Environment | None = None,
     ) -> Sequence[str]:
-        if self.cgroup_version == 2:
-            nsjail_args = ("--use_cgroupv2", *nsjail_args)
+        if self.netns_pool is not None:
+            # The jail is started in a namespace from the pool; see `_python3`.
+            nsjail_args = ("--disable_clone_newnet", *nsjail_args)
+
+        nsjail_args = (*self.host.nsjail_args, *nsjail_args)
+
+        interpreter = self.interpreters.get(executable_path)
+        real_path = interpreter.real_path if interpreter else os.path.realpath(executable_path)
+        pycache = self.pycache and self.pycache.directory(real_path)
+        if interpreter is not None:
+            nsjail_args = (*self._interpreter_args(interpreter, jit, free_threading), *nsjail_args)
 
-        if self.ignore_swap_limits:
+        if pycache:
             nsjail_args = (
-                "--cgroup_mem_memsw_max",
-                "0",
-                "--cgroup_mem_swap_max",
-                "-1",
+                "--bindmount_ro",
+                f"{pycache}:{PYCACHE_DIR}",
+                "--env",
+                f"PYTHONPYCACHEPREFIX={PYCACHE_DIR}",
                 *nsjail_args,
             )
 
+        if environment is not None:
+            # Mounted at the same path as on the host, where its bytecode and index were built.
+            nsjail_args = (
+                "--bindmount_ro",
+                f"{environment.path}:{environment.path}",
+                "--env",
+                f"PYTHONUSERBASE={environment.path}",
+                *nsjail_args,
+            )
+
+        for bundle in bundles:
+            # Bundles are mounted from the host rather than copied, so they don't count towards
+            # the size of the tmpfs and their pages are cached once for all sandboxes.
+            nsjail_args = ("--bindmount_ro", f"{bundle.path}:{bundle.mount_point}", *nsjail_args)
+
         nsjail_args = (
             # Mount `home` with Read/Write access
             "--bindmount",
@@ -198,7 +497,7 @@ class NsJail:
         return [
             self.nsjail_path,
             "--config",
-            self.config_path,
+            str(self.sandbox_root.config_path) if self.sandbox_root else self.config_path,
             "--log",
             log_path,
             *nsjail_args,
@@ -207,8 +506,53 @@ class NsJail:
             *iter_lstrip(py_args),
         ]
 
-    def _write_files(self, home: Path, files: Iterable[FileAttachment]) -> dict[Path, float]:
+    def _interpreter_args(
+        self, interpreter: Interpreter, jit: bool | None, free_threading: bool | None
+    ) -> list[str]:
+        """
+        Return NsJail arguments to enable or disable the JIT and the GIL of `interpreter`.
+
+        If the interpreter can run threads in parallel, they're given `parallel_threads` CPUs,
+        native libraries size their thread pools to match, and the pids limit leaves room for
+        that many more threads.
+        """
+        args = []
+        if interpreter.jit and jit is not None:
+            args += ["--env", f"PYTHON_JIT={int(jit)}"]
+        if not interpreter.free_threading:
+            return args
+        if free_threading is False:
+            return [*args, "--env", "PYTHON_GIL=1"]
+        if free_threading:
+            args += ["--env", "PYTHON_GIL=0"]
+
+        threads = self.parallel_threads
+        args += ["--max_cpus", str(threads)]
+        if self.config.cgroup_pids_max:
+            args += ["--cgroup_pids_max", str(self.config.cgroup_pids_max + threads)]
+        if self.config.cgroup_cpu_ms_per_sec:
+            args += ["--cgroup_cpu_ms_per_sec", str(self.config.cgroup_cpu_ms_per_sec * threads)]
+        for name in self.thread_vars:
+            args += ["--env", f"{name}={threads}"]
+        return args
+
+    def _write_files(
+        self,
+        home: Path,
+        files: Iterable[FileAttachment | BlobAttachment],
+        home_archive: HomeArchive | None = None,
+    ) -> dict[Path, float]:
         files_written = {}
+        if home_archive is not None:
+            try:
+                files_written.update(home_archive.extract_to(home))
+                log.info(f"Extracted {home_archive.files} files from the home archive.")
+            except (OSError, ParsingError) as e:
+                log.info("Failed to extract the home archive.", exc_info=e)
+                raise EvalError(
+                    f"{e.__class__.__name__}: Failed to extract the home archive."
+                ) from e
+
         for file in files:
             try:
                 f_path = file.save_to(home)
@@ -226,22 +570,46 @@ class NsJail:
         return files_written
 
     def _parse_attachments(
-        self, fs: MemFS, files_written: dict[Path, float]
+        self,
+        fs: MemFS,
+        files_written: dict[Path, float],
+        archive: ArchiveFormat | None = None,
+        compress: bool = False,
+        watcher: OutputWatcher | None = None,
     ) -> list[FileAttachment]:
+        # Signal handlers can only be installed from the main thread. Elsewhere, rely on the
+        # timeout checks done while iterating over the files.
+        use_alarm = self.files_timeout and threading.current_thread() is threading.main_thread()
         try:
-            with time_limit(self.files_timeout) if self.files_timeout else nullcontext():
-                attachments = fs.files_list(
-                    limit=self.files_limit,
-                    pattern=self.files_pattern,
-                    preload_dict=True,
-                    exclude_files=files_written,
-                    timeout=self.files_timeout,
-                )
+            with time_limit(self.files_timeout) if use_alarm else nullcontext():
+                if watcher is not None:
+                    attachments = watcher.finish(self.files_timeout)
+                elif archive is None:
+                    attachments = fs.files_list(
+                        limit=self.files_limit,
+                        pattern=self.files_matcher,
+                        exclude_files=files_written,
+                        timeout=self.files_timeout,
+                        max_depth=self.files_depth_limit,
+                        mapped=True,
+                    )
+                else:
+                    # Pack the files as they're found rather than collecting them first.
+                    files = fs.files(
+                        limit=self.files_limit,
+                        pattern=self.files_matcher,
+                        exclude_files=files_written,
+                        timeout=self.files_timeout,
+                        max_depth=self.files_depth_limit,
+                        mapped=True,
+                    )
+                    packed = write_archive(files, archive, compress)
+                    attachments = [packed] if packed else []
 
             log.info(f"Found {len(attachments)} files.")
             return attachments
-        except RecursionError as e:
-            log.info("Recursion error while parsing attachments")
+        except DepthLimitError as e:
+            log.info(f"Exceeded directory depth limit while parsing attachments: {e}")
             raise EvalError(
                 "FileParsingError: Exceeded directory depth limit while parsing attachments"
             ) from e
@@ -260,9 +628,21 @@ class NsJail:
     def python3(
         self,
         py_args: Iterable[str],
-        files: Iterable[FileAttachment] = (),
+        files: Iterable[FileAttachment | BlobAttachment] = (),
         nsjail_args: Iterable[str] = (),
         executable_path: Path = DEFAULT_EXECUTABLE_PATH,
+        priority: Priority = Priority.INTERACTIVE,
+        client: str = DEFAULT_CLIENT,
+        cancelled: Callable[[], bool] | None = None,
+        deadline: float | None = None,
+        bundles: Iterable[str] = (),
+        archive: ArchiveFormat | None = None,
+        compress: bool = False,
+        home_archive: HomeArchive | None = None,
+        on_file: Callable[[FileAttachment], object] | None = None,
+        jit: bool | None = None,
+        free_threading: bool | None = None,
+        environment: str | None = None,
     ) -> EvalResult:
         """
         Execute Python 3 code in an isolated environment and return the completed process.
@@ -272,44 +652,167 @@ class NsJail:
             files: FileAttachments to write to the sandbox prior to running Python.
             nsjail_args: Overrides for the NsJail configuration.
             executable_path: The path to the executable to run within nsjail.
+            priority: The priority class used to queue the job for a free slot.
+            client: Identity of the client, used for fair-sharing and CPU time quotas.
+            cancelled: A function which returns True once the result is no longer wanted.
+                It is checked before NsJail is started and periodically while it runs.
+            deadline: `time.monotonic()` value by which the job must finish, including the
+                time spent queued. NsJail is killed once it passes.
+            bundles: Names of the bundles to mount read-only in the sandbox.
+            archive: Format to pack the output files into a single attachment in, or None to
+                attach each file separately.
+            compress: Whether to compress the archive.
+            home_archive: An archive to extract into the home directory before `files` are
+                written.
+            on_file: If given, the output directory is watched while Python runs, and this is
+                called from another thread with each output file once it's been written. Only
+                files which weren't passed to it, or changed afterwards, are in the result.
+                Ignored if `archive` is given.
+            jit: Whether to enable the JIT compiler, if the interpreter has one, or None to
+                leave it at the interpreter's default.
+            free_threading: Whether to run without the GIL, if the interpreter is free-threaded,
+                or None to leave it at the interpreter's default. Free-threaded interpreters
+                running without the GIL have their limits adjusted for parallel threads.
+            environment: Name of the environment whose packages to use instead of those in the
+                default user base.
+        Raises:
+            KeyError: If a bundle or the environment isn't configured.
+            QuotaExceededError: If the client's CPU time quota is used up.
+            DeadlineExceededError: If the deadline passes before NsJail is started.
+            MemFSLimitError: If the limit of tmpfs instances stayed held for too long.
         """
-        with NamedTemporaryFile() as nsj_log, MemFS(
-            instance_size=self.memfs_instance_size,
-            home=self.memfs_home,
-            output=self.memfs_output,
-        ) as fs:
+        bundles = [self.bundles[name] for name in bundles]
+        env = self.environments[environment] if environment is not None else None
+        self._update_capacity()
+        try:
+            with self.scheduler.slot(priority, client, deadline) as job:
+                return self._python3(
+                    job,
+                    py_args,
+                    files,
+                    nsjail_args,
+                    executable_path,
+                    cancelled,
+                    deadline,
+                    bundles,
+                    archive,
+                    compress,
+                    home_archive,
+                    on_file,
+                    jit,
+                    free_threading,
+                    env,
+                )
+        except DeadlineExceededError:
+            self.counters.increment("expired")
+            raise
+
+    def _python3(
+        self,
+        job: Job,
+        py_args: Iterable[str],
+        files: Iterable[FileAttachment | BlobAttachment],
+        nsjail_args: Iterable[str],
+        executable_path: Path,
+        cancelled: Callable[[], bool] | None,
+        deadline: float | None,
+        bundles: Iterable[Bundle],
+        archive: ArchiveFormat | None,
+        compress: bool,
+        home_archive: HomeArchive | None,
+        on_file: Callable[[FileAttachment], object] | None,
+        jit: bool | None,
+        free_threading: bool | None,
+        environment: Environment | None,
+    ) -> EvalResult:
+        """Execute Python 3 code once `job` has been given a slot; see `python3`."""
+        if deadline is not None:
+            # NsJail's time limit only has a resolution of seconds; the watchdog is more precise.
+            remaining = math.ceil(deadline - time.monotonic())
+            if not self.config.time_limit or remaining < self.config.time_limit:
+                nsjail_args = ("--time_limit", str(max(remaining, 1)), *nsjail_args)
+
+        with ExitStack() as stack:
+            nsj_log = stack.enter_context(NamedTemporaryFile())
+            timeout = MEMFS_WAIT_TIMEOUT
+            if deadline is not None:
+                timeout = max(0.0, min(timeout, deadline - time.monotonic()))
+            fs = stack.enter_context(self.memfs_pool.acquire(timeout))
             args = self._build_args(
                 py_args,
                 nsjail_args,
                 nsj_log.name,
                 str(fs.home),
                 executable_path,
+                bundles,
+                jit,
+                free_threading,
+                environment,
             )
             try:
-                files_written = self._write_files(fs.home, files)
+                if cancelled is not None and cancelled():
+                    log.info("The job was cancelled before it started.")
+                    self.counters.increment("cancelled")
+                    return EvalResult(args, None, "Cancelled: the job was cancelled")
+
+                files_written = self._write_files(fs.home, files, home_archive)
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    log.info("Dropping job whose deadline passed before it started.")
+                    raise DeadlineExceededError("The deadline passed before the job started")
 
                 msg = "Executing code..."
                 if DEBUG:
                     msg = f"{msg[:-3]} with the arguments {args}."
                 log.info(msg)
 
-                try:
-                    nsjail = subprocess.Popen(
-                        args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+                watcher = None
+                if on_file is not None and archive is None:
+                    watcher = OutputWatcher(
+                        fs,
+                        self.files_matcher,
+                        on_file,
+                        self.files_limit,
+                        self.files_depth_limit,
+                        files_written,
                     )
-                except ValueError:
-                    return EvalResult(args, None, "ValueError: embedded null byte")
 
-                output = self._consume_stdout(nsjail)
-                attachments = self._parse_attachments(fs, files_written)
-                log_lines = nsj_log.read().decode("utf-8").splitlines()
+                pooled = self.netns_pool.acquire() if self.netns_pool else nullcontext()
+                with watcher or nullcontext(), pooled as netns:
+                    start = time.monotonic()
+                    try:
+                        # NsJail inherits the namespace of the thread which starts it.
+                        with netns.entered() if netns else nullcontext():
+                            nsjail = subprocess.Popen(
+                                args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+                            )
+                    except ValueError:
+                        return EvalResult(args, None, "ValueError: embedded null byte")
+
+                    # Context manager will wait for process to terminate and close file descriptors.
+                    with nsjail:
+                        with self._watchdog(nsjail, cancelled, deadline) as expired:
+                            output = self._consume_stdout(nsjail)
+                        job.cpu_time = self._wait(nsjail)
+                    duration = time.monotonic() - start
+                    log_lines = nsj_log.read().decode("utf-8").splitlines()
+                    attachments = self._parse_attachments(
+                        fs, files_written, archive, compress, watcher
+                    )
             except EvalError as e:
                 return EvalResult(args, None, str(e))
 
+            # The attachments are mapped from the MemFS, so it's held until the result is closed.
+            # An archive is written outside the MemFS, so then it can be released straight away.
+            release = stack.pop_all().close if attachments and archive is None else None
+
         # When you send signal `N` to a subprocess to terminate it using Popen, it
         # will return `-N` as its exit code. As we normally get `N + 128` back, we
         # convert negative exit codes to the `N + 128` form.
         return_code = -nsjail.returncode + 128 if nsjail.returncode < 0 else nsjail.returncode
+        if expired.is_set():
+            # Report a job killed at its deadline like one killed by NsJail's own time limit.
+            return_code = 128 + signal.SIGKILL
 
         if not log_lines and return_code == 255:
             # NsJail probably failed to parse arguments so log output will still be in stdout
@@ -318,4 +821,12 @@ class NsJail:
         self._parse_log(log_lines)
         log.info(f"NsJail return code: {return_code}")
 
-        return EvalResult(args, return_code, output, files=attachments)
+        return EvalResult(
+            args,
+            return_code,
+            output,
+            files=attachments,
+            release=release,
+            duration=duration,
+            cpu_time=job.cpu_time,
+        )
@@ -1,5 +1,7 @@
 """Types for representing the result of an evaluation job."""
-from collections.abc import Sequence
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
 from os import PathLike
 from subprocess import CompletedProcess
 from typing import TypeVar
@@ -23,7 +25,12 @@ class EvalError(RuntimeError):
 
 
 class EvalResult(CompletedProcess[_T]):
-    """An evaluation job that has finished running."""
+    """
+    An evaluation job that has finished running.
+
+    The attachments may be mapped from the job's file system, which is held until the result is
+    closed. Close it once the attachments have been used, or use it as a context manager.
+    """
 
     def __init__(
         self,
@@ -32,7 +39,34 @@ class EvalResult(CompletedProcess[_T]):
         stdout: _T | None = None,
         stderr: _T | None = None,
         files: list[FileAttachment] | None = None,
+        release: Callable[[], object] | None = None,
+        duration: float | None = None,
+        cpu_time: float | None = None,
     ) -> None:
-        """Create an evaluation result."""
+        """
+        Create an evaluation result.
+
+        `release` is called when the result is closed, after the attachments are closed.
+        `duration` is the wall time in seconds NsJail ran for, and `cpu_time` the CPU time
+        in seconds it used; both are None if it didn't run.
+        """
         super().__init__(args, returncode, stdout, stderr)
         self.files: list[FileAttachment] = files or []
+        self.duration = duration
+        self.cpu_time = cpu_time
+        self._release = release
+
+    def close(self) -> None:
+        """Close the attachments and release the resources backing them."""
+        for file in self.files:
+            file.close()
+
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+    def __enter__(self) -> EvalResult[_T]:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
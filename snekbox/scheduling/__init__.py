@@ -0,0 +1,13 @@
+from .errors import DeadlineExceededError, QuotaExceededError
+from .quota import TokenBucket
+from .scheduler import DEFAULT_CLIENT, Job, Priority, Scheduler
+
+__all__ = (
+    "DEFAULT_CLIENT",
+    "DeadlineExceededError",
+    "Job",
+    "Priority",
+    "QuotaExceededError",
+    "Scheduler",
+    "TokenBucket",
+)
@@ -0,0 +1,11 @@
+class QuotaExceededError(RuntimeError):
+    """Raised when a client has used up its quota of sandbox CPU time."""
+
+    def __init__(self, client: str, retry_after: float):
+        super().__init__(f"Client {client!r} exceeded its CPU time quota")
+        self.client = client
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when the deadline of a job passes before the job could start."""
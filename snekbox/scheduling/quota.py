@@ -0,0 +1,63 @@
+"""Token buckets for limiting the CPU time used by clients."""
+import time
+from collections.abc import Callable
+
+__all__ = ("TokenBucket",)
+
+
+class TokenBucket:
+    """
+    A bucket of tokens which refills at a constant rate up to its capacity.
+
+    Tokens are consumed after the fact, so the bucket may go into debt. It is considered empty
+    until it has refilled to a positive amount again. Not thread-safe.
+    """
+
+    def __init__(
+        self, capacity: float, rate: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+        Create a full token bucket.
+
+        Args:
+            capacity: Maximum number of tokens the bucket can hold.
+            rate: Number of tokens added per second.
+            clock: Function returning the current time in seconds.
+        """
+        if capacity <= 0 or rate <= 0:
+            raise ValueError("capacity and rate must be greater than 0")
+
+        self.capacity = capacity
+        self.rate = rate
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        """Number of tokens currently in the bucket; negative if it is in debt."""
+        self._refill()
+        return self._tokens
+
+    @property
+    def full(self) -> bool:
+        """Whether the bucket has refilled to its capacity."""
+        return self.tokens >= self.capacity
+
+    def consume(self, amount: float) -> None:
+        """Remove `amount` tokens from the bucket, going into debt if necessary."""
+        self._refill()
+        self._tokens -= amount
+
+    def retry_after(self) -> float:
+        """Return the number of seconds until the bucket holds a positive amount of tokens."""
+        tokens = self.tokens
+        if tokens > 0:
+            return 0.0
+        # Add a tiny amount so the bucket is strictly positive rather than exactly empty.
+        return (-tokens / self.rate) + 1e-3
@@ -0,0 +1,325 @@
+"""Admission control for sandbox slots."""
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+
+from .errors import DeadlineExceededError, QuotaExceededError
+from .quota import TokenBucket
+
+__all__ = ("DEFAULT_CLIENT", "Job", "Priority", "Scheduler")
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CLIENT = "anonymous"
+# Minimum time in seconds between sweeps of idle clients when jobs are admitted.
+CLIENT_SWEEP_INTERVAL = 10.0
+
+
+class Priority(str, Enum):
+    """Priority classes for evaluation jobs."""
+
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+@dataclass
+class _LaneStats:
+    """Counters for the jobs of a single priority class."""
+
+    queued: int = 0
+    running: int = 0
+    started: int = 0
+    wait_time_total: float = 0.0
+    wait_time_max: float = 0.0
+    wait_time_last: float = 0.0
+
+    def record_wait(self, wait_time: float) -> None:
+        """Record the time a job spent queued before it started."""
+        self.started += 1
+        self.wait_time_total += wait_time
+        self.wait_time_max = max(self.wait_time_max, wait_time)
+        self.wait_time_last = wait_time
+
+
+@dataclass
+class _Client:
+    """Fair-share accounting for a single client."""
+
+    weight: float
+    bucket: TokenBucket | None
+    # CPU seconds used, divided by the weight. The client with the lowest value goes first.
+    virtual_time: float = 0.0
+    cost_estimate: float = 1.0
+    active: int = 0
+    cpu_time: float = 0.0
+
+    @property
+    def idle(self) -> bool:
+        """Whether the client has no jobs and no state which would be lost by forgetting it."""
+        return self.active == 0 and (self.bucket is None or self.bucket.full)
+
+
+@dataclass(eq=False)
+class Job:
+    """A job which is queued for, or holds, a sandbox slot."""
+
+    client: str
+    priority: Priority
+    seq: int
+    cpu_time: float = 0.0
+    """CPU time in seconds used by the job; set by the holder of the slot."""
+    _charged: float = field(default=0.0, repr=False)
+
+
+class Scheduler:
+    """
+    Hand out a limited number of sandbox slots to jobs of different priority classes and clients.
+
+    Interactive jobs may use every slot. Batch jobs may only use the slots which are not reserved
+    for interactive jobs, and never start while an interactive job is queued.
+
+    Within a class, clients share the slots through weighted fair queueing: the job of the client
+    which has used the least CPU time relative to its weight starts first. Jobs of the same client
+    start in the order they arrived. If quotas are enabled, each client has a token bucket of
+    CPU seconds and is refused new jobs while the bucket is empty.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        reserved_interactive: int = 0,
+        client_weights: dict[str, float] | None = None,
+        cpu_quota: float | None = None,
+        cpu_quota_rate: float = 1.0,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            capacity: Maximum number of jobs that can run concurrently.
+            reserved_interactive: Number of slots that batch jobs can never use.
+            client_weights: Fair-share weights of clients; clients not listed have a weight of 1.
+            cpu_quota: Maximum CPU seconds a client can use in a burst, or None for no quota.
+            cpu_quota_rate: CPU seconds per second added back to each client's quota.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0 <= reserved_interactive < capacity:
+            raise ValueError("reserved_interactive must be at least 0 and less than capacity")
+        if any(weight <= 0 for weight in (client_weights or {}).values()):
+            raise ValueError("client weights must be greater than 0")
+
+        self.capacity = capacity
+        self.reserved_interactive = reserved_interactive
+        self._reserved_interactive = reserved_interactive
+        self.client_weights = client_weights or {}
+        self.cpu_quota = cpu_quota
+        self.cpu_quota_rate = cpu_quota_rate
+
+        self._cond = threading.Condition()
+        self._running = 0
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._clients: dict[str, _Client] = {}
+        self._swept = time.monotonic()
+        self._queues: dict[Priority, list[Job]] = {p: [] for p in Priority}
+        self._stats: dict[Priority, _LaneStats] = {p: _LaneStats() for p in Priority}
+
+    @property
+    def running(self) -> int:
+        """Number of jobs currently holding a slot."""
+        return self._running
+
+    def resize(self, capacity: int) -> None:
+        """
+        Change the number of slots.
+
+        If there are fewer slots than reserved for interactive jobs, one slot is left for batch
+        jobs. Jobs already holding a slot are not affected when the capacity shrinks.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        with self._cond:
+            if capacity != self.capacity:
+                log.info(f"Changing the number of slots from {self.capacity} to {capacity}.")
+            self.capacity = capacity
+            self.reserved_interactive = min(self._reserved_interactive, capacity - 1)
+            self._cond.notify_all()
+
+    def _limit(self, priority: Priority) -> int:
+        """Return the number of slots jobs of the `priority` class may occupy in total."""
+        if priority is Priority.BATCH:
+            return self.capacity - self.reserved_interactive
+        return self.capacity
+
+    def _get_client(self, name: str) -> _Client:
+        """Return the accounting for client `name`, creating it if it doesn't exist."""
+        client = self._clients.get(name)
+        if client is None:
+            bucket = None
+            if self.cpu_quota is not None:
+                bucket = TokenBucket(self.cpu_quota, self.cpu_quota_rate)
+            client = _Client(weight=self.client_weights.get(name, 1.0), bucket=bucket)
+            self._clients[name] = client
+
+        return client
+
+    def _head(self, priority: Priority) -> Job | None:
+        """Return the job which should start next within the `priority` class."""
+        return min(
+            self._queues[priority],
+            key=lambda job: (self._clients[job.client].virtual_time, job.seq),
+            default=None,
+        )
+
+    def _can_start(self, job: Job) -> bool:
+        """Return True if `job` may take a slot now."""
+        if self._head(job.priority) is not job:
+            return False
+
+        if job.priority is Priority.BATCH and self._queues[Priority.INTERACTIVE]:
+            return False
+
+        return self._running < self._limit(job.priority)
+
+    def _sweep(self) -> None:
+        """
+        Forget the clients which have become idle since their last job finished.
+
+        A client whose bucket wasn't full yet when its last job finished is kept until the bucket
+        has refilled, as forgetting it earlier would reset its quota.
+        """
+        self._swept = time.monotonic()
+        for name in [name for name, client in self._clients.items() if client.idle]:
+            del self._clients[name]
+
+    def _admit(self, name: str, priority: Priority) -> Job:
+        """Check the quota of client `name` and enqueue a new job for it."""
+        if time.monotonic() - self._swept >= CLIENT_SWEEP_INTERVAL:
+            self._sweep()
+
+        client = self._get_client(name)
+        if client.bucket is not None and (retry_after := client.bucket.retry_after()):
+            raise QuotaExceededError(name, retry_after)
+
+        if client.active == 0:
+            # Don't let a client which was idle catch up on the time it didn't use.
+            client.virtual_time = max(client.virtual_time, self._virtual_time)
+        client.active += 1
+
+        job = Job(name, priority, next(self._seq))
+        self._queues[priority].append(job)
+        self._stats[priority].queued += 1
+
+        return job
+
+    def _finish(self, job: Job, started: bool = True) -> None:
+        """Charge the client of `job` for the CPU time it used and forget idle clients."""
+        client = self._clients[job.client]
+        client.active -= 1
+        if not started:
+            if client.idle:
+                del self._clients[job.client]
+            return
+
+        client.cpu_time += job.cpu_time
+        # Replace the estimate charged when the job started with the actual cost.
+        client.virtual_time += job.cpu_time / client.weight - job._charged
+        client.cost_estimate = job.cpu_time or client.cost_estimate
+        if client.bucket is not None:
+            client.bucket.consume(job.cpu_time)
+
+        if client.idle:
+            del self._clients[job.client]
+
+    @contextmanager
+    def slot(
+        self,
+        priority: Priority = Priority.INTERACTIVE,
+        client: str = DEFAULT_CLIENT,
+        deadline: float | None = None,
+    ) -> Generator[Job, None, None]:
+        """
+        Block until a slot for the `priority` class is free and hold it within the context.
+
+        The holder should set the `cpu_time` of the yielded job before leaving the context, so
+        that the client is charged for it.
+
+        Args:
+            priority: The priority class of the job.
+            client: Identity of the client which submitted the job.
+            deadline: `time.monotonic()` value by which the job must have started, if any.
+        Raises:
+            QuotaExceededError: If the client's CPU time quota is used up.
+            DeadlineExceededError: If the deadline passes while the job is queued.
+        """
+        start_time = time.monotonic()
+
+        with self._cond:
+            job = self._admit(client, priority)
+            stats = self._stats[priority]
+            try:
+                timeout = None if deadline is None else deadline - start_time
+                if not self._cond.wait_for(lambda: self._can_start(job), timeout):
+                    log.info(f"Dropping {priority.value} job whose deadline passed in the queue.")
+                    raise DeadlineExceededError("The deadline passed while the job was queued")
+            except BaseException:
+                self._finish(job, started=False)
+                raise
+            finally:
+                self._queues[priority].remove(job)
+                stats.queued -= 1
+                # The head of the queue changed, so another job may be able to start.
+                self._cond.notify_all()
+
+            wait_time = time.monotonic() - start_time
+            stats.record_wait(wait_time)
+            stats.running += 1
+            self._running += 1
+
+            account = self._clients[client]
+            self._virtual_time = max(self._virtual_time, account.virtual_time)
+            job._charged = account.cost_estimate / account.weight
+            account.virtual_time += job._charged
+
+        log.info(
+            f"Started {priority.value} job for client {client!r} "
+            f"after waiting {wait_time:.3f}s in the queue."
+        )
+
+        try:
+            yield job
+        finally:
+            with self._cond:
+                stats.running -= 1
+                self._running -= 1
+                self._finish(job)
+                self._cond.notify_all()
+
+    def stats(self) -> dict[str, object]:
+        """Return a snapshot of the scheduler's state, per-class wait times, and active clients."""
+        with self._cond:
+            self._sweep()
+            return {
+                "capacity": self.capacity,
+                "reserved_interactive": self.reserved_interactive,
+                "running": self._running,
+                "lanes": {p.value: asdict(s) for p, s in self._stats.items()},
+                "clients": {
+                    name: {
+                        "weight": client.weight,
+                        "active": client.active,
+                        "cpu_time": client.cpu_time,
+                        "quota": client.bucket.tokens if client.bucket else None,
+                    }
+                    for name, client in self._clients.items()
+                },
+            }
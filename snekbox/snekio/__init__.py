@@ -1,6 +1,40 @@
 from . import filesystem
+from .archive import ArchiveFormat, HomeArchive, write_archive
 from .attachment import FileAttachment, safe_path
-from .errors import IllegalPathError, ParsingError
+from .blobs import BlobAttachment, BlobStore
+from .downloads import Download, DownloadStore
+from .errors import (
+    BlobTooLargeError,
+    DepthLimitError,
+    IllegalPathError,
+    MemFSLimitError,
+    ParsingError,
+)
 from .memfs import MemFS
+from .pool import MemFSPool
+from .root import SandboxRoot
+from .walk import GlobMatcher
+from .watch import OutputWatcher
 
-__all__ = ("filesystem", "safe_path", "FileAttachment", "IllegalPathError", "MemFS", "ParsingError")
+__all__ = (
+    "filesystem",
+    "safe_path",
+    "write_archive",
+    "ArchiveFormat",
+    "BlobAttachment",
+    "BlobStore",
+    "BlobTooLargeError",
+    "DepthLimitError",
+    "Download",
+    "DownloadStore",
+    "FileAttachment",
+    "GlobMatcher",
+    "HomeArchive",
+    "IllegalPathError",
+    "MemFS",
+    "MemFSLimitError",
+    "MemFSPool",
+    "OutputWatcher",
+    "ParsingError",
+    "SandboxRoot",
+)
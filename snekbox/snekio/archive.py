@@ -0,0 +1,282 @@
+"""Packing of output files into a single archive, and extraction of input archives."""
+from __future__ import annotations
+
+import io
+import itertools
+import mmap
+import os
+import shutil
+import tarfile
+import threading
+import time
+import zipfile
+import zlib
+from collections.abc import Iterable
+from enum import Enum
+from pathlib import Path
+from tempfile import TemporaryFile
+from typing import BinaryIO
+
+from .attachment import FileAttachment
+from .errors import IllegalPathError, ParsingError
+
+__all__ = ("ArchiveFormat", "HomeArchive", "write_archive")
+
+WRITE_CHUNK_SIZE = 64 * 1024
+# Compression methods of zip members which `zipfile` can decompress.
+ZIP_COMPRESSIONS = frozenset(
+    (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED, zipfile.ZIP_BZIP2, zipfile.ZIP_LZMA)
+)
+# Flag of zip members which are encrypted.
+_ZIP_ENCRYPTED = 0x1
+
+
+class ArchiveFormat(str, Enum):
+    """Formats output files can be packed in."""
+
+    TAR = "tar"
+    ZIP = "zip"
+
+    def file_name(self, compress: bool) -> str:
+        """Return the name of an archive in this format."""
+        if self is ArchiveFormat.TAR:
+            return "output.tar.gz" if compress else "output.tar"
+        return "output.zip"
+
+
+class _ContentReader(io.RawIOBase):
+    """A readable file over the content of an attachment, which doesn't copy it up front."""
+
+    def __init__(self, content: bytes | memoryview):
+        self._content = memoryview(content)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:
+        chunk = self._content[self._position : self._position + len(buffer)]
+        buffer[: len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def close(self) -> None:
+        self._content.release()
+        super().close()
+
+
+def _write_tar(archive: io.BufferedRandom, files: Iterable[FileAttachment], compress: bool) -> None:
+    mtime = time.time()
+    with tarfile.open(fileobj=archive, mode="w:gz" if compress else "w") as tar:
+        for file in files:
+            info = tarfile.TarInfo(file.path)
+            info.size = file.size
+            info.mode = 0o644
+            info.mtime = mtime
+            try:
+                with _ContentReader(file.content) as reader:
+                    tar.addfile(info, reader)
+            finally:
+                file.close()
+
+
+def _write_zip(archive: io.BufferedRandom, files: Iterable[FileAttachment], compress: bool) -> None:
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(archive, "w", compression=compression) as zf:
+        for file in files:
+            try:
+                with zf.open(file.path, "w") as dest, memoryview(file.content) as content:
+                    for start in range(0, len(content), WRITE_CHUNK_SIZE):
+                        dest.write(content[start : start + WRITE_CHUNK_SIZE])
+            finally:
+                file.close()
+
+
+def write_archive(
+    files: Iterable[FileAttachment], archive_format: ArchiveFormat, compress: bool = False
+) -> FileAttachment | None:
+    """
+    Pack `files` into an archive and return it as a memory-mapped attachment, or None if empty.
+
+    The files are consumed, and closed, one at a time, so that they can be produced lazily while
+    an output directory is walked. The archive is written to an anonymous temporary file rather
+    than held in memory; close the attachment once it's been used.
+
+    Args:
+        files: The attachments to pack.
+        archive_format: The format of the archive.
+        compress: Whether to compress the archive with gzip for tar, or deflate for zip.
+    """
+    files = iter(files)
+    first = next(files, None)
+    if first is None:
+        return None
+    files = itertools.chain([first], files)
+
+    with TemporaryFile() as archive:
+        if archive_format is ArchiveFormat.TAR:
+            _write_tar(archive, files, compress)
+        else:
+            _write_zip(archive, files, compress)
+
+        archive.flush()
+        mapping = mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return FileAttachment(archive_format.file_name(compress), memoryview(mapping), mapping)
+
+
+def _member_path(name: str) -> str:
+    """
+    Return the normalised path of an archive member, validating it without touching the disk.
+
+    Raises:
+        IllegalPathError: If the path is absolute, traverses upwards, or contains a null byte.
+    """
+    if name.startswith("/"):
+        raise IllegalPathError(f"File path '{name}' must be relative")
+    if "\0" in name:
+        raise IllegalPathError(f"File path '{name}' may not contain null bytes")
+
+    parts = [part for part in name.split("/") if part not in ("", ".")]
+    if ".." in parts:
+        raise IllegalPathError(f"File path '{name}' may not traverse beyond root")
+
+    return "/".join(parts)
+
+
+def _check_zip_member(member: zipfile.ZipInfo) -> None:
+    """
+    Check that the content of a zip member can be read without a password.
+
+    Raises:
+        ParsingError: If the member is encrypted or uses an unsupported compression method.
+    """
+    if member.flag_bits & _ZIP_ENCRYPTED:
+        raise ParsingError(f"File '{member.filename}' is encrypted")
+    if member.compress_type not in ZIP_COMPRESSIONS:
+        raise ParsingError(
+            f"File '{member.filename}' uses unsupported compression method {member.compress_type}"
+        )
+
+
+class HomeArchive:
+    """
+    An archive of files to extract into the home directory before the code is run.
+
+    The member paths are validated lexically when the archive is opened, so no paths are
+    resolved on the host. Extraction then creates all directories up front and writes each file
+    through a single file descriptor, reading the members in the order they're stored.
+    Extractions share the archive's file, so they're serialised when it's extracted into
+    several sandboxes at once.
+    """
+
+    def __init__(self, file: BinaryIO, archive_format: ArchiveFormat):
+        """
+        Validate the archive in `file`, which must be seekable. Tar archives may be compressed.
+
+        Raises:
+            IllegalPathError: If a member has an illegal path, or isn't a file or directory.
+            ParsingError: If the archive is invalid, or a zip member is encrypted or uses an
+                unsupported compression method.
+        """
+        self.file = file
+        self.archive_format = archive_format
+        self._archive: tarfile.TarFile | zipfile.ZipFile | None = None
+        # The paths of the files, with the members to read them from.
+        self._files: list[tuple[str, tarfile.TarInfo | zipfile.ZipInfo]] = []
+        # Every directory which has to exist before the files can be written.
+        self._dirs: set[str] = set()
+        self._lock = threading.Lock()
+
+        file.seek(0)
+        try:
+            if archive_format is ArchiveFormat.TAR:
+                self._archive = tarfile.open(fileobj=file, mode="r:*")
+                members = [(m.name, m.isdir(), m) for m in self._archive.getmembers()]
+                for _, _, member in members:
+                    if not member.isreg() and not member.isdir():
+                        raise IllegalPathError(
+                            f"File '{member.name}' must be a regular file or directory"
+                        )
+            else:
+                self._archive = zipfile.ZipFile(file)
+                members = [(i.filename, i.is_dir(), i) for i in self._archive.infolist()]
+                for _, _, member in members:
+                    _check_zip_member(member)
+            self._add_members(members)
+        except (tarfile.TarError, zipfile.BadZipFile, EOFError, zlib.error) as e:
+            self.close()
+            raise ParsingError(f"Invalid {archive_format.value} archive") from e
+        except BaseException:
+            self.close()
+            raise
+
+    def _add_members(
+        self, members: Iterable[tuple[str, bool, tarfile.TarInfo | zipfile.ZipInfo]]
+    ) -> None:
+        """Validate the paths of `members` and record the files and directories to create."""
+        for name, is_dir, member in members:
+            path = _member_path(name)
+            if is_dir:
+                if path:
+                    self._dirs.add(path)
+                continue
+
+            if not path:
+                raise IllegalPathError("File path may not be empty")
+            self._files.append((path, member))
+            parent, _, _ = path.rpartition("/")
+            while parent and parent not in self._dirs:
+                self._dirs.add(parent)
+                parent, _, _ = parent.rpartition("/")
+
+    @property
+    def files(self) -> int:
+        """Number of files in the archive."""
+        return len(self._files)
+
+    def _open_member(self, member: tarfile.TarInfo | zipfile.ZipInfo) -> BinaryIO:
+        """Open the content of a file in the archive."""
+        if isinstance(self._archive, tarfile.TarFile):
+            return self._archive.extractfile(member)
+        return self._archive.open(member)
+
+    def extract_to(self, directory: Path) -> dict[Path, float]:
+        """
+        Extract the files into `directory`. Return the paths written and their modified times.
+
+        Raises:
+            OSError: If a directory or file can't be created.
+            ParsingError: If the content of a file is invalid.
+        """
+        with self._lock:
+            return self._extract_to(directory)
+
+    def _extract_to(self, directory: Path) -> dict[Path, float]:
+        for path in sorted(self._dirs):
+            try:
+                os.mkdir(directory / path)
+            except FileExistsError:
+                pass
+
+        files_written = {}
+        try:
+            for path, member in self._files:
+                file = directory / path
+                fd = os.open(file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW, 0o777)
+                with open(fd, "wb") as dest, self._open_member(member) as src:
+                    # Allow the file to be writable, regardless of the umask.
+                    os.fchmod(fd, 0o777)
+                    shutil.copyfileobj(src, dest, WRITE_CHUNK_SIZE)
+                    dest.flush()
+                    files_written[file] = os.fstat(fd).st_mtime
+        except (tarfile.TarError, zipfile.BadZipFile, EOFError, zlib.error) as e:
+            raise ParsingError(f"Invalid {self.archive_format.value} archive") from e
+
+        return files_written
+
+    def close(self) -> None:
+        """Close the archive and its file."""
+        if self._archive is not None:
+            self._archive.close()
+        self.file.close()
@@ -1,15 +1,21 @@
 """I/O Operations for sending / receiving files from the sandbox."""
 from __future__ import annotations
 
+import mmap
 from base64 import b64decode, b64encode
-from dataclasses import dataclass
+from collections.abc import Generator
+from dataclasses import dataclass, field
 from functools import cached_property
 from pathlib import Path
+from typing import BinaryIO
 
 from .errors import IllegalPathError, ParsingError
 
 __all__ = ("safe_path", "FileAttachment")
 
+# Bytes of content encoded at a time when streaming; a multiple of 3 so chunks need no padding.
+ENCODE_CHUNK_SIZE = 3 * 64 * 1024
+
 
 def safe_path(path: str) -> str:
     """
@@ -37,11 +43,12 @@ class FileAttachment:
     """A file attachment."""
 
     path: str
-    content: bytes
+    content: bytes | memoryview
+    _mapping: mmap.mmap | None = field(default=None, compare=False, repr=False)
 
     def __repr__(self) -> str:
         path = f"{self.path[:30]}..." if len(self.path) > 30 else self.path
-        content = f"{self.content[:15]}..." if len(self.content) > 15 else self.content
+        content = f"{bytes(self.content[:15])}..." if self.size > 15 else bytes(self.content)
         return f"{self.__class__.__name__}(path={path!r}, content={content!r})"
 
     @classmethod
@@ -60,13 +67,17 @@ class FileAttachment:
         return cls(path, content)
 
     @classmethod
-    def from_path(cls, file: Path, relative_to: Path | None = None) -> FileAttachment:
+    def from_path(
+        cls, file: Path, relative_to: Path | None = None, mapped: bool = False
+    ) -> FileAttachment:
         """
         Create an attachment from a file path.
 
         Args:
             file: The file to attach.
             relative_to: The root for the path name.
+            mapped: Whether to map the file into memory instead of reading it. The content is then
+                a read-only memoryview, and the attachment must be closed once it's been used.
         Raises:
             IllegalPathError: If path name contains characters that can't be encoded in UTF-8
         """
@@ -78,7 +89,36 @@ class FileAttachment:
         except UnicodeEncodeError as e:
             raise IllegalPathError("File paths may not contain invalid byte sequences") from e
 
-        return cls(str(path), file.read_bytes())
+        if not mapped:
+            return cls(str(path), file.read_bytes())
+
+        with open(file, "rb") as f:
+            return cls.from_file(str(path), f, mapped=True)
+
+    @classmethod
+    def from_file(cls, path: str, file: BinaryIO, mapped: bool = False) -> FileAttachment:
+        """
+        Create an attachment at `path` from the content of an open file.
+
+        The file can be closed afterwards. See `from_path` for `mapped`.
+        """
+        if not mapped:
+            return cls(path, file.read())
+
+        try:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped.
+            return cls(path, b"")
+
+        return cls(path, memoryview(mapping), mapping)
+
+    def close(self) -> None:
+        """Unmap the content of a mapped attachment. Does nothing for other attachments."""
+        if self._mapping is not None and not self._mapping.closed:
+            if isinstance(self.content, memoryview):
+                self.content.release()
+            self._mapping.close()
 
     @property
     def size(self) -> int:
@@ -93,6 +133,28 @@ class FileAttachment:
         file.write_bytes(self.content)
         return file
 
+    def iter_base64(self, chunk_size: int = ENCODE_CHUNK_SIZE) -> Generator[bytes, None, None]:
+        """
+        Yield the content encoded as base64, `chunk_size` bytes of content at a time.
+
+        Only one chunk of content and its encoding are held in memory at once.
+        """
+        if chunk_size % 3:
+            raise ValueError("chunk_size must be a multiple of 3")
+
+        content = memoryview(self.content)
+        try:
+            for start in range(0, len(content), chunk_size):
+                with content[start : start + chunk_size] as chunk:
+                    yield b64encode(chunk)
+        finally:
+            content.release()
+
+    @property
+    def encoded_size(self) -> int:
+        """Length of the content encoded as base64."""
+        return -(-self.size // 3) * 4
+
     @cached_property
     def as_dict(self) -> dict[str, str | int]:
         """Convert the attachment to a dict."""
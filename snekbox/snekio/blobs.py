@@ -0,0 +1,168 @@
+"""Content-addressed storage for files uploaded ahead of evaluations."""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from snekbox.utils.counters import Counters
+
+from .errors import BlobTooLargeError
+from .store import FileStore
+
+log = logging.getLogger(__name__)
+
+__all__ = ("BlobAttachment", "BlobStore")
+
+READ_CHUNK_SIZE = 64 * 1024
+DIGEST_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+@dataclass(frozen=True)
+class BlobAttachment:
+    """A file attachment whose content is a blob held open from a BlobStore."""
+
+    path: str
+    blob: BinaryIO
+    size: int
+
+    def save_to(self, directory: Path | str) -> Path:
+        """
+        Copy the blob to a file in `directory`. Return a Path of the file.
+
+        The content is copied within the kernel, without passing through user space.
+        """
+        file = Path(directory, self.path)
+        # Create directories if they don't exist
+        file.parent.mkdir(parents=True, exist_ok=True)
+        with open(file, "wb") as f:
+            offset = 0
+            while offset < self.size:
+                sent = os.sendfile(f.fileno(), self.blob.fileno(), offset, self.size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        return file
+
+    def close(self) -> None:
+        """Close the blob."""
+        self.blob.close()
+
+
+class BlobStore(FileStore):
+    """
+    A size-bounded store of blobs addressed by their SHA-256 digest.
+
+    When the total size exceeds the limit, the least recently used blobs are deleted. Blobs
+    which are open when they're deleted stay readable until they're closed.
+    """
+
+    def __init__(self, root: str | Path, max_size: int, max_blob_size: int):
+        """
+        Create a store of the blobs in `root`, including those left by a previous run.
+
+        Blobs which are already in `root` are kept, and are the first to be evicted, from the
+        least recently modified.
+
+        Args:
+            root: Directory to store the blobs in.
+            max_size: Maximum total size of the blobs in bytes.
+            max_blob_size: Maximum size of a single blob in bytes.
+        """
+        super().__init__(root)
+        self.max_size = max_size
+        self.max_blob_size = min(max_blob_size, max_size)
+        self.counters = Counters("added", "hits", "misses", "evicted")
+
+        self._lock = threading.Lock()
+        # Maps digests to sizes, from least to most recently used.
+        self._blobs: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+
+        existing = [
+            (file.name, file.stat())
+            for file in self.root.iterdir()
+            if DIGEST_PATTERN.fullmatch(file.name)
+        ]
+        for name, st in sorted(existing, key=lambda blob: blob[1].st_mtime):
+            self._blobs[name] = st.st_size
+            self._size += st.st_size
+
+    def add(self, stream: BinaryIO) -> tuple[str, int]:
+        """
+        Read a blob from `stream` into the store. Return its hex digest and size.
+
+        Raises:
+            BlobTooLargeError: If the blob is larger than the maximum size of a blob.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with self._upload() as f:
+            while chunk := stream.read(READ_CHUNK_SIZE):
+                size += len(chunk)
+                if size > self.max_blob_size:
+                    raise BlobTooLargeError(
+                        f"Blobs may not be larger than {self.max_blob_size} bytes"
+                    )
+                digest.update(chunk)
+                f.write(chunk)
+
+        name = digest.hexdigest()
+        with self._lock:
+            if name in self._blobs:
+                os.unlink(f.name)
+                self._blobs.move_to_end(name)
+                return name, size
+
+            os.chmod(f.name, 0o444)
+            os.rename(f.name, self.root / name)
+            self._blobs[name] = size
+            self._size += size
+            self.counters.increment("added")
+            self._evict()
+
+        log.info(f"Stored blob {name} of {size} bytes.")
+        return name, size
+
+    def _evict(self) -> None:
+        """Delete the least recently used blobs until the store is within its size limit."""
+        while self._size > self.max_size:
+            name, size = self._blobs.popitem(last=False)
+            self._size -= size
+            self.counters.increment("evicted")
+            (self.root / name).unlink(missing_ok=True)
+            log.info(f"Evicted blob {name} of {size} bytes.")
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._blobs
+
+    def open(self, name: str, path: str) -> BlobAttachment:
+        """
+        Open blob `name` as an attachment at `path` and mark it as recently used.
+
+        Raises:
+            KeyError: If the blob isn't in the store.
+        """
+        with self._lock:
+            if name not in self._blobs:
+                self.counters.increment("misses")
+                raise KeyError(name)
+
+            self._blobs.move_to_end(name)
+            self.counters.increment("hits")
+            # Open while locked so that the blob can't be evicted in between.
+            return BlobAttachment(path, open(self.root / name, "rb"), self._blobs[name])
+
+    def stats(self) -> dict[str, int]:
+        """Return the number and total size of the blobs, and how often they were used."""
+        with self._lock:
+            count, size = len(self._blobs), self._size
+
+        return {"count": count, "size": size, "max_size": self.max_size, **self.counters.as_dict()}
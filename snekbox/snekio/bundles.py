@@ -0,0 +1,86 @@
+"""Read-only datasets which are shared between sandboxes."""
+from __future__ import annotations
+
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+
+__all__ = ("Bundle", "BUNDLES_DIR", "load_bundles")
+
+log = logging.getLogger(__name__)
+
+# Directory in the sandbox under which bundles are mounted.
+BUNDLES_DIR = PurePosixPath("/bundles")
+NAME_PATTERN = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]*")
+
+
+@dataclass(frozen=True)
+class Bundle:
+    """A host file or directory which can be mounted read-only into sandboxes."""
+
+    name: str
+    path: Path
+    files: int
+    size: int
+
+    @property
+    def mount_point(self) -> PurePosixPath:
+        """Path of the bundle in the sandbox."""
+        return BUNDLES_DIR / self.name
+
+    @property
+    def as_dict(self) -> dict[str, str | int]:
+        """Convert the bundle to a dict."""
+        return {
+            "name": self.name,
+            "path": str(self.mount_point),
+            "files": self.files,
+            "size": self.size,
+        }
+
+    @classmethod
+    def from_path(cls, name: str, path: str | Path) -> Bundle:
+        """
+        Create a bundle, counting its files and their total size.
+
+        Raises:
+            ValueError: If the name or path is invalid.
+        """
+        if not NAME_PATTERN.fullmatch(name):
+            raise ValueError(f"Invalid bundle name {name!r}")
+
+        path = Path(path).resolve()
+        # NsJail separates the source and destination of mounts with a colon.
+        if ":" in str(path):
+            raise ValueError(f"Path of bundle {name!r} may not contain a colon")
+        if not path.exists():
+            raise ValueError(f"Path of bundle {name!r} does not exist: {path}")
+
+        if path.is_file():
+            return cls(name, path, 1, path.stat().st_size)
+
+        files = size = 0
+        for root, _, names in os.walk(path):
+            for file in names:
+                files += 1
+                size += Path(root, file).lstat().st_size
+
+        return cls(name, path, files, size)
+
+
+def load_bundles(paths: dict[str, str | Path] | None) -> dict[str, Bundle]:
+    """
+    Create bundles from a mapping of names to host paths.
+
+    Raises:
+        ValueError: If a name or path is invalid.
+    """
+    bundles = {}
+    for name, path in (paths or {}).items():
+        bundle = Bundle.from_path(name, path)
+        log.info(f"Loaded bundle {name!r} with {bundle.files} files of {bundle.size} bytes.")
+        bundles[name] = bundle
+
+    return bundles
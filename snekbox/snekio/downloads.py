@@ -0,0 +1,196 @@
+"""Short-lived copies of output files which are downloaded after the evaluation."""
+from __future__ import annotations
+
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+from snekbox.utils.counters import Counters
+
+from .attachment import FileAttachment
+from .store import FileStore
+
+log = logging.getLogger(__name__)
+
+__all__ = ("Download", "DownloadStore")
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9_-]{32}")
+DEFAULT_MIME_TYPE = "application/octet-stream"
+# How often, in seconds, expired downloads are deleted while the store is idle.
+PURGE_INTERVAL = 10.0
+
+
+@dataclass(frozen=True)
+class Download:
+    """Metadata of an output file retained for download."""
+
+    token: str | None
+    path: str
+    size: int
+    sha256: str
+    mime_type: str
+    expires: float
+
+    @property
+    def as_dict(self) -> dict[str, str | int]:
+        """Convert the download to a dict, without the URL to download it from."""
+        return {
+            "path": self.path,
+            "size": self.size,
+            "sha256": self.sha256,
+            "mime_type": self.mime_type,
+        }
+
+
+class _Leftover(NamedTuple):
+    """A file left by a previous run, whose metadata is lost, so it can't be downloaded."""
+
+    size: int
+    expires: float
+
+
+class DownloadStore(FileStore):
+    """
+    A size-bounded store of output files which expire after a fixed time.
+
+    Each file is addressed by a random token. When the total size exceeds the limit, the oldest
+    files are deleted early. Expired files are deleted by a background thread, as well as when
+    the store is used. Files which are open when they're deleted stay readable until they're
+    closed.
+    """
+
+    def __init__(self, root: str | Path, max_size: int, ttl: float):
+        """
+        Create a store in `root`, and start deleting the files in it as they expire.
+
+        Files left by a previous run can't be downloaded, as their metadata is lost. They count
+        towards the size limit, are the first to be evicted, and expire `ttl` seconds after they
+        were written, like the others.
+
+        Args:
+            root: Directory to store the files in.
+            max_size: Maximum total size of the files in bytes.
+            ttl: Time in seconds after which a file expires.
+        """
+        super().__init__(root)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.counters = Counters("added", "served", "expired", "evicted")
+
+        self._lock = threading.Lock()
+        # Maps tokens to downloads, from oldest to newest; they expire in the same order.
+        self._downloads: OrderedDict[str, Download] = OrderedDict()
+        # Files left by a previous run, likewise from oldest to newest.
+        self._leftovers: OrderedDict[str, _Leftover] = OrderedDict()
+        self._size = 0
+
+        now, wall_now = time.monotonic(), time.time()
+        existing = [
+            (file.name, file.stat())
+            for file in self.root.iterdir()
+            if TOKEN_PATTERN.fullmatch(file.name)
+        ]
+        for token, st in sorted(existing, key=lambda leftover: leftover[1].st_mtime):
+            expires = now + self.ttl - (wall_now - st.st_mtime)
+            self._leftovers[token] = _Leftover(st.st_size, expires)
+            self._size += st.st_size
+
+        self._closed = threading.Event()
+        self._purger = threading.Thread(
+            target=self._purge_periodically, name="download-purge", daemon=True
+        )
+        self._purger.start()
+
+    def add(self, file: FileAttachment) -> Download:
+        """
+        Copy `file` into the store and return its metadata.
+
+        The copy is written straight from the attachment's content, which can be memory-mapped.
+        If the file is larger than the whole store, it isn't retained and its token is None.
+        """
+        download = Download(
+            token=secrets.token_urlsafe(24) if file.size <= self.max_size else None,
+            path=file.path,
+            size=file.size,
+            sha256=hashlib.sha256(file.content).hexdigest(),
+            mime_type=mimetypes.guess_type(file.path)[0] or DEFAULT_MIME_TYPE,
+            expires=time.monotonic() + self.ttl,
+        )
+        if download.token is None:
+            log.info(f"Not retaining {file.path!r} as it's larger than the download store.")
+            return download
+
+        with self._upload() as f:
+            f.write(file.content)
+
+        with self._lock:
+            os.rename(f.name, self.root / download.token)
+            self._downloads[download.token] = download
+            self._size += download.size
+            self.counters.increment("added")
+            self._purge()
+
+        return download
+
+    def _delete(self, files: OrderedDict[str, Download | _Leftover], reason: str) -> None:
+        """Delete the oldest file in `files` and count it as `reason`."""
+        token, file = files.popitem(last=False)
+        self._size -= file.size
+        self.counters.increment(reason)
+        (self.root / token).unlink(missing_ok=True)
+
+    def _purge(self) -> None:
+        """Delete expired files, then the oldest ones until the store is within its limit."""
+        now = time.monotonic()
+        # Leftovers are older than every download, so they're evicted first.
+        for files in (self._leftovers, self._downloads):
+            while files:
+                file = next(iter(files.values()))
+                if file.expires <= now:
+                    self._delete(files, "expired")
+                elif self._size > self.max_size:
+                    self._delete(files, "evicted")
+                else:
+                    break
+
+    def _purge_periodically(self) -> None:
+        """Delete expired files every `PURGE_INTERVAL` seconds until the store is closed."""
+        while not self._closed.wait(PURGE_INTERVAL):
+            with self._lock:
+                self._purge()
+
+    def open(self, token: str) -> tuple[Download, BinaryIO]:
+        """
+        Open the file of the download `token` for reading.
+
+        Raises:
+            KeyError: If the download doesn't exist or has expired.
+        """
+        with self._lock:
+            self._purge()
+            download = self._downloads[token]
+            self.counters.increment("served")
+            # Open while locked so that the file can't be deleted in between.
+            return download, open(self.root / token, "rb")
+
+    def stats(self) -> dict[str, int]:
+        """Return the number and total size of the retained files, and what became of them."""
+        with self._lock:
+            self._purge()
+            count, size = len(self._downloads) + len(self._leftovers), self._size
+
+        return {"count": count, "size": size, "max_size": self.max_size, **self.counters.as_dict()}
+
+    def close(self) -> None:
+        """Stop deleting expired files in the background; the files are kept."""
+        self._closed.set()
+        self._purger.join()
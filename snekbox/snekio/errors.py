@@ -4,3 +4,15 @@ class ParsingError(ValueError):
 
 class IllegalPathError(ParsingError):
     """Raised when a request file has an illegal path."""
+
+
+class DepthLimitError(ParsingError):
+    """Raised when output files are nested in too many directories."""
+
+
+class BlobTooLargeError(ValueError):
+    """Raised when an uploaded blob exceeds the maximum blob size."""
+
+
+class MemFSLimitError(RuntimeError):
+    """Raised when too many MemFS instances are held to acquire another in time."""
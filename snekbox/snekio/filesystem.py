@@ -4,10 +4,10 @@ from __future__ import annotations
 import ctypes
 import os
 from ctypes.util import find_library
-from enum import IntEnum
+from enum import IntEnum, IntFlag
 from pathlib import Path
 
-__all__ = ("mount", "unmount", "Size", "UnmountFlags")
+__all__ = ("mount", "unmount", "MountFlags", "Size", "UnmountFlags")
 
 libc = ctypes.CDLL(find_library("c"), use_errno=True)
 libc.mount.argtypes = (
@@ -29,6 +29,16 @@ class Size(IntEnum):
     TiB = 1024**4
 
 
+class MountFlags(IntFlag):
+    """Flags for mount."""
+
+    MS_RDONLY = 1
+    MS_REMOUNT = 32
+    MS_BIND = 4096
+    MS_REC = 16384
+    MS_PRIVATE = 1 << 18
+
+
 class UnmountFlags(IntEnum):
     """Flags for umount2."""
 
@@ -38,7 +48,13 @@ class UnmountFlags(IntEnum):
     UMOUNT_NOFOLLOW = 8
 
 
-def mount(source: Path | str, target: Path | str, fs: str, **options: str | int) -> None:
+def mount(
+    source: Path | str,
+    target: Path | str,
+    fs: str,
+    flags: MountFlags | int = 0,
+    **options: str | int,
+) -> None:
     """
     Mount a filesystem.
 
@@ -46,20 +62,23 @@ def mount(source: Path | str, target: Path | str, fs: str, **options: str | int)
 
     Args:
         source: Source directory or device.
-        target: Target directory.
-        fs: Filesystem type.
+        target: Target directory, or file for a bind mount of a file.
+        fs: Filesystem type; ignored by bind mounts and remounts.
+        flags: Mount flags, e.g. to bind mount `source`, or to remount `target` read-only.
         **options: Mount options.
 
     Raises:
         OSError: On any mount error.
     """
-    if Path(target).is_mount():
+    # Remounts and propagation changes apply to an existing mount point.
+    existing = flags & (MountFlags.MS_REMOUNT | MountFlags.MS_PRIVATE)
+    if not existing and Path(target).is_mount():
         raise OSError(f"{target} is already a mount point")
 
-    kwargs = " ".join(f"{key}={value}" for key, value in options.items())
+    kwargs = ",".join(f"{key}={value}" for key, value in options.items())
 
     result: int = libc.mount(
-        str(source).encode(), str(target).encode(), fs.encode(), 0, kwargs.encode()
+        str(source).encode(), str(target).encode(), fs.encode(), int(flags), kwargs.encode()
     )
     if result < 0:
         errno = ctypes.get_errno()
@@ -1,8 +1,9 @@
 """Memory filesystem for snekbox."""
 from __future__ import annotations
 
-import glob
 import logging
+import os
+import stat
 import time
 import warnings
 import weakref
@@ -15,6 +16,7 @@ from uuid import uuid4
 
 from snekbox.snekio import FileAttachment
 from snekbox.snekio.filesystem import mount, unmount
+from snekbox.snekio.walk import GlobMatcher, walk_files
 
 log = logging.getLogger(__name__)
 
@@ -64,6 +66,7 @@ class MemFS:
 
         self.mkdir(self.home)
         self.mkdir(self.output)
+        self._baseline = self._usage()
 
         self._finalizer = weakref.finalize(
             self,
@@ -86,6 +89,69 @@ class MemFS:
             unmount(self.path)
             self.path.rmdir()
 
+    def _usage(self) -> tuple[int, int, int]:
+        """Return the size, free blocks, and used inodes of the tmpfs."""
+        st = os.statvfs(self.path)
+        return st.f_blocks, st.f_bfree, st.f_files - st.f_ffree
+
+    def reset(self) -> None:
+        """
+        Delete everything in the tmpfs and recreate the home and output directories.
+
+        The directories themselves are recreated too, so that no attributes set on them survive.
+        """
+        # Walk iteratively; the sandbox can nest directories deeper than the recursion limit.
+        stack = [(str(self.path), False)]
+        while stack:
+            path, emptied = stack.pop()
+            if emptied:
+                os.rmdir(path)
+                continue
+
+            if path != str(self.path):
+                stack.append((path, True))
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, False))
+                    else:
+                        os.unlink(entry.path)
+
+        self.mkdir(self.home)
+        self.mkdir(self.output)
+
+    def is_pristine(self) -> bool:
+        """
+        Return True if the tmpfs is in the same state as when it was mounted.
+
+        It must still be mounted, contain only the empty home and output directories with their
+        original owner and mode, and use no more blocks or inodes than a fresh instance. Usage
+        also accounts for files which were deleted while a process still had them open.
+        """
+        if not self.path.is_mount() or self._usage() != self._baseline:
+            return False
+
+        expected = set()
+        for directory in (self.home, self.output):
+            while directory != self.path:
+                expected.add(directory)
+                directory = directory.parent
+
+        found = set()
+        for root, dirs, files in os.walk(self.path):
+            found.update(Path(root, name) for name in (*dirs, *files))
+        if found != expected:
+            return False
+
+        for path in expected:
+            st = path.lstat()
+            if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.geteuid():
+                return False
+            if path in (self.home, self.output) and stat.S_IMODE(st.st_mode) != 0o777:
+                return False
+
+        return True
+
     @property
     def name(self) -> str:
         """Name of the temp dir."""
@@ -124,39 +190,45 @@ class MemFS:
 
     def files(
         self,
-        limit: int,
-        pattern: str = "**/*",
+        limit: int | None,
+        pattern: str | GlobMatcher = "**/*",
         exclude_files: dict[Path, float] | None = None,
         timeout: float | None = None,
+        max_depth: int | None = None,
+        mapped: bool = False,
     ) -> Generator[FileAttachment, None, None]:
         """
         Yields FileAttachments for files found in the output directory.
 
         Args:
             limit: The maximum number of files to parse.
-            pattern: The glob pattern to match files against.
+            pattern: The glob pattern to match files against, or a compiled matcher.
             exclude_files: A dict of Paths and last modified times.
                 Files will be excluded if their last modified time
                 is equal to the provided value.
             timeout: Maximum time in seconds for file parsing.
+            max_depth: Maximum number of directories to descend into.
+            mapped: Whether to map files into memory instead of reading them;
+                see `FileAttachment.from_path`.
         Raises:
             TimeoutError: If file parsing exceeds timeout.
+            DepthLimitError: If directories are nested deeper than `max_depth`.
         """
-        start_time = time.monotonic()
+        # The sandbox could replace the output directory with a symlink to anywhere on the host.
+        if self.output.is_symlink() or not self.output.is_dir():
+            log.info("Output directory is missing, skipping attachments")
+            return
+
+        deadline = time.monotonic() + timeout if timeout else None
+        matcher = pattern if isinstance(pattern, GlobMatcher) else GlobMatcher(pattern)
         count = 0
         total_size = 0
-        files = glob.iglob(pattern, root_dir=str(self.output), recursive=True, include_hidden=False)
-        for file in (Path(self.output, f) for f in files):
-            if timeout and (time.monotonic() - start_time) > timeout:
-                raise TimeoutError("File parsing timeout exceeded in MemFS.files")
-
-            if not file.is_file():
-                continue
-
-            # file.is_file allows file to be a regular file OR a symlink pointing to a regular file.
-            # It is important that we follow symlinks here, so when we check st_size later it is the
-            # size of the underlying file rather than of the symlink.
-            stat = file.stat(follow_symlinks=True)
+        for entry, _ in walk_files(self.output, matcher, max_depth, deadline):
+            # entry.is_file allows it to be a regular file OR a symlink pointing to a regular file.
+            # It is important that we follow symlinks here, so that st_size is the size of
+            # the underlying file rather than of the symlink.
+            stat = entry.stat(follow_symlinks=True)
+            file = Path(entry.path)
 
             if exclude_files and (orig_time := exclude_files.get(file)):
                 new_time = stat.st_mtime
@@ -165,7 +237,7 @@ class MemFS:
                     log.info(f"Skipping {file.name!r} as it has not been modified")
                     continue
 
-            if count > limit:
+            if limit is not None and count >= limit:
                 log.info(f"Max attachments {limit} reached, skipping remaining files")
                 break
 
@@ -179,41 +251,60 @@ class MemFS:
 
             count += 1
             log.info(f"Found valid file for upload {file.name!r}")
-            yield FileAttachment.from_path(file, relative_to=self.output)
+            yield FileAttachment.from_path(file, relative_to=self.output, mapped=mapped)
 
     def files_list(
         self,
-        limit: int,
-        pattern: str,
+        limit: int | None,
+        pattern: str | GlobMatcher,
         exclude_files: dict[Path, float] | None = None,
         preload_dict: bool = False,
         timeout: float | None = None,
+        max_depth: int | None = None,
+        mapped: bool = False,
     ) -> list[FileAttachment]:
         """
         Return a sorted list of file paths within the output directory.
 
         Args:
             limit: The maximum number of files to parse.
-            pattern: The glob pattern to match files against.
+            pattern: The glob pattern to match files against, or a compiled matcher.
             exclude_files: A dict of Paths and last modified times.
                 Files will be excluded if their last modified time
                 is equal to the provided value.
             preload_dict: Whether to preload as_dict property data.
             timeout: Maximum time in seconds for file parsing.
+            max_depth: Maximum number of directories to descend into.
+            mapped: Whether to map files into memory instead of reading them;
+                see `FileAttachment.from_path`.
         Returns:
             List of FileAttachments sorted lexically by path name.
         Raises:
             TimeoutError: If file parsing exceeds timeout.
+            DepthLimitError: If directories are nested deeper than `max_depth`.
         """
         start_time = time.monotonic()
-        res = sorted(
-            self.files(limit=limit, pattern=pattern, exclude_files=exclude_files),
-            key=lambda f: f.path,
-        )
-        if preload_dict:
+        res = []
+        try:
+            res.extend(
+                self.files(
+                    limit=limit,
+                    pattern=pattern,
+                    exclude_files=exclude_files,
+                    timeout=timeout,
+                    max_depth=max_depth,
+                    mapped=mapped,
+                )
+            )
+            res.sort(key=lambda f: f.path)
+            if preload_dict:
+                for file in res:
+                    if timeout and (time.monotonic() - start_time) > timeout:
+                        raise TimeoutError("File parsing timeout exceeded in MemFS.files_list")
+                    # Loads the cached property as attribute
+                    _ = file.as_dict
+        except BaseException:
             for file in res:
-                if timeout and (time.monotonic() - start_time) > timeout:
-                    raise TimeoutError("File parsing timeout exceeded in MemFS.files_list")
-                # Loads the cached property as attribute
-                _ = file.as_dict
+                file.close()
+            raise
         return res
@@ -0,0 +1,122 @@
+"""Pool of reusable memory filesystems."""
+from __future__ import annotations
+
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+
+from snekbox.snekio.errors import MemFSLimitError
+from snekbox.snekio.memfs import MemFS
+from snekbox.utils.pool import Pool
+
+__all__ = ("MemFSPool",)
+
+
+class MemFSPool(Pool[MemFS]):
+    """
+    A pool of mounted MemFS instances which are wiped and handed out again.
+
+    Released instances are wiped in a background thread and only return to the pool if they pass
+    an integrity check; otherwise they are unmounted. When the last idle instance is handed out,
+    another one is mounted in the background, so that the next job doesn't have to wait for it.
+
+    An instance is held until its attachments have been sent, which can outlast the job by far
+    for a slow client. The number of instances held at once can be limited, so that their memory
+    stays bounded regardless of how fast the responses are read.
+    """
+
+    def __init__(
+        self,
+        instance_size: int,
+        root_dir: str | Path = "/memfs",
+        home: str = "home",
+        output: str = "home",
+        size: int = 4,
+        limit: int | None = None,
+    ) -> None:
+        """
+        Initialize an empty pool.
+
+        Args:
+            instance_size: Size limit of each tmpfs instance in bytes.
+            root_dir: Root directory to mount instances in.
+            home: Name of the home directory.
+            output: Name of the output directory within home. If empty, uses home.
+            size: Maximum number of idle instances to keep. If 0, each instance is unmounted
+                as soon as it's released.
+            limit: Maximum number of instances held at once, or None for no limit.
+        """
+        super().__init__(size, thread_name_prefix="memfs-pool")
+        self.instance_size = instance_size
+        self.root_dir = root_dir
+        self.home = home
+        self.output = output
+
+        self._limit = limit
+        self._held = 0
+        self._released = threading.Condition()
+
+    @property
+    def limit(self) -> int | None:
+        """Maximum number of instances held at once, or None for no limit."""
+        return self._limit
+
+    @limit.setter
+    def limit(self, limit: int | None) -> None:
+        with self._released:
+            self._limit = limit
+            self._released.notify_all()
+
+    @contextmanager
+    def acquire(self, timeout: float | None = None) -> Generator[MemFS, None, None]:
+        """
+        Hold an empty MemFS instance within the context.
+
+        If the limit of instances are held, wait for one to be released.
+
+        Args:
+            timeout: Maximum time in seconds to wait for an instance to be released, or None to
+                wait indefinitely.
+
+        Raises:
+            MemFSLimitError: If no instance was released before the timeout.
+
+        Examples:
+            >>> with pool.acquire() as memfs:
+            ...     (memfs.home / "test.txt").write_text("Hello")
+        """
+        with self._released:
+            if not self._released.wait_for(
+                lambda: self._limit is None or self._held < self._limit, timeout
+            ):
+                raise MemFSLimitError(f"All {self._limit} MemFS instances are held")
+            self._held += 1
+
+        try:
+            with super().acquire() as fs:
+                yield fs
+        finally:
+            with self._released:
+                self._held -= 1
+                self._released.notify()
+
+    def stats(self) -> dict[str, int | None]:
+        """Return the pool's stats, with the number of instances held and their limit."""
+        with self._released:
+            held, limit = self._held, self._limit
+
+        return {**super().stats(), "held": held, "limit": limit}
+
+    def _new(self) -> MemFS:
+        """Mount a new instance."""
+        return MemFS(self.instance_size, self.root_dir, self.home, self.output)
+
+    def _reset(self, fs: MemFS) -> bool:
+        """Wipe `fs` and return whether it's pristine afterwards."""
+        fs.reset()
+        return fs.is_pristine()
+
+    def _close(self, fs: MemFS) -> None:
+        """Unmount `fs`."""
+        fs.cleanup()
@@ -0,0 +1,174 @@
+"""A read-only root for the sandbox which is mounted once and shared by every jail."""
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import os
+from collections.abc import Iterable
+from pathlib import Path, PurePosixPath
+
+from google.protobuf import text_format
+
+from snekbox.config_pb2 import MountPt, NsJailConfig
+from snekbox.snekio.filesystem import MountFlags, Size, mount, unmount
+
+__all__ = ("SandboxRoot",)
+
+log = logging.getLogger(__name__)
+
+# The tmpfs only holds the mount points, so it can be small.
+ROOT_SIZE = 1 * Size.MiB
+
+
+class SandboxRoot:
+    """
+    The read-only bind mounts of an NsJail config, mounted once in a tree on the host.
+
+    NsJail sets up every mount in its config for each jail it creates. Instead, the read-only
+    bind mounts are made once in a read-only tmpfs, and each jail mounts that tree as its root
+    with a single recursive bind. The remaining mounts, such as the home directory, are still
+    made by NsJail for each jail, so the tree also contains an empty mount point for each.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        config: NsJailConfig,
+        mount_points: Iterable[tuple[str | PurePosixPath, bool]] = (),
+    ):
+        """
+        Split the mounts of `config` into those consolidated in the tree and the remaining ones.
+
+        Args:
+            path: Directory to mount the tree at. The derived config, a manifest, and a lock
+                file are kept next to it.
+            config: NsJail config whose read-only bind mounts to consolidate.
+            mount_points: Paths in the sandbox of mounts which NsJail makes for each jail
+                besides those in the config, each with whether it's a directory.
+        """
+        self.path = Path(path)
+        self.config_path = self.path.with_name(f"{self.path.name}.cfg")
+        self._manifest_path = self.path.with_name(f"{self.path.name}.json")
+        self._lock_path = self.path.with_name(f"{self.path.name}.lock")
+
+        self.binds: list[tuple[Path, PurePosixPath]] = []
+        self.mount_points = {PurePosixPath("/", dst): is_dir for dst, is_dir in mount_points}
+
+        # The derived config, which mounts the tree as the root before the remaining mounts.
+        self.config = NsJailConfig()
+        self.config.CopyFrom(config)
+        del self.config.mount[:]
+        self.config.mount.append(MountPt(src=str(self.path), dst="/", is_bind=True, rw=False))
+
+        for mount_pt in config.mount:
+            if not self._consolidates(mount_pt):
+                self.config.mount.append(mount_pt)
+                is_dir = not mount_pt.is_bind or not os.path.isfile(mount_pt.src)
+                self.mount_points.setdefault(PurePosixPath("/", mount_pt.dst), is_dir)
+            elif os.path.exists(mount_pt.src):
+                self.binds.append((Path(mount_pt.src), PurePosixPath(mount_pt.dst)))
+            else:
+                # NsJail skips missing sources of optional mounts too.
+                log.info(f"Skipping the optional mount of missing {mount_pt.src!r}.")
+
+    @staticmethod
+    def _consolidates(mount_pt: MountPt) -> bool:
+        """Return whether `mount_pt` is a plain read-only bind mount which can be consolidated."""
+        if not mount_pt.is_bind or mount_pt.rw or mount_pt.is_symlink:
+            return False
+        if mount_pt.nosuid or mount_pt.nodev or mount_pt.noexec:
+            return False
+        if mount_pt.src_content or mount_pt.prefix_src_env or mount_pt.prefix_dst_env:
+            return False
+        if not (mount_pt.src.startswith("/") and mount_pt.dst.startswith("/")):
+            return False
+
+        # A missing mandatory source is left to NsJail, which then fails as it would without this.
+        return os.path.exists(mount_pt.src) or not mount_pt.mandatory
+
+    @property
+    def manifest(self) -> dict[str, list]:
+        """The mounts and mount points of the tree, to tell whether a mounted tree is current."""
+        return {
+            "binds": [[str(src), str(dst)] for src, dst in self.binds],
+            "mount_points": sorted([str(dst), is_dir] for dst, is_dir in self.mount_points.items()),
+        }
+
+    def build(self) -> Path:
+        """
+        Mount the tree, unless a current one is already mounted, and write the derived config.
+
+        The tree is built by whichever process gets to it first, and the others reuse it.
+        Return the path of the derived config.
+
+        Raises:
+            OSError: If the tree couldn't be mounted.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self._lock_path, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+            if self.path.is_mount() and self._read_manifest() == self.manifest:
+                log.info(f"Reusing the sandbox root at {self.path}.")
+            else:
+                self._mount()
+                self._manifest_path.write_text(json.dumps(self.manifest), encoding="utf-8")
+                log.info(f"Mounted {len(self.binds)} read-only binds in the sandbox root.")
+
+            temp_path = self.config_path.with_name(f"{self.config_path.name}.{os.getpid()}")
+            temp_path.write_text(text_format.MessageToString(self.config), encoding="utf-8")
+            os.replace(temp_path, self.config_path)
+
+        return self.config_path
+
+    def _read_manifest(self) -> dict[str, list] | None:
+        """Return the manifest of the mounted tree, or None if there is none."""
+        try:
+            return json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _mount(self) -> None:
+        """Mount the tree at `path`, replacing any outdated tree."""
+        if self.path.is_mount():
+            # Jails which are running keep the outdated tree until they exit.
+            unmount(self.path)
+
+        mount("", self.path, "tmpfs", size=ROOT_SIZE, mode="755")
+        try:
+            # Don't propagate the mounts in the tree to the host's other mount namespaces.
+            mount("", self.path, "", MountFlags.MS_PRIVATE | MountFlags.MS_REC)
+            for src, dst in self.binds:
+                target = self._create(dst, src.is_dir())
+                mount(src, target, "", MountFlags.MS_BIND | MountFlags.MS_REC)
+                # The read-only flag of a bind mount only applies once it's remounted.
+                remount = MountFlags.MS_REMOUNT | MountFlags.MS_BIND | MountFlags.MS_RDONLY
+                mount("", target, "", remount)
+
+            for dst, is_dir in self.mount_points.items():
+                self._create(dst, is_dir)
+
+            # Otherwise, NsJail could create mount points on the host for the jails' mounts.
+            mount("", self.path, "", MountFlags.MS_REMOUNT | MountFlags.MS_RDONLY)
+        except OSError:
+            unmount(self.path)
+            raise
+
+    def _create(self, dst: PurePosixPath, is_dir: bool) -> Path:
+        """Create a directory or empty file at `dst` in the tree, unless it exists."""
+        target = self.path / dst.relative_to("/")
+        if is_dir:
+            target.mkdir(parents=True, exist_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if not target.exists():
+                target.touch()
+        return target
+
+    def cleanup(self) -> None:
+        """Unmount the tree and remove the derived config and the manifest."""
+        if self.path.is_mount():
+            unmount(self.path)
+        self.config_path.unlink(missing_ok=True)
+        self._manifest_path.unlink(missing_ok=True)
@@ -0,0 +1,62 @@
+"""Directories of files which are written to temporary uploads and renamed once complete."""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import BinaryIO
+
+log = logging.getLogger(__name__)
+
+__all__ = ("FileStore",)
+
+UPLOAD_PREFIX = ".upload-"
+# Age in seconds after which an upload is assumed to have been abandoned by a process that died.
+STALE_UPLOAD_AGE = 60 * 60
+
+
+class FileStore:
+    """
+    A directory of files, each of which is written to an upload and then renamed into place.
+
+    The directory may hold files left by a previous run, or be shared with another process, so a
+    store only deletes the files it committed itself, and uploads which are old enough to have
+    been abandoned.
+    """
+
+    def __init__(self, root: str | Path):
+        """Create the directory `root` if it doesn't exist, and delete abandoned uploads in it."""
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._remove_stale_uploads()
+
+    def _remove_stale_uploads(self) -> None:
+        """Delete the uploads which were last written over `STALE_UPLOAD_AGE` seconds ago."""
+        cutoff = time.time() - STALE_UPLOAD_AGE
+        for file in self.root.glob(f"{UPLOAD_PREFIX}*"):
+            try:
+                if file.stat().st_mtime < cutoff:
+                    file.unlink()
+                    log.info(f"Deleted abandoned upload {str(file)!r}.")
+            except FileNotFoundError:
+                # Another process committed or deleted it in the meantime.
+                continue
+
+    @contextmanager
+    def _upload(self) -> Generator[BinaryIO, None, None]:
+        """
+        Write a new upload within the context, which is deleted if an exception is raised.
+
+        The upload is closed when leaving the context; it's then up to the caller to rename it
+        into place, or delete it.
+        """
+        with NamedTemporaryFile(dir=self.root, prefix=UPLOAD_PREFIX, delete=False) as f:
+            try:
+                yield f
+            except BaseException:
+                os.unlink(f.name)
+                raise
@@ -0,0 +1,118 @@
+"""Iterative directory walking with glob pattern matching."""
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+import time
+from collections.abc import Generator
+from pathlib import Path
+
+from .errors import DepthLimitError
+
+__all__ = ("GlobMatcher", "walk_files")
+
+# A set of indices into the segments of a pattern which the path so far could be matched up to.
+_States = frozenset[int]
+
+
+class GlobMatcher:
+    """
+    A glob pattern compiled for matching paths one component at a time.
+
+    Follows the rules of `glob.glob` with `recursive=True` and `include_hidden=False`: `**` matches
+    zero or more directories, and wildcards don't match names starting with a dot unless the
+    pattern component does too.
+    """
+
+    def __init__(self, pattern: str):
+        """Compile `pattern`, a relative glob pattern with components separated by slashes."""
+        self.pattern = pattern
+        self._segments: list[tuple[re.Pattern[str], bool] | None] = []
+        for part in pattern.split("/"):
+            if not part:
+                continue
+            if part == "**":
+                self._segments.append(None)
+            else:
+                self._segments.append((re.compile(fnmatch.translate(part)), part.startswith(".")))
+
+        self._end = len(self._segments)
+        self.start = self._closure({0})
+
+    def _closure(self, states: set[int]) -> _States:
+        """Add the states reached by letting each `**` match zero directories."""
+        for i in sorted(states):
+            while i < self._end and self._segments[i] is None:
+                i += 1
+                states.add(i)
+        return frozenset(states)
+
+    def step(self, states: _States, name: str) -> _States:
+        """Return the states after matching the path component `name` in `states`."""
+        hidden = name.startswith(".")
+        result = set()
+        for i in states:
+            if i == self._end:
+                continue
+
+            segment = self._segments[i]
+            if segment is None:
+                if not hidden:
+                    result.add(i)
+            elif (not hidden or segment[1]) and segment[0].match(name):
+                result.add(i + 1)
+
+        return self._closure(result)
+
+    def is_match(self, states: _States) -> bool:
+        """Return True if the path which led to `states` matches the whole pattern."""
+        return self._end in states
+
+    def can_descend(self, states: _States) -> bool:
+        """Return True if paths below the directory which led to `states` could match."""
+        return any(i < self._end for i in states)
+
+
+def walk_files(
+    root: Path,
+    matcher: GlobMatcher,
+    max_depth: int | None = None,
+    deadline: float | None = None,
+) -> Generator[tuple[os.DirEntry[str], str], None, None]:
+    """
+    Yield entries for the files below `root` which match `matcher`, with their relative paths.
+
+    The tree is walked iteratively with `os.scandir`, so the entries' cached type information
+    is reused. Directories which cannot contain matches are skipped, and symlinks to directories
+    aren't followed. Symlinks to files are yielded.
+
+    Args:
+        root: The directory to walk.
+        matcher: The compiled pattern paths must match.
+        max_depth: Maximum number of directories to descend into, or None for no limit.
+        deadline: `time.monotonic()` value by which the walk must be done.
+    Raises:
+        DepthLimitError: If a directory deeper than `max_depth` could contain matches.
+        TimeoutError: If the deadline passes.
+    """
+    stack: list[tuple[str, str, _States, int]] = [(str(root), "", matcher.start, 0)]
+    while stack:
+        path, prefix, states, depth = stack.pop()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError("File parsing timeout exceeded while walking files")
+
+                next_states = matcher.step(states, entry.name)
+                if not next_states:
+                    continue
+
+                if entry.is_dir(follow_symlinks=False):
+                    if not matcher.can_descend(next_states):
+                        continue
+                    if max_depth is not None and depth >= max_depth:
+                        raise DepthLimitError(f"Directory depth limit of {max_depth} exceeded")
+                    stack.append((entry.path, f"{prefix}{entry.name}/", next_states, depth + 1))
+                elif matcher.is_match(next_states) and entry.is_file():
+                    yield entry, f"{prefix}{entry.name}"
@@ -0,0 +1,422 @@
+"""Watching of output directories with inotify, to find finished files while the sandbox runs."""
+from __future__ import annotations
+
+import ctypes
+import logging
+import os
+import select
+import stat
+import struct
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO, Type
+
+from .attachment import FileAttachment
+from .memfs import MemFS
+from .walk import GlobMatcher
+
+log = logging.getLogger(__name__)
+
+__all__ = ("Inotify", "OutputWatcher", "open_output_file")
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+    | IN_DONT_FOLLOW
+)
+EVENT_HEADER = struct.Struct("iIII")
+READ_SIZE = 64 * 1024
+# How often, in seconds, the watcher thread checks whether it's been asked to stop.
+POLL_INTERVAL = 0.05
+# Maximum number of directories to watch, beyond which the output is scanned after exit instead.
+MAX_WATCHES = 1024
+
+_libc = ctypes.CDLL(None, use_errno=True)
+_libc.inotify_init1.argtypes = [ctypes.c_int]
+_libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+
+class Inotify:
+    """A non-blocking inotify instance."""
+
+    def __init__(self):
+        self.fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    def add_watch(self, path: str | Path, mask: int) -> int:
+        """Watch `path` for the events in `mask`. Return the watch descriptor."""
+        wd = _libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        return wd
+
+    def read(self) -> list[tuple[int, int, str]]:
+        """Return the watch descriptor, mask, and name of each pending event."""
+        try:
+            data = os.read(self.fd, READ_SIZE)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def fileno(self) -> int:
+        """Return the file descriptor of the instance, which is readable when events are pending."""
+        return self.fd
+
+    def close(self) -> None:
+        """Close the instance, removing all of its watches."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_output_file(root: Path, path: str) -> BinaryIO | None:
+    """
+    Open the regular file at `path` relative to `root`, without following any symlinks.
+
+    Return None if the file doesn't exist, isn't a regular file, or any component of its path is
+    a symlink. The sandbox can replace directories with symlinks at any time, so paths reported
+    by inotify can't be trusted to stay within `root`.
+    """
+    *parents, name = path.split("/")
+    flags = os.O_RDONLY | os.O_NOFOLLOW | os.O_CLOEXEC
+    try:
+        dir_fd = os.open(root, flags | os.O_DIRECTORY)
+    except OSError:
+        return None
+
+    try:
+        for parent in parents:
+            next_fd = os.open(parent, flags | os.O_DIRECTORY, dir_fd=dir_fd)
+            os.close(dir_fd)
+            dir_fd = next_fd
+        # Don't block on FIFOs.
+        fd = os.open(name, flags | os.O_NONBLOCK, dir_fd=dir_fd)
+    except OSError:
+        return None
+    finally:
+        os.close(dir_fd)
+
+    if not stat.S_ISREG(os.fstat(fd).st_mode):
+        os.close(fd)
+        return None
+    return open(fd, "rb")
+
+
+class OutputWatcher:
+    """
+    Delivers output files as the sandbox finishes writing them, and finds the rest after it exits.
+
+    Directories are watched with inotify. A file is delivered when it's closed after writing, or
+    moved into the output directory, if it matches the pattern. Its content is read rather than
+    mapped, since the sandbox could still change it. Files which are written but not closed by
+    the time the sandbox exits, or which change after they're delivered, are tracked so that
+    only they need to be read afterwards. If the events can't be trusted to be complete, such as
+    when inotify's queue overflows or a directory is moved, the whole output directory is walked
+    after exit instead.
+    """
+
+    def __init__(
+        self,
+        memfs: MemFS,
+        matcher: GlobMatcher,
+        on_file: Callable[[FileAttachment], object],
+        limit: int | None,
+        max_depth: int | None = None,
+        exclude_files: dict[Path, float] | None = None,
+    ):
+        """
+        Create a watcher for the output directory of `memfs`; it starts when entering the context.
+
+        Args:
+            memfs: The file system of the sandbox.
+            matcher: The compiled pattern files must match.
+            on_file: Called from the watcher's thread with each file delivered while the sandbox
+                runs. A file is delivered again if it changes.
+            limit: The maximum number of files to deliver, including those found after exit.
+            max_depth: Maximum number of directories to descend into.
+            exclude_files: A dict of Paths and last modified times of files to skip unless
+                they're modified; see `MemFS.files`.
+        """
+        self.memfs = memfs
+        self.root = memfs.output
+        self.matcher = matcher
+        self.on_file = on_file
+        self.limit = limit
+        self.max_depth = max_depth
+        self.exclude_files = exclude_files or {}
+
+        self._inotify: Inotify | None = None
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+        # Relative paths of watched directories, by watch descriptor.
+        self._dirs: dict[int, str] = {}
+        # Paths of files which were written since they were last delivered, if ever.
+        self._dirty: set[str] = set()
+        # Last modified times of the delivered files, by path.
+        self._delivered: dict[str, float] = {}
+        # Sizes of the delivered files as they were last delivered, by path.
+        self._sizes: dict[str, int] = {}
+        # Number of distinct paths delivered, and the total size of their latest versions.
+        self._count = 0
+        self._size = 0
+        # Whether the events are incomplete, so that the output has to be walked after exit.
+        self._overflowed = False
+
+    def _depth(self, path: str) -> int:
+        return path.count("/") + 1 if path else 0
+
+    def _states(self, path: str) -> frozenset[int]:
+        states = self.matcher.start
+        for part in path.split("/") if path else ():
+            states = self.matcher.step(states, part)
+        return states
+
+    def _watch(self, path: str, mark_dirty: bool = True) -> None:
+        """
+        Watch the directory at `path` and the directories already in it.
+
+        Files already in it were created before the watch was added, so they're marked dirty to
+        be picked up after exit, unless `mark_dirty` is False.
+        """
+        stack = [path]
+        while stack:
+            path = stack.pop()
+            if not self.matcher.can_descend(self._states(path)):
+                continue
+            if len(self._dirs) >= MAX_WATCHES or (
+                self.max_depth is not None and self._depth(path) > self.max_depth
+            ):
+                self._overflowed = True
+                return
+
+            try:
+                wd = self._inotify.add_watch(self.root / path, WATCH_MASK)
+                self._dirs[wd] = path
+                with os.scandir(self.root / path) as entries:
+                    for entry in entries:
+                        child = f"{path}/{entry.name}" if path else entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(child)
+                        elif mark_dirty and self.matcher.is_match(self._states(child)):
+                            self._dirty.add(child)
+            except OSError:
+                # The directory was removed or replaced in the meantime.
+                self._overflowed = True
+
+    def _handle(self, wd: int, mask: int, name: str) -> None:
+        """Update the state of the watcher with an event."""
+        if mask & IN_Q_OVERFLOW:
+            log.info("Inotify queue overflowed; output files will be scanned after exit.")
+            self._overflowed = True
+            return
+        if mask & IN_IGNORED:
+            self._dirs.pop(wd, None)
+            return
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            self._overflowed = True
+            return
+
+        parent = self._dirs.get(wd)
+        if parent is None:
+            return
+        path = f"{parent}/{name}" if parent else name
+
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch(path)
+            if mask & IN_MOVED_FROM:
+                # The paths of the watched directories below it are now wrong.
+                self._overflowed = True
+            return
+
+        if not self.matcher.is_match(self._states(path)):
+            return
+
+        if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+            self._dirty.discard(path)
+            self._deliver(path)
+        elif mask & (IN_CREATE | IN_MODIFY):
+            self._dirty.add(path)
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            self._dirty.discard(path)
+
+    def _deliver(self, path: str) -> None:
+        """
+        Read the file at `path` and pass it to `on_file`, unless it's unchanged.
+
+        A file delivered again only replaces its previous version, so it doesn't count towards
+        the limit again, and only the change in its size counts towards the size limit.
+        """
+        previous = self._sizes.get(path)
+        if previous is None and self.limit is not None and self._count >= self.limit:
+            return
+
+        file = open_output_file(self.root, path)
+        if file is None:
+            return
+
+        with file:
+            st = os.fstat(file.fileno())
+            if st.st_mtime in (self.exclude_files.get(self.root / path), self._delivered.get(path)):
+                return
+            if self._size - (previous or 0) + st.st_size > self.memfs.instance_size:
+                log.info(f"Max file size {self.memfs.instance_size} reached, skipping {path!r}")
+                return
+            content = file.read(st.st_size)
+
+        try:
+            path.encode("utf-8")
+        except UnicodeEncodeError:
+            return
+
+        self._delivered[path] = st.st_mtime
+        self._sizes[path] = len(content)
+        if previous is None:
+            self._count += 1
+        self._size += len(content) - (previous or 0)
+        log.info(f"Delivering finished file {path!r}")
+        self.on_file(FileAttachment(path, content))
+
+    def _run(self) -> None:
+        """Handle events until asked to stop, then handle the remaining ones."""
+        poller = select.poll()
+        poller.register(self._inotify.fileno(), select.POLLIN)
+        try:
+            while True:
+                stopping = self._stopping.is_set()
+                if stopping or poller.poll(POLL_INTERVAL * 1000):
+                    for event in self._inotify.read():
+                        self._handle(*event)
+                if stopping:
+                    return
+        except Exception:
+            log.exception("Unexpected error while watching output files.")
+            self._overflowed = True
+
+    def __enter__(self) -> OutputWatcher:
+        try:
+            self._inotify = Inotify()
+        except OSError:
+            log.exception("Failed to watch output files; they'll be scanned after exit.")
+            self._overflowed = True
+            return self
+
+        self._watch("", mark_dirty=False)
+        self._thread = threading.Thread(target=self._run, name="output-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self._stop()
+        if self._inotify is not None:
+            self._inotify.close()
+
+    def _stop(self) -> None:
+        """Stop the watcher's thread once it has handled all pending events."""
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+
+    def finish(self, timeout: float | None = None) -> list[FileAttachment]:
+        """
+        Stop watching and return the files which weren't delivered, or changed since they were.
+
+        Call once the sandbox has exited. The files are memory-mapped and sorted by path.
+
+        Raises:
+            TimeoutError: If finding the files exceeds `timeout`.
+            DepthLimitError: If the output has to be walked and is nested too deeply.
+        """
+        self._stop()
+        limit = None if self.limit is None else self.limit - self._count
+        exclude_files = {
+            **self.exclude_files,
+            **{self.root / path: mtime for path, mtime in self._delivered.items()},
+        }
+
+        if self._overflowed:
+            return self.memfs.files_list(
+                limit=limit,
+                pattern=self.matcher,
+                exclude_files=exclude_files,
+                timeout=timeout,
+                max_depth=self.max_depth,
+                mapped=True,
+            )
+
+        deadline = time.monotonic() + timeout if timeout else None
+        attachments = []
+        # Number of attachments whose paths weren't delivered before, which count to the limit.
+        new = 0
+        try:
+            for path in sorted(self._dirty):
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError("File parsing timeout exceeded in OutputWatcher.finish")
+                previous = self._sizes.get(path)
+                if previous is None and limit is not None and new >= limit:
+                    log.info(f"Max attachments {self.limit} reached, skipping remaining files")
+                    continue
+
+                file = open_output_file(self.root, path)
+                if file is None:
+                    continue
+                with file:
+                    st = os.fstat(file.fileno())
+                    if st.st_mtime == exclude_files.get(self.root / path):
+                        continue
+                    if self._size - (previous or 0) + st.st_size > self.memfs.instance_size:
+                        log.info(f"Max file size {self.memfs.instance_size} reached")
+                        break
+                    self._size += st.st_size - (previous or 0)
+                    attachments.append(FileAttachment.from_file(path, file, mapped=True))
+                    if previous is None:
+                        new += 1
+        except BaseException:
+            for file in attachments:
+                file.close()
+            raise
+
+        log.info(f"Found {len(attachments)} changed files after exit.")
+        return attachments
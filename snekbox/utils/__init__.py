@@ -1,3 +1,3 @@
-from . import iter
+from . import counters, iter, pool
 
-__all__ = ("iter",)
+__all__ = ("counters", "iter", "pool")
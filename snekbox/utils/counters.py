@@ -0,0 +1,27 @@
+import threading
+from collections import Counter
+
+__all__ = ("Counters",)
+
+
+class Counters:
+    """Thread-safe named counters."""
+
+    def __init__(self, *names: str) -> None:
+        """Create counters, initialising each of `names` to 0 so that they're always reported."""
+        self._lock = threading.Lock()
+        self._counts = Counter(dict.fromkeys(names, 0))
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Increase the counter `name` by `amount`."""
+        with self._lock:
+            self._counts[name] += amount
+
+    def __getitem__(self, name: str) -> int:
+        with self._lock:
+            return self._counts[name]
+
+    def as_dict(self) -> dict[str, int]:
+        """Return a snapshot of all counters."""
+        with self._lock:
+            return dict(self._counts)
@@ -0,0 +1,166 @@
+"""Pools of resources which are costly to create, and are reset and handed out again."""
+from __future__ import annotations
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Generic, TypeVar
+
+from snekbox.utils.counters import Counters
+
+log = logging.getLogger(__name__)
+
+__all__ = ("Pool",)
+
+T = TypeVar("T")
+
+
+class Pool(ABC, Generic[T]):
+    """
+    A pool of resources which are handed out to one user at a time.
+
+    Released resources are reset in a background thread and only return to the pool if they're
+    pristine afterwards; otherwise they are closed. When the last idle resource is handed out,
+    another one is created in the background, so that the next user doesn't have to wait for it.
+
+    Subclasses implement `_new`, `_reset`, and `_close`.
+    """
+
+    def __init__(self, size: int, thread_name_prefix: str) -> None:
+        """
+        Initialize an empty pool.
+
+        Args:
+            size: Maximum number of idle resources to keep. If 0, each resource is closed as
+                soon as it's released.
+            thread_name_prefix: Name of the thread which creates and resets resources.
+        """
+        self.size = size
+        self.counters = Counters("created", "reused", "discarded")
+
+        self._lock = threading.Lock()
+        self._idle: list[T] = []
+        # Number of resources being prepared which will be added to the idle list.
+        self._pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=thread_name_prefix)
+
+    @abstractmethod
+    def _new(self) -> T:
+        """Create a new resource."""
+
+    @abstractmethod
+    def _reset(self, item: T) -> bool:
+        """Reset `item` for its next user and return whether it's pristine afterwards."""
+
+    @abstractmethod
+    def _close(self, item: T) -> None:
+        """Free `item`."""
+
+    def _create(self) -> T:
+        """Create a new resource and count it."""
+        self.counters.increment("created")
+        return self._new()
+
+    def _discard(self, item: T) -> None:
+        """Close `item`, logging rather than raising errors."""
+        self.counters.increment("discarded")
+        try:
+            self._close(item)
+        except OSError:
+            log.exception(f"Failed to close {item!r}.")
+
+    def _put(self, item: T) -> None:
+        """Return `item` to the idle list, or discard it if the pool is full."""
+        with self._lock:
+            self._pending -= 1
+            if len(self._idle) < self.size:
+                self._idle.append(item)
+                return
+
+        self._discard(item)
+
+    def _prepare(self) -> None:
+        """Create a new resource in the background and add it to the pool."""
+        try:
+            item = self._create()
+        except Exception:
+            log.exception(f"{type(self).__name__} failed to prepare a new resource.")
+            with self._lock:
+                self._pending -= 1
+            return
+
+        self._put(item)
+
+    def _recycle(self, item: T) -> None:
+        """Reset `item` and add it back to the pool if it's pristine afterwards."""
+        try:
+            pristine = self._reset(item)
+        except Exception:
+            log.exception(f"Failed to reset {item!r}.")
+            pristine = False
+
+        if pristine:
+            self._put(item)
+            return
+
+        log.warning(f"Discarding {item!r} as it failed its integrity check.")
+        with self._lock:
+            self._pending -= 1
+        self._discard(item)
+
+    def _take(self) -> T:
+        """Return an idle resource, or a new one if none are idle."""
+        with self._lock:
+            item = self._idle.pop() if self._idle else None
+            prepare = self.size > 0 and not self._idle and not self._pending
+            if prepare:
+                self._pending += 1
+
+        if prepare:
+            self._executor.submit(self._prepare)
+
+        if item is None:
+            return self._create()
+
+        self.counters.increment("reused")
+        return item
+
+    def _release(self, item: T) -> None:
+        """Hand `item` over to be recycled in the background, or close it if the pool is off."""
+        with self._lock:
+            recycle = self.size > 0
+            if recycle:
+                self._pending += 1
+
+        if recycle:
+            self._executor.submit(self._recycle, item)
+        else:
+            self._discard(item)
+
+    @contextmanager
+    def acquire(self) -> Generator[T, None, None]:
+        """Hold a pristine resource within the context."""
+        item = self._take()
+        try:
+            yield item
+        finally:
+            self._release(item)
+
+    def close(self) -> None:
+        """Wait for resources being prepared and close all idle resources."""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for item in idle:
+            self._close(item)
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of idle resources and how many were created, reused, and discarded."""
+        with self._lock:
+            idle = len(self._idle)
+
+        return {"size": self.size, "idle": idle, **self.counters.as_dict()}
@@ -4,6 +4,7 @@ from unittest import mock
 from falcon import testing
 
 from snekbox.api import SnekAPI
+from snekbox.interpreters import InterpreterRegistry
 from snekbox.result import EvalResult
 
 
@@ -16,6 +17,18 @@ class SnekAPITestCase(testing.TestCase):
         self.mock_nsjail.return_value.python3.return_value = EvalResult(
             args=[], returncode=0, stdout="output", stderr="error"
         )
+        self.mock_nsjail.return_value.scheduler = mock.MagicMock()
+        self.mock_nsjail.return_value.counters = mock.MagicMock()
+        self.mock_nsjail.return_value.memfs_pool = mock.MagicMock()
+        self.mock_nsjail.return_value.netns_pool = None
+        self.mock_nsjail.return_value.blobs = mock.MagicMock()
+        self.mock_nsjail.return_value.downloads = mock.MagicMock()
+        self.mock_nsjail.return_value.config = mock.MagicMock(time_limit=6)
+        self.mock_nsjail.return_value.capacity = None
+        self.mock_nsjail.return_value.bundles = {}
+        self.mock_nsjail.return_value.environments = {}
+        self.mock_nsjail.return_value.interpreters = InterpreterRegistry()
+        self.mock_nsjail.return_value.warmup = mock.MagicMock()
         self.addCleanup(self.patcher.stop)
 
         logging.getLogger("snekbox.nsjail").setLevel(logging.WARNING)
@@ -0,0 +1,36 @@
+from tests.api import SnekAPITestCase
+
+from snekbox.snekio import BlobTooLargeError
+
+
+class TestBlobsResource(SnekAPITestCase):
+    PATH = "/blobs"
+
+    def setUp(self):
+        super().setUp()
+        self.blobs = self.mock_nsjail.return_value.blobs
+        self.blobs.max_blob_size = 10
+
+    def test_post_201(self):
+        self.blobs.add.return_value = ("ab" * 32, 5)
+
+        result = self.simulate_post(self.PATH, body=b"hello")
+        self.assertEqual(result.status_code, 201)
+        self.assertEqual({"sha256": "ab" * 32, "size": 5}, result.json)
+        self.assertEqual(result.headers["Location"], f"/blobs/{'ab' * 32}")
+        self.assertEqual(self.blobs.add.call_args.args[0].read(), b"hello")
+
+    def test_post_too_large_413(self):
+        result = self.simulate_post(self.PATH, body=b"x" * 11)
+        self.assertEqual(result.status_code, 413)
+        self.blobs.add.assert_not_called()
+
+        self.blobs.add.side_effect = BlobTooLargeError("too large")
+        result = self.simulate_post(self.PATH, body=b"x" * 5)
+        self.assertEqual(result.status_code, 413)
+
+    def test_head(self):
+        self.blobs.__contains__.side_effect = lambda digest: digest == "ab" * 32
+
+        self.assertEqual(self.simulate_head(f"{self.PATH}/{'ab' * 32}").status_code, 200)
+        self.assertEqual(self.simulate_head(f"{self.PATH}/{'cd' * 32}").status_code, 404)
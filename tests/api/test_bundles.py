@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from tests.api import SnekAPITestCase
+
+from snekbox.snekio.bundles import Bundle
+
+
+class TestBundlesResource(SnekAPITestCase):
+    PATH = "/bundles"
+
+    def test_get_200(self):
+        self.mock_nsjail.return_value.bundles = {
+            "words": Bundle("words", Path("/srv/words"), 3, 1024),
+        }
+
+        result = self.simulate_get(self.PATH)
+        self.assertEqual(result.status_code, 200)
+        expected = [{"name": "words", "path": "/bundles/words", "files": 3, "size": 1024}]
+        self.assertEqual(expected, result.json)
+
+    def test_get_empty(self):
+        result = self.simulate_get(self.PATH)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual([], result.json)
@@ -0,0 +1,27 @@
+import io
+
+from tests.api import SnekAPITestCase
+
+from snekbox.snekio import Download
+
+
+class TestDownloadResource(SnekAPITestCase):
+    PATH = "/downloads"
+
+    def test_get_200(self):
+        download = Download("t" * 32, "dir/plot.png", 5, "ab" * 32, "image/png", 0)
+        self.mock_nsjail.return_value.downloads.open.return_value = (download, io.BytesIO(b"hello"))
+
+        result = self.simulate_get(f"{self.PATH}/{'t' * 32}")
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(result.content, b"hello")
+        self.assertEqual(result.headers["Content-Type"], "image/png")
+        self.assertEqual(result.headers["Content-Length"], "5")
+        self.assertIn('filename="plot.png"', result.headers["Content-Disposition"])
+        self.mock_nsjail.return_value.downloads.open.assert_called_once_with("t" * 32)
+
+    def test_get_expired_404(self):
+        self.mock_nsjail.return_value.downloads.open.side_effect = KeyError
+
+        result = self.simulate_get(f"{self.PATH}/{'t' * 32}")
+        self.assertEqual(result.status_code, 404)
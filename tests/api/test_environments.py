@@ -0,0 +1,26 @@
+from pathlib import Path
+
+from tests.api import SnekAPITestCase
+
+from snekbox.interpreters import Environment
+
+
+class TestEnvironmentsResource(SnekAPITestCase):
+    PATH = "/environments"
+
+    def test_get_200(self):
+        path = Path("/environments/sci")
+        self.mock_nsjail.return_value.environments = {
+            "sci": Environment("sci", path, frozenset({"3.14", "3.13"}))
+        }
+
+        result = self.simulate_get(self.PATH)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(
+            result.json, [{"name": "sci", "path": "/environments/sci", "sites": ["3.13", "3.14"]}]
+        )
+
+    def test_get_empty(self):
+        result = self.simulate_get(self.PATH)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(result.json, [])
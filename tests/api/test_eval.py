@@ -1,5 +1,28 @@
+import io
+import json
+import socket
+import tarfile
+import threading
+import time
+from base64 import b64encode
+from pathlib import Path
+from unittest import mock
+
 from tests.api import SnekAPITestCase
 
+from snekbox.api.resources.eval import _LiveJob, _ResultStream
+from snekbox.interpreters import Environment, Interpreter, InterpreterRegistry
+from snekbox.result import EvalResult
+from snekbox.scheduling import DEFAULT_CLIENT, DeadlineExceededError, Priority, QuotaExceededError
+from snekbox.snekio import (
+    ArchiveFormat,
+    BlobAttachment,
+    Download,
+    FileAttachment,
+    HomeArchive,
+    MemFSLimitError,
+)
+
 
 class TestEvalResource(SnekAPITestCase):
     PATH = "/eval"
@@ -19,6 +42,549 @@ class TestEvalResource(SnekAPITestCase):
                 self.assertEqual("output", result.json["stdout"])
                 self.assertEqual(0, result.json["returncode"])
 
+    def test_post_registered_executable(self):
+        """Registered interpreters should run by their resolved path without being checked."""
+        registry = mock.create_autospec(InterpreterRegistry, instance=True)
+        registry.get.return_value = Interpreter(
+            "3.14t",
+            "/snekbin/python/3.14t/bin/python",
+            "/real/python",
+            "3.14.0",
+            "cpython",
+            True,
+            False,
+        )
+        self.mock_nsjail.return_value.interpreters = registry
+
+        body = {"args": ["-c", "pass"], "executable_path": "/snekbin/python/3.14t/bin/python"}
+        result = self.simulate_post(self.PATH, json=body)
+
+        self.assertEqual(result.status_code, 200)
+        registry.get.assert_called_once_with("/snekbin/python/3.14t/bin/python")
+        _, kwargs = self.mock_nsjail.return_value.python3.call_args
+        self.assertEqual(kwargs["executable_path"], "/real/python")
+
+    def registry(self, *interpreters: Interpreter) -> InterpreterRegistry:
+        """Replace the interpreter registry with a mock which has `interpreters`."""
+        registry = mock.create_autospec(InterpreterRegistry, instance=True)
+        by_path = {i.path: i for i in interpreters} | {i.real_path: i for i in interpreters}
+        registry.get.side_effect = by_path.get
+        registry.select.return_value = interpreters[0] if interpreters else None
+        self.mock_nsjail.return_value.interpreters = registry
+        return registry
+
+    def test_post_jit_and_free_threading_options(self):
+        ft = Interpreter(
+            "3.14t", "/snekbin/python/3.14t/bin/python", "/t", "3.14.0", "cpython", True, False
+        )
+        jit = Interpreter(
+            "3.14j", "/snekbin/python/3.14j/bin/python", "/j", "3.14.0", "cpython", False, True
+        )
+        self.registry(ft, jit)
+
+        cases = [
+            ({"free_threading": True, "executable_path": ft.path}, True, None),
+            ({"free_threading": False, "executable_path": ft.path}, False, None),
+            ({"jit": True, "executable_path": jit.path}, None, True),
+            ({"jit": False}, None, False),
+        ]
+        for options, free_threading, jit_option in cases:
+            with self.subTest(options=options):
+                result = self.simulate_post(self.PATH, json={"input": "pass", **options})
+                self.assertEqual(result.status_code, 200)
+                _, kwargs = self.mock_nsjail.return_value.python3.call_args
+                self.assertEqual(kwargs["free_threading"], free_threading)
+                self.assertEqual(kwargs["jit"], jit_option)
+
+    def test_post_options_select_interpreter(self):
+        ft = Interpreter(
+            "3.14t", "/snekbin/python/3.14t/bin/python", "/t", "3.14.0", "cpython", True, False
+        )
+        registry = self.registry(ft)
+
+        result = self.simulate_post(self.PATH, json={"input": "pass", "free_threading": True})
+
+        self.assertEqual(result.status_code, 200)
+        registry.select.assert_called_once_with(
+            "/snekbin/python/default/bin/python", free_threading=True, jit=False
+        )
+        _, kwargs = self.mock_nsjail.return_value.python3.call_args
+        self.assertEqual(kwargs["executable_path"], "/t")
+
+    def test_post_executable_paths(self):
+        """Each interpreter should run in its own job, and each result be in the response."""
+        interpreters = [
+            Interpreter(v, f"/snekbin/python/{v}/bin/python", f"/{v}", v, "cpython", False, False)
+            for v in ("3.13", "3.14")
+        ]
+        self.registry(*interpreters)
+        barrier = threading.Barrier(2, timeout=5)
+
+        def python3(executable_path: str, **kwargs) -> EvalResult:
+            barrier.wait()  # Both jobs should be running at once.
+            files = [FileAttachment("out.txt", executable_path.encode())]
+            return EvalResult([], 0, executable_path, files=files, duration=0.5, cpu_time=0.25)
+
+        self.mock_nsjail.return_value.python3.side_effect = python3
+        paths = [interpreter.path for interpreter in interpreters]
+        result = self.simulate_post(self.PATH, json={"input": "pass", "executable_paths": paths})
+
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(int(result.headers["Content-Length"]), len(result.content))
+        expected = [
+            {
+                "executable_path": path,
+                "duration": 0.5,
+                "cpu_time": 0.25,
+                "stdout": f"/{version}",
+                "returncode": 0,
+                "files": [
+                    {
+                        "path": "out.txt",
+                        "size": 5,
+                        "content": b64encode(f"/{version}".encode()).decode(),
+                    }
+                ],
+            }
+            for path, version in zip(paths, ("3.13", "3.14"))
+        ]
+        self.assertEqual(result.json, {"results": expected})
+
+    def test_post_executable_paths_failure(self):
+        """If any job fails, the results of the others should be released."""
+        released = mock.Mock()
+
+        def python3(executable_path: str, **kwargs) -> EvalResult:
+            if executable_path == "/snekbin/python/default/bin/python":
+                return EvalResult([], 0, "", release=released)
+            raise DeadlineExceededError("too late")
+
+        self.mock_nsjail.return_value.python3.side_effect = python3
+        body = {
+            "input": "pass",
+            "executable_paths": ["/snekbin/python/default/bin/python", "/usr/bin/env"],
+        }
+        result = self.simulate_post(self.PATH, json=body)
+
+        self.assertEqual(result.status_code, 504)
+        released.assert_called_once()
+
+    def test_post_executable_paths_incompatible_400(self):
+        paths = ["/snekbin/python/default/bin/python"]
+        cases = [
+            {"executable_path": paths[0]},
+            {"stream_files": True},
+            {"attachments": "link"},
+        ]
+        for options in cases:
+            with self.subTest(options=options):
+                body = {"input": "pass", "executable_paths": paths, **options}
+                result = self.simulate_post(self.PATH, json=body)
+                self.assertEqual(result.status_code, 400)
+                self.assertEqual(result.json["title"], "Incompatible options")
+
+        too_many = [f"/bin/{i}" for i in range(9)]
+        for executable_paths in ([], too_many, paths * 2):
+            with self.subTest(executable_paths=executable_paths):
+                body = {"input": "pass", "executable_paths": executable_paths}
+                result = self.simulate_post(self.PATH, json=body)
+                self.assertEqual(result.status_code, 400)
+                self.assertEqual(result.json["title"], "Request data failed validation")
+
+    def test_post_environment(self):
+        ft = Interpreter(
+            "3.14t", "/snekbin/python/3.14t/bin/python", "/t", "3.14.0", "cpython", True, False
+        )
+        self.registry(ft)
+        environment = Environment("sci", Path("/environments/sci"), frozenset({"3.14t"}))
+        self.mock_nsjail.return_value.environments = {"sci": environment}
+
+        body = {"input": "pass", "environment": "sci", "executable_path": ft.path}
+        result = self.simulate_post(self.PATH, json=body)
+        self.assertEqual(result.status_code, 200)
+        _, kwargs = self.mock_nsjail.return_value.python3.call_args
+        self.assertEqual(kwargs["environment"], "sci")
+
+        result = self.simulate_post(self.PATH, json={"input": "pass", "environment": "missing"})
+        self.assertEqual(result.status_code, 400)
+        self.assertEqual(result.json["title"], "Unknown environment")
+
+        gil = Interpreter(
+            "3.14", "/snekbin/python/3.14/bin/python", "/g", "3.14.0", "cpython", False, False
+        )
+        self.registry(gil)
+        body = {"input": "pass", "environment": "sci", "executable_path": gil.path}
+        result = self.simulate_post(self.PATH, json=body)
+        self.assertEqual(result.status_code, 400)
+        self.assertEqual(result.json["title"], "The environment isn't built for the interpreter")
+
+    def test_post_unsupported_options_400(self):
+        gil = Interpreter(
+            "3.14", "/snekbin/python/3.14/bin/python", "/g", "3.14.0", "cpython", False, False
+        )
+        cases = [
+            ((), {"free_threading": True}, "No interpreter supports the requested options"),
+            ((gil,), {"jit": True, "executable_path": gil.path}, "doesn't have a JIT compiler"),
+            ((gil,), {"free_threading": True, "executable_path": gil.path}, "isn't free-threaded"),
+        ]
+        for interpreters, options, title in cases:
+            with self.subTest(options=options):
+                self.registry(*interpreters)
+                result = self.simulate_post(self.PATH, json={"input": "pass", **options})
+                self.assertEqual(result.status_code, 400)
+                self.assertIn(title, result.json["title"])
+
+    def test_post_files_streamed(self):
+        """Attachments should be encoded into the body and released once it's sent."""
+        release = mock.Mock()
+        files = [FileAttachment("a.txt", b"hello"), FileAttachment("dir/\u00e9", bytes(range(256)))]
+        self.mock_nsjail.return_value.python3.return_value = EvalResult(
+            args=[], returncode=0, stdout="output \u00e9", files=files, release=release
+        )
+
+        result = self.simulate_post(self.PATH, json={"input": "pass"})
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(int(result.headers["Content-Length"]), len(result.content))
+        expected = {
+            "stdout": "output \u00e9",
+            "returncode": 0,
+            "files": [f.as_dict for f in files],
+        }
+        self.assertEqual(expected, result.json)
+        self.assertEqual(b64encode(bytes(range(256))).decode(), result.json["files"][1]["content"])
+        release.assert_called_once()
+
+    @mock.patch("snekbox.api.resources.eval.WRITE_BUFFER_SIZE", 8)
+    @mock.patch("snekbox.api.resources.eval.STDOUT_CHUNK_SIZE", 3)
+    def test_post_stdout_streamed(self):
+        """Stdout should be escaped in chunks without breaking escapes at the boundaries."""
+        stdout = 'a"b\\c\nd\u00e9\u2603\x00e' * 50
+        self.mock_nsjail.return_value.python3.return_value = EvalResult(
+            args=[], returncode=0, stdout=stdout
+        )
+
+        result = self.simulate_post(self.PATH, json={"input": "pass"})
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(int(result.headers["Content-Length"]), len(result.content))
+        self.assertEqual({"stdout": stdout, "returncode": 0, "files": []}, result.json)
+
+    def test_stream_joins_small_parts(self):
+        """Small parts should be written together rather than one at a time."""
+        files = [FileAttachment(f"{i}.txt", b"x") for i in range(100)]
+        stream = _ResultStream(EvalResult(args=[], returncode=None, stdout=None, files=files))
+        chunks = list(stream)
+
+        self.assertEqual(len(chunks), 1)
+        body = json.loads(b"".join(chunks))
+        self.assertIsNone(body["stdout"])
+        self.assertEqual(len(body["files"]), 100)
+
+    def test_post_files_linked(self):
+        """Linked attachments should be retained for download and released straight away."""
+        release = mock.Mock()
+        files = [FileAttachment("a.txt", b"hello"), FileAttachment("big.bin", b"x" * 11)]
+        self.mock_nsjail.return_value.python3.return_value = EvalResult(
+            args=[], returncode=0, stdout="output", files=files, release=release
+        )
+        downloads = [
+            Download("t" * 32, "a.txt", 5, "ab" * 32, "text/plain", 0),
+            Download(None, "big.bin", 11, "cd" * 32, "application/octet-stream", 0),
+        ]
+        self.mock_nsjail.return_value.downloads.add.side_effect = downloads
+
+        body = {"input": "pass", "attachments": "link"}
+        result = self.simulate_post(self.PATH, json=body)
+        self.assertEqual(result.status_code, 200)
+        expected = [
+            {**downloads[0].as_dict, "url": f"/downloads/{'t' * 32}"},
+            {**downloads[1].as_dict, "url": None},
+        ]
+        self.assertEqual(expected, result.json["files"])
+        self.assertEqual("output", result.json["stdout"])
+        self.mock_nsjail.return_value.downloads.add.assert_has_calls(
+            [mock.call(files[0]), mock.call(files[1])]
+        )
+        release.assert_called_once()
+
+    def test_post_blob_reference(self):
+        """Files referring to blobs should be opened from the store and closed afterwards."""
+        digest = "ab" * 32
+        blob = mock.Mock(spec=BlobAttachment)
+        self.mock_nsjail.return_value.blobs.open.return_value = blob
+        body = {"input": "pass", "files": [{"path": "data.csv", "blob": digest}]}
+
+        result = self.simulate_post(self.PATH, json=body)
+        self.assertEqual(result.status_code, 200)
+        self.mock_nsjail.return_value.blobs.open.assert_called_once_with(digest, "data.csv")
+        _, kwargs = self.mock_nsjail.return_value.python3.call_args
+        self.assertEqual(kwargs["files"], [blob])
+        blob.close.assert_called_once()
+
+    def test_post_unknown_blob_400(self):
+        self.mock_nsjail.return_value.blobs.open.side_effect = KeyError
+        body = {"input": "pass", "files": [{"path": "data.csv", "blob": "ab" * 32}]}
+
+        result = self.simulate_post(self.PATH, json=body)
+        self.assertEqual(result.status_code, 400)
+        self.assertEqual(
+            result.json["description"], f"Unknown blob '{'ab' * 32}' for file 'data.csv'"
+        )
+
+    def test_post_invalid_blob_reference_400(self):
+        cases = [
+            {"path": "a", "blob": "not a digest"},
+            {"path": "a", "blob": "ab" * 32, "content": ""},
+        ]
+        for file in cases:
+            with self.subTest(file=file):
+                result = self.simulate_post(self.PATH, json={"input": "", "files": [file]})
+                self.assertEqual(result.status_code, 400)
+
+    def test_post_bundles(self):
+        self.mock_nsjail.return_value.bundles = {"words": mock.Mock()}
+
+        result = self.simulate_post(self.PATH, json={"input": "pass", "bundles": ["words"]})
+        self.assertEqual(result.status_code, 200)
+        _, kwargs = self.mock_nsjail.return_value.python3.call_args
+        self.assertEqual(kwargs["bundles"], ["words"])
+
+    def test_post_unknown_bundle_400(self):
+        result = self.simulate_post(self.PATH, json={"input": "pass", "bundles": ["words"]})
+        self.assertEqual(result.status_code, 400)
+        self.assertEqual(result.json["description"], "No bundle is named 'words'")
+        self.mock_nsjail.return_value.python3.assert_not_called()
+
+    def test_post_archive(self):
+        cases = [
+            ({"input": "pass"}, None, False),
+            ({"input": "pass", "archive": "tar"}, ArchiveFormat.TAR, False),
+            ({"input": "pass", "archive": "zip", "compress": True}, ArchiveFormat.ZIP, True),
+        ]
+        for body, archive, compress in cases:
+            with self.subTest(body=body):
+                result = self.simulate_post(self.PATH, json=body)
+                self.assertEqual(result.status_code, 200)
+                _, kwargs = self.mock_nsjail.return_value.python3.call_args
+                self.assertIs(kwargs["archive"], archive)
+                self.assertIs(kwargs["compress"], compress)
+
+    def test_post_invalid_archive_400(self):
+        result = self.simulate_post(self.PATH, json={"input": "pass", "archive": "rar"})
+        self.assertEqual(result.status_code, 400)
+
+    def test_post_stream_files(self):
+        """Files delivered while the code runs should come before the rest of the result."""
+        release = mock.Mock()
+
+        def python3(on_file, cancelled, **kwargs):
+            self.assertFalse(cancelled())
+            on_file(FileAttachment("live.txt", b"live"))
+            on_file(FileAttachment("live.txt", b"changed"))
+            files = [FileAttachment("late.txt", b"late")]
+            return EvalResult([], 0, "output", files=files, release=release)
+
+        self.mock_nsjail.return_value.python3.side_effect = python3
+        result = self.simulate_post(self.PATH, json={"input": "pass", "stream_files": True})
+
+        self.assertEqual(result.status_code, 200)
+        self.assertNotIn("content-length", result.headers)
+        self.assertEqual(
+            result.json,
+            {
+                "files": [
+                    {"path": "live.txt", "size": 4, "content": b64encode(b"live").decode()},
+                    {"path": "live.txt", "size": 7, "content": b64encode(b"changed").decode()},
+                    {"path": "late.txt", "size": 4, "content": b64encode(b"late").decode()},
+                ],
+                "stdout": "output",
+                "returncode": 0,
+            },
+        )
+        release.assert_called_once()
+
+    def test_post_stream_files_none_delivered(self):
+        """Without any delivered files, the response should be the same as usual."""
+        result = self.simulate_post(self.PATH, json={"input": "pass", "stream_files": True})
+
+        self.assertEqual(result.status_code, 200)
+        self.assertIn("content-length", result.headers)
+        self.assertEqual(list(result.json), ["stdout", "returncode", "files"])
+        _, kwargs = self.mock_nsjail.return_value.python3.call_args
+        self.assertTrue(callable(kwargs["on_file"]))
+
+    def test_post_stream_files_errors(self):
+        self.mock_nsjail.return_value.python3.side_effect = QuotaExceededError("bot", 2.5)
+        result = self.simulate_post(self.PATH, json={"input": "pass", "stream_files": True})
+        self.assertEqual(result.status_code, 429)
+
+    def test_post_stream_files_incompatible_400(self):
+        for option in ({"archive": "tar"}, {"attachments": "link"}):
+            with self.subTest(option=option):
+                body = {"input": "pass", "stream_files": True, **option}
+                result = self.simulate_post(self.PATH, json=body)
+                self.assertEqual(result.status_code, 400)
+                self.assertEqual(result.json["title"], "Incompatible options")
+        self.mock_nsjail.return_value.python3.assert_not_called()
+
+    def test_live_job_cancelled_on_close(self):
+        """Closing the body early should cancel the job and release everything it produced."""
+        started = threading.Event()
+        release = mock.Mock()
+
+        def run(on_file, cancelled):
+            on_file(FileAttachment("a.txt", b"a"))
+            started.set()
+            while not cancelled():
+                time.sleep(0.01)
+            return EvalResult([], 137, "", release=release)
+
+        job = _LiveJob(run)
+        self.assertIsNone(job.wait())
+        self.assertTrue(started.wait(5))
+        job.close()
+        release.assert_called_once()
+
+    def test_post_home_archive(self):
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w") as tar:
+            info = tarfile.TarInfo("main.py")
+            info.size = 5
+            tar.addfile(info, io.BytesIO(b"pass\n"))
+        content = b64encode(buffer.getvalue()).decode()
+        body = {"args": ["main.py"], "home_archive": {"format": "tar", "content": content}}
+
+        result = self.simulate_post(self.PATH, json=body)
+        self.assertEqual(result.status_code, 200)
+        _, kwargs = self.mock_nsjail.return_value.python3.call_args
+        archive = kwargs["home_archive"]
+        self.assertIsInstance(archive, HomeArchive)
+        self.assertEqual(archive.files, 1)
+        self.assertTrue(archive.file.closed)
+
+    def test_post_home_archive_blob(self):
+        blob = mock.Mock(spec=BlobAttachment, blob=mock.Mock())
+        self.mock_nsjail.return_value.blobs.open.return_value = blob
+        body = {"input": "pass", "home_archive": {"format": "zip", "blob": "ab" * 32}}
+
+        with mock.patch("snekbox.api.resources.eval.HomeArchive") as home_archive:
+            result = self.simulate_post(self.PATH, json=body)
+        self.assertEqual(result.status_code, 200)
+        home_archive.assert_called_once_with(blob.blob, ArchiveFormat.ZIP)
+        home_archive.return_value.close.assert_called_once()
+
+    def test_post_invalid_home_archive_400(self):
+        self.mock_nsjail.return_value.blobs.open.side_effect = KeyError
+        cases = [
+            {"format": "tar"},
+            {"format": "tar", "content": "", "blob": "ab" * 32},
+            {"format": "tar", "content": b64encode(b"not a tar").decode()},
+            {"format": "zip", "blob": "ab" * 32},
+        ]
+        for home_archive in cases:
+            with self.subTest(home_archive=home_archive):
+                body = {"input": "pass", "home_archive": home_archive}
+                result = self.simulate_post(self.PATH, json=body)
+                self.assertEqual(result.status_code, 400)
+
+    def test_post_priority(self):
+        cases = [
+            ({"input": "pass"}, Priority.INTERACTIVE),
+            ({"input": "pass", "priority": "interactive"}, Priority.INTERACTIVE),
+            ({"input": "pass", "priority": "batch"}, Priority.BATCH),
+        ]
+        for body, expected in cases:
+            with self.subTest(body=body):
+                result = self.simulate_post(self.PATH, json=body)
+                self.assertEqual(result.status_code, 200)
+                _, kwargs = self.mock_nsjail.return_value.python3.call_args
+                self.assertIs(kwargs["priority"], expected)
+
+    def test_post_client_header(self):
+        cases = [({}, DEFAULT_CLIENT), ({"X-Snekbox-Client": "bot"}, "bot")]
+        for headers, expected in cases:
+            with self.subTest(headers=headers):
+                result = self.simulate_post(self.PATH, json={"input": "pass"}, headers=headers)
+                self.assertEqual(result.status_code, 200)
+                _, kwargs = self.mock_nsjail.return_value.python3.call_args
+                self.assertEqual(kwargs["client"], expected)
+
+    def test_post_quota_exceeded_429(self):
+        self.mock_nsjail.return_value.python3.side_effect = QuotaExceededError("bot", 2.5)
+        result = self.simulate_post(self.PATH, json={"input": "pass"})
+
+        self.assertEqual(result.status_code, 429)
+        self.assertEqual(result.headers.get("Retry-After"), "3")
+        self.assertEqual(result.json["title"], "CPU time quota exceeded")
+
+    def test_post_memfs_limit_503(self):
+        self.mock_nsjail.return_value.python3.side_effect = MemFSLimitError("All 2 are held")
+        result = self.simulate_post(self.PATH, json={"input": "pass"})
+
+        self.assertEqual(result.status_code, 503)
+        self.assertEqual(result.headers.get("Retry-After"), "1")
+        self.assertEqual(result.json["title"], "No file system available")
+
+    def test_post_cancelled_on_disconnect(self):
+        server, client = socket.socketpair()
+        self.addCleanup(server.close)
+
+        result = self.simulate_post(
+            self.PATH, json={"input": "pass"}, extras={"gunicorn.socket": server}
+        )
+        self.assertEqual(result.status_code, 200)
+
+        _, kwargs = self.mock_nsjail.return_value.python3.call_args
+        cancelled = kwargs["cancelled"]
+        self.assertFalse(cancelled())
+        client.close()
+        self.assertTrue(cancelled())
+
+    def test_post_no_socket_not_cancellable(self):
+        self.simulate_post(self.PATH, json={"input": "pass"})
+        _, kwargs = self.mock_nsjail.return_value.python3.call_args
+        self.assertIsNone(kwargs["cancelled"])
+
+    def test_post_deadline(self):
+        cases = [({"input": "pass"}, None), ({"input": "pass", "deadline_ms": 1500}, 1.5)]
+        for body, expected in cases:
+            with self.subTest(body=body):
+                before = time.monotonic()
+                result = self.simulate_post(self.PATH, json=body)
+                after = time.monotonic()
+                self.assertEqual(result.status_code, 200)
+
+                _, kwargs = self.mock_nsjail.return_value.python3.call_args
+                if expected is None:
+                    self.assertIsNone(kwargs["deadline"])
+                else:
+                    self.assertGreaterEqual(kwargs["deadline"], before + expected)
+                    self.assertLessEqual(kwargs["deadline"], after + expected)
+
+    def test_post_deadline_capped_by_time_limit(self):
+        before = time.monotonic()
+        self.simulate_post(self.PATH, json={"input": "pass", "deadline_ms": 60_000})
+        _, kwargs = self.mock_nsjail.return_value.python3.call_args
+        self.assertLessEqual(kwargs["deadline"], time.monotonic() + 6)
+        self.assertGreaterEqual(kwargs["deadline"], before + 6)
+
+    def test_post_deadline_exceeded_504(self):
+        self.mock_nsjail.return_value.python3.side_effect = DeadlineExceededError("too late")
+        result = self.simulate_post(self.PATH, json={"input": "pass", "deadline_ms": 1})
+
+        self.assertEqual(result.status_code, 504)
+        self.assertEqual(result.json["title"], "Deadline exceeded")
+
+    def test_post_invalid_deadline_400(self):
+        for deadline in (0, -5, 1.5, "10"):
+            with self.subTest(deadline=deadline):
+                body = {"input": "pass", "deadline_ms": deadline}
+                result = self.simulate_post(self.PATH, json=body)
+                self.assertEqual(result.status_code, 400)
+
+    def test_post_invalid_priority_400(self):
+        result = self.simulate_post(self.PATH, json={"input": "pass", "priority": "urgent"})
+        self.assertEqual(result.status_code, 400)
+
     def test_post_invalid_schema_400(self):
         body = {"stuff": "foo"}
         result = self.simulate_post(self.PATH, json=body)
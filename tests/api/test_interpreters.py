@@ -0,0 +1,51 @@
+from unittest import mock
+
+from tests.api import SnekAPITestCase
+
+from snekbox.interpreters import Interpreter, InterpreterRegistry
+
+
+class TestInterpretersResource(SnekAPITestCase):
+    PATH = "/interpreters"
+
+    def setUp(self):
+        super().setUp()
+        self.registry = mock.create_autospec(InterpreterRegistry, instance=True)
+        self.registry.interpreters = (
+            Interpreter(
+                "3.14", "/snekbin/python/3.14/bin/python", "/real", "3.14.0", "cpython", False, True
+            ),
+        )
+        self.registry.etag = "0123456789abcdef"
+        self.mock_nsjail.return_value.interpreters = self.registry
+
+    def test_get_200(self):
+        result = self.simulate_get(self.PATH)
+
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(result.headers["ETag"], '"0123456789abcdef"')
+        self.assertEqual(
+            result.json,
+            [
+                {
+                    "name": "3.14",
+                    "path": "/snekbin/python/3.14/bin/python",
+                    "version": "3.14.0",
+                    "implementation": "cpython",
+                    "free_threading": False,
+                    "jit": True,
+                }
+            ],
+        )
+
+    def test_get_not_modified_304(self):
+        for etag in ('"0123456789abcdef"', "*"):
+            with self.subTest(etag=etag):
+                result = self.simulate_get(self.PATH, headers={"If-None-Match": etag})
+                self.assertEqual(result.status_code, 304)
+                self.assertEqual(result.content, b"")
+
+    def test_get_stale_etag_200(self):
+        result = self.simulate_get(self.PATH, headers={"If-None-Match": '"fedcba9876543210"'})
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(len(result.json), 1)
@@ -0,0 +1,20 @@
+from tests.api import SnekAPITestCase
+
+
+class TestReadyResource(SnekAPITestCase):
+    PATH = "/ready"
+
+    def test_get_ready_200(self):
+        self.mock_nsjail.return_value.ready = True
+
+        result = self.simulate_get(self.PATH)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(result.json, {"ready": True})
+
+    def test_get_not_ready_503(self):
+        self.mock_nsjail.return_value.ready = False
+
+        result = self.simulate_get(self.PATH)
+        self.assertEqual(result.status_code, 503)
+        self.assertEqual(result.headers["Retry-After"], "1")
+        self.assertEqual(result.json["title"], "Not ready")
@@ -0,0 +1,67 @@
+from unittest import mock
+
+from tests.api import SnekAPITestCase
+
+
+class TestStatsResource(SnekAPITestCase):
+    PATH = "/stats"
+
+    def test_get_200(self):
+        stats = {"capacity": 2, "reserved_interactive": 1, "running": 0, "lanes": {}}
+        counters = {"cancelled": 1}
+        memfs = {"size": 2, "idle": 1, "created": 1, "reused": 0, "discarded": 0}
+        blobs = {"count": 1, "size": 5}
+        downloads = {"count": 2, "size": 7}
+        warmup = {"ready": True, "duration": 0.5, "interpreters": {}}
+        self.mock_nsjail.return_value.scheduler.stats.return_value = stats
+        self.mock_nsjail.return_value.counters.as_dict.return_value = counters
+        self.mock_nsjail.return_value.memfs_pool.stats.return_value = memfs
+        self.mock_nsjail.return_value.blobs.stats.return_value = blobs
+        self.mock_nsjail.return_value.downloads.stats.return_value = downloads
+        self.mock_nsjail.return_value.warmup.stats.return_value = warmup
+
+        result = self.simulate_get(self.PATH)
+        self.assertEqual(result.status_code, 200)
+        expected = {
+            "blobs": blobs,
+            "capacity": None,
+            "downloads": downloads,
+            "jobs": counters,
+            "memfs": memfs,
+            "netns": None,
+            "scheduler": stats,
+            "warmup": warmup,
+        }
+        self.assertEqual(expected, result.json)
+
+    def test_get_capacity(self):
+        capacity = {"cpus": 2.0, "concurrency": 2}
+        self.mock_nsjail.return_value.capacity = mock.Mock(as_dict=capacity)
+        self.mock_nsjail.return_value.scheduler.stats.return_value = {}
+        self.mock_nsjail.return_value.counters.as_dict.return_value = {}
+        self.mock_nsjail.return_value.memfs_pool.stats.return_value = {}
+        self.mock_nsjail.return_value.blobs.stats.return_value = {}
+        self.mock_nsjail.return_value.downloads.stats.return_value = {}
+        self.mock_nsjail.return_value.warmup.stats.return_value = {}
+
+        result = self.simulate_get(self.PATH)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(capacity, result.json["capacity"])
+
+    def test_get_netns(self):
+        netns = {"size": 2, "idle": 2, "created": 2, "reused": 5, "discarded": 0}
+        self.mock_nsjail.return_value.netns_pool = mock.Mock(**{"stats.return_value": netns})
+        self.mock_nsjail.return_value.scheduler.stats.return_value = {}
+        self.mock_nsjail.return_value.counters.as_dict.return_value = {}
+        self.mock_nsjail.return_value.memfs_pool.stats.return_value = {}
+        self.mock_nsjail.return_value.blobs.stats.return_value = {}
+        self.mock_nsjail.return_value.downloads.stats.return_value = {}
+        self.mock_nsjail.return_value.warmup.stats.return_value = {}
+
+        result = self.simulate_get(self.PATH)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(netns, result.json["netns"])
+
+    def test_disallowed_method_405(self):
+        result = self.simulate_post(self.PATH)
+        self.assertEqual(result.status_code, 405)
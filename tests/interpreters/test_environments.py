@@ -0,0 +1,54 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from snekbox.interpreters import Environment, Interpreter, load_environments
+
+
+def interpreter(version: str, free_threading: bool = False) -> Interpreter:
+    return Interpreter(version, "/path", "/real", version, "cpython", free_threading, False)
+
+
+class EnvironmentTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+
+    def make(self, name: str, *sites: str) -> Path:
+        path = self.root / name
+        path.mkdir()
+        for site in sites:
+            (path / "lib" / f"python{site}" / "site-packages").mkdir(parents=True)
+        return path
+
+    def test_load(self):
+        self.make("scientific", "3.13", "3.14", "3.14t")
+        self.make("empty")
+        (self.root / "file").touch()
+
+        environments = load_environments(self.root)
+
+        self.assertEqual(list(environments), ["empty", "scientific"])
+        scientific = environments["scientific"]
+        self.assertEqual(scientific.path, self.root / "scientific")
+        self.assertEqual(scientific.as_dict["sites"], ["3.13", "3.14", "3.14t"])
+        self.assertEqual(environments["empty"].sites, frozenset())
+
+    def test_load_missing_or_disabled(self):
+        self.assertEqual(load_environments(self.root / "missing"), {})
+        self.assertEqual(load_environments(None), {})
+
+    def test_invalid_name_skipped(self):
+        self.make(".hidden", "3.14")
+        with self.assertLogs("snekbox.interpreters.environments", "WARNING"):
+            self.assertEqual(load_environments(self.root), {})
+
+    def test_supports(self):
+        environment = Environment.from_path(self.make("env", "3.14t", "3.13"))
+
+        self.assertTrue(environment.supports(interpreter("3.14.0", free_threading=True)))
+        self.assertTrue(environment.supports(interpreter("3.13.5")))
+        self.assertFalse(environment.supports(interpreter("3.14.0")))
+        self.assertFalse(environment.supports(interpreter("3.13.5", free_threading=True)))
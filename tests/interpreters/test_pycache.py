@@ -0,0 +1,103 @@
+import importlib.util
+import os
+import subprocess
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, mock
+
+from snekbox.interpreters import BytecodeCache
+from snekbox.interpreters.pycache import _source_dirs
+
+
+class BytecodeCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name) / "cache"
+        self.src = Path(directory.name) / "src"
+        (self.src / "pkg").mkdir(parents=True)
+        (self.src / "mod.py").write_text("x = 1")
+        (self.src / "pkg" / "__init__.py").write_text("y = 2")
+
+        self.cache = BytecodeCache(self.root)
+        patcher = mock.patch.object(BytecodeCache, "_import_dirs", return_value=[str(self.src)])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_build(self):
+        self.cache.update([sys.executable])
+
+        directory = self.cache.directory(os.path.realpath(sys.executable))
+        self.assertIsNotNone(directory)
+        self.assertEqual(os.stat(directory).st_mode & 0o777, 0o755)
+        # Compiled under the prefix, rather than next to the sources.
+        with mock.patch.object(sys, "pycache_prefix", str(directory)):
+            self.assertTrue(
+                Path(importlib.util.cache_from_source(str(self.src / "mod.py"))).is_file()
+            )
+        self.assertFalse((self.src / "__pycache__").exists())
+
+    def test_verified_without_rebuild(self):
+        self.cache.update([sys.executable])
+        with mock.patch("subprocess.run") as run:
+            BytecodeCache(self.root).update([sys.executable])
+        run.assert_not_called()
+
+    def test_rebuilt_when_sources_change(self):
+        self.cache.update([sys.executable])
+        (self.src / "new.py").write_text("z = 3")
+
+        cache = BytecodeCache(self.root)
+        with mock.patch("subprocess.run", wraps=subprocess.run) as run:
+            cache.update([sys.executable])
+        run.assert_called_once()
+        with mock.patch.object(
+            sys, "pycache_prefix", str(cache.directory(os.path.realpath(sys.executable)))
+        ):
+            self.assertTrue(
+                Path(importlib.util.cache_from_source(str(self.src / "new.py"))).is_file()
+            )
+        self.assertEqual(
+            [p.name for p in self.root.iterdir() if p.name != ".lock"],
+            [cache.directory(os.path.realpath(sys.executable)).name],
+        )
+
+    def test_failed_interpreter(self):
+        with TemporaryDirectory() as tmp:
+            missing = os.path.join(tmp, "python")
+            self.cache.update([missing])
+            self.assertIsNone(self.cache.directory(missing))
+        self.assertTrue(self.cache.ready)
+
+    def test_start(self):
+        self.assertFalse(self.cache.ready)
+        thread = self.cache.start([sys.executable])
+        self.assertTrue(self.cache.wait(timeout=60))
+        thread.join()
+
+        self.assertTrue(self.cache.ready)
+        self.assertIsNotNone(self.cache.directory(os.path.realpath(sys.executable)))
+
+    def test_source_dirs(self):
+        paths = [
+            str(self.src),
+            str(self.src / "pkg"),
+            "",
+            "relative",
+            "/nonexistent",
+            str(self.src),
+        ]
+        self.assertEqual(_source_dirs(paths), [str(self.src)])
+
+
+class ImportDirsTests(TestCase):
+    def test_user_bases(self):
+        with TemporaryDirectory() as tmp:
+            version = f"python{sys.version_info.major}.{sys.version_info.minor}"
+            site = Path(tmp, "base", "lib", version, "site-packages")
+            site.mkdir(parents=True)
+
+            cache = BytecodeCache(tmp, {"PYTHONUSERBASE": "/nonexistent"}, [Path(tmp, "base")])
+            self.assertIn(str(site), cache._import_dirs(sys.executable))
@@ -0,0 +1,83 @@
+import os
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, mock
+
+from snekbox.interpreters import Interpreter, InterpreterRegistry
+
+
+class InterpreterRegistryTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        self.real_path = os.path.realpath(sys.executable)
+
+        (self.root / "3.11" / "bin").mkdir(parents=True)
+        (self.root / "3.11" / "bin" / "python").symlink_to(sys.executable)
+        (self.root / "default").symlink_to(self.root / "3.11")
+        (self.root / "broken" / "bin").mkdir(parents=True)
+        (self.root / "broken" / "bin" / "python").write_text("#!/bin/false\n")
+        (self.root / "broken" / "bin" / "python").chmod(0o755)
+
+        self.registry = InterpreterRegistry(self.root)
+
+    def test_refresh(self):
+        self.registry.refresh()
+
+        names = [interpreter.name for interpreter in self.registry.interpreters]
+        self.assertEqual(names, ["3.11", "default"])
+        self.assertEqual(self.registry.executables, [self.real_path])
+
+        interpreter = self.registry.interpreters[0]
+        self.assertEqual(interpreter.version, ".".join(map(str, sys.version_info[:3])))
+        self.assertEqual(interpreter.implementation, "cpython")
+        self.assertFalse(interpreter.free_threading)
+        self.assertNotIn("real_path", interpreter.as_dict)
+
+    def test_get(self):
+        self.registry.refresh()
+
+        path = str(self.root / "default" / "bin" / "python")
+        self.assertEqual(self.registry.get(path).name, "default")
+        self.assertEqual(self.registry.get(self.real_path).name, "3.11")
+        self.assertIsNone(self.registry.get(str(self.root / "broken" / "bin" / "python")))
+        self.assertIsNone(self.registry.get("/usr/bin/env"))
+
+    def test_probed_once_per_executable(self):
+        with mock.patch.object(InterpreterRegistry, "_probe", wraps=self.registry._probe) as probe:
+            self.registry.refresh()
+        broken = os.path.realpath(self.root / "broken" / "bin" / "python")
+        self.assertCountEqual(probe.call_args_list, [mock.call(broken), mock.call(self.real_path)])
+
+    def test_select(self):
+        self.registry.refresh()
+        default = str(self.root / "default" / "bin" / "python")
+
+        self.assertEqual(self.registry.select(default).name, "default")
+        self.assertIsNone(self.registry.select(default, free_threading=True))
+
+        interpreters = [
+            Interpreter("3.13t", "/3.13t", "/3.13t", "3.13.5", "cpython", True, False),
+            Interpreter("3.14t", "/3.14t", "/3.14t", "3.14.0rc1", "cpython", True, True),
+        ]
+        by_path = {interpreter.path: interpreter for interpreter in interpreters}
+        with (
+            mock.patch.object(self.registry, "_interpreters", interpreters),
+            mock.patch.object(self.registry, "_by_path", by_path),
+        ):
+            self.assertEqual(self.registry.select(default, free_threading=True).name, "3.14t")
+            self.assertEqual(self.registry.select("/3.13t", free_threading=True).name, "3.13t")
+            self.assertEqual(self.registry.select("/3.13t", jit=True).name, "3.14t")
+
+    def test_etag_changes(self):
+        self.registry.refresh()
+        etag = self.registry.etag
+        self.registry.refresh()
+        self.assertEqual(self.registry.etag, etag)
+
+        (self.root / "default").unlink()
+        self.registry.refresh()
+        self.assertNotEqual(self.registry.etag, etag)
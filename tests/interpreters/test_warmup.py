@@ -0,0 +1,81 @@
+import subprocess
+import sys
+import threading
+from unittest import TestCase, mock
+
+from snekbox.interpreters import Interpreter, Warmup
+from snekbox.interpreters.warmup import _WARMUP_SCRIPT
+from snekbox.result import EvalResult
+
+
+def interpreter(name: str, real_path: str) -> Interpreter:
+    return Interpreter(
+        name, f"/snekbin/python/{name}/bin/python", real_path, "3.14.0", "cpython", False, False
+    )
+
+
+class WarmupTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.evaluate = mock.Mock(return_value=EvalResult(args=[], returncode=0, stdout=""))
+
+    def test_not_ready_until_run(self):
+        warmup = Warmup()
+        self.assertFalse(warmup.ready)
+        self.assertFalse(warmup.wait(0))
+
+        warmup.run(self.evaluate, [])
+        self.assertTrue(warmup.ready)
+
+    def test_skip(self):
+        warmup = Warmup()
+        warmup.skip()
+        self.assertTrue(warmup.ready)
+        self.assertEqual(warmup.stats(), {"ready": True, "duration": None, "interpreters": {}})
+
+    def test_runs_each_executable_twice(self):
+        warmup = Warmup(["numpy", "pandas"])
+        interpreters = [interpreter("3.14", "/real/3.14"), interpreter("default", "/real/3.14")]
+        thread = warmup.start(self.evaluate, interpreters)
+        thread.join()
+
+        self.assertTrue(warmup.ready)
+        self.assertEqual(self.evaluate.call_count, 2)
+        path, args = self.evaluate.call_args.args
+        self.assertEqual(path, "/real/3.14")
+        self.assertEqual(args[0], "-c")
+        self.assertEqual(args[2:], ["numpy", "pandas"])
+
+        stats = warmup.stats()
+        self.assertIsNotNone(stats["duration"])
+        self.assertEqual(stats["interpreters"].keys(), {"3.14", "default"})
+        self.assertEqual(stats["interpreters"]["3.14"], stats["interpreters"]["default"])
+        self.assertEqual(stats["interpreters"]["3.14"]["returncode"], 0)
+
+    def test_waits_for_after(self):
+        started = threading.Event()
+        warmup = Warmup()
+        thread = warmup.start(
+            self.evaluate, [interpreter("3.14", "/real/3.14")], after=started.wait
+        )
+
+        self.assertFalse(warmup.wait(0.1))
+        self.evaluate.assert_not_called()
+        started.set()
+        thread.join()
+
+        self.assertTrue(warmup.ready)
+        self.assertEqual(self.evaluate.call_count, 2)
+
+    def test_ready_after_failure(self):
+        self.evaluate.side_effect = OSError
+        warmup = Warmup()
+        with self.assertLogs("snekbox.interpreters.warmup", "WARNING"):
+            warmup.run(self.evaluate, [interpreter("3.14", "/real/3.14")])
+
+        self.assertTrue(warmup.ready)
+        self.assertIsNone(warmup.stats()["interpreters"]["3.14"]["returncode"])
+
+    def test_script_ignores_missing_modules(self):
+        result = subprocess.run([sys.executable, "-c", _WARMUP_SCRIPT, "json", "missing_module"])
+        self.assertEqual(result.returncode, 0)
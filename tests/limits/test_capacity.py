@@ -0,0 +1,62 @@
+from unittest import TestCase, mock
+
+from snekbox.config_pb2 import NsJailConfig
+from snekbox.limits import capacity
+
+GiB = 1024**3
+MiB = 1024**2
+
+
+@mock.patch("snekbox.limits.capacity.get_memory")
+@mock.patch("snekbox.limits.capacity.get_cpus")
+class EstimateTests(TestCase):
+    def setUp(self):
+        self.config = NsJailConfig(cgroup_mem_max=512 * MiB, cgroup_cpu_ms_per_sec=500)
+
+    def test_limited_by_cpu(self, get_cpus, get_memory):
+        get_cpus.return_value = 2.0
+        get_memory.return_value = (16 * GiB, 16 * GiB)
+
+        result = capacity.estimate(self.config, 2, 0)
+        self.assertEqual(result.cpu_per_job, 0.5)
+        self.assertEqual(result.concurrency, 4)
+
+    def test_limited_by_memory(self, get_cpus, get_memory):
+        get_cpus.return_value = 64.0
+        get_memory.return_value = (4 * GiB, 2 * GiB)
+
+        result = capacity.estimate(self.config, 2, 512 * MiB)
+        self.assertEqual(result.memory_per_job, GiB)
+        self.assertEqual(result.concurrency, 2)
+
+    def test_running_jobs_memory_is_available(self, get_cpus, get_memory):
+        get_cpus.return_value = 64.0
+        get_memory.return_value = (4 * GiB, GiB)
+
+        result = capacity.estimate(self.config, 2, 512 * MiB, running=2)
+        self.assertEqual(result.concurrency, 3)
+
+    def test_at_least_one(self, get_cpus, get_memory):
+        get_cpus.return_value = 0.1
+        get_memory.return_value = (GiB, 0)
+
+        self.assertEqual(capacity.estimate(self.config, 2, 0).concurrency, 1)
+
+    def test_no_cpu_limit_uses_one_cpu_per_job(self, get_cpus, get_memory):
+        get_cpus.return_value = 3.0
+        get_memory.return_value = (16 * GiB, 16 * GiB)
+
+        result = capacity.estimate(NsJailConfig(cgroup_mem_max=512 * MiB), 2, 0)
+        self.assertEqual(result.cpu_per_job, 1.0)
+        self.assertEqual(result.concurrency, 3)
+
+
+class HostTests(TestCase):
+    def test_get_cpus(self):
+        cpus = capacity.get_cpus(NsJailConfig(), 2)
+        self.assertGreater(cpus, 0)
+
+    def test_get_memory(self):
+        limit, available = capacity.get_memory(NsJailConfig(), 2)
+        self.assertGreater(limit, 0)
+        self.assertLessEqual(available, limit)
@@ -0,0 +1,62 @@
+import fcntl
+import os
+import socket
+import subprocess
+from unittest import TestCase
+
+from snekbox.namespaces import NetworkNamespace
+from snekbox.namespaces.netns import _IFREQ, IFF_UP
+
+SIOCSIFFLAGS = 0x8914
+
+
+class NetworkNamespaceTests(TestCase):
+    def setUp(self):
+        self.netns = NetworkNamespace.create()
+        self.addCleanup(self.netns.close)
+
+    def test_created_empty(self):
+        self.assertTrue(self.netns.is_pristine())
+
+    def test_entered(self):
+        host = os.readlink("/proc/thread-self/ns/net")
+        with self.netns.entered():
+            inside = os.readlink("/proc/thread-self/ns/net")
+            self.assertEqual(socket.if_nameindex(), [(1, "lo")])
+        self.assertNotEqual(inside, host)
+        self.assertEqual(os.readlink("/proc/thread-self/ns/net"), host)
+
+    def test_child_process_joins(self):
+        with self.netns.entered():
+            inside = os.readlink("/proc/thread-self/ns/net")
+            result = subprocess.run(
+                ["readlink", "/proc/self/ns/net"], capture_output=True, check=True, text=True
+            )
+        self.assertEqual(result.stdout.strip(), inside)
+
+    def test_socket_not_pristine(self):
+        with self.netns.entered():
+            sock = socket.socket(socket.AF_UNIX)
+        self.addCleanup(sock.close)
+        sock.bind("\0snekbox-test")
+
+        self.assertFalse(self.netns.is_pristine())
+        sock.close()
+        self.assertTrue(self.netns.is_pristine())
+
+    def test_loopback_up_not_pristine(self):
+        with self.netns.entered():
+            # Only the host can do this; a jail has no capabilities over the namespace.
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                fcntl.ioctl(sock, SIOCSIFFLAGS, _IFREQ.pack(b"lo", IFF_UP))
+
+        self.assertFalse(self.netns.is_pristine())
+
+    def test_close(self):
+        fd = self.netns.fd
+        self.netns.close()
+        self.netns.close()
+
+        self.assertEqual(self.netns.fd, -1)
+        with self.assertRaises(OSError):
+            os.fstat(fd)
@@ -0,0 +1,69 @@
+import logging
+import socket
+from unittest import TestCase
+
+from snekbox.namespaces import NetnsPool
+
+
+class NetnsPoolTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        logging.getLogger("snekbox.utils.pool").setLevel(logging.ERROR)
+        self.pool = NetnsPool(size=2)
+        self.addCleanup(self.pool.close)
+
+    def _drain(self):
+        """Wait for the background thread to finish checking and preparing namespaces."""
+        self.pool._executor.submit(lambda: None).result(5)
+
+    def test_namespace_is_reused(self):
+        with self.pool.acquire() as netns:
+            fd = netns.fd
+        self._drain()
+
+        with self.pool.acquire() as netns:
+            self.assertIn(netns.fd, {fd, *(idle.fd for idle in self.pool._idle)})
+        self.assertGreaterEqual(self.pool.counters["reused"], 1)
+
+    def test_next_namespace_prepared(self):
+        with self.pool.acquire():
+            self._drain()
+            self.assertEqual(len(self.pool._idle), 1)
+
+    def test_tampered_namespace_discarded(self):
+        with self.pool.acquire() as netns:
+            with netns.entered():
+                sock = socket.socket(socket.AF_UNIX)
+            self.addCleanup(sock.close)
+            sock.bind("\0snekbox-test")
+        self._drain()
+
+        self.assertEqual(self.pool.counters["discarded"], 1)
+        self.assertEqual(netns.fd, -1)
+        self.assertNotIn(netns, self.pool._idle)
+
+    def test_pool_size_limit(self):
+        with self.pool.acquire(), self.pool.acquire(), self.pool.acquire():
+            pass
+        self._drain()
+
+        self.assertEqual(len(self.pool._idle), 2)
+        self.assertGreaterEqual(self.pool.counters["discarded"], 1)
+
+    def test_disabled(self):
+        pool = NetnsPool(size=0)
+        self.addCleanup(pool.close)
+
+        with pool.acquire() as netns:
+            pass
+        self.assertEqual(netns.fd, -1)
+        self.assertEqual(pool.stats()["idle"], 0)
+
+    def test_close_closes_idle(self):
+        with self.pool.acquire() as netns:
+            pass
+        self._drain()
+        self.pool.close()
+
+        self.assertEqual(netns.fd, -1)
+        self.assertEqual(self.pool.stats()["idle"], 0)
@@ -0,0 +1,19 @@
+"""A snekbox app whose evaluations sleep instead of running NsJail, for end-to-end tests."""
+import time
+
+from snekbox.api import SnekAPI
+from snekbox.nsjail import NsJail
+from snekbox.result import EvalResult
+
+JOB_DURATION = 0.1
+
+
+def _python3(self: NsJail, job: object, py_args: list[str], *args, **kwargs) -> EvalResult:
+    time.sleep(JOB_DURATION)
+    return EvalResult(list(py_args), 0, "")
+
+
+def create_app() -> SnekAPI:
+    """Create an app with a single sandbox slot, whose evaluations take `JOB_DURATION`."""
+    NsJail._python3 = _python3
+    return SnekAPI(max_concurrency=1, reserved_interactive=0)
@@ -0,0 +1,47 @@
+import json
+import tempfile
+import time
+import urllib.request
+from multiprocessing.dummy import Pool
+from pathlib import Path
+from unittest import TestCase
+
+from tests.gunicorn_utils import run_gunicorn
+from tests.scheduling.sleeping_app import JOB_DURATION
+
+BIND = "127.0.0.1:8061"
+BATCH_JOBS = 24
+
+
+def evaluate(priority: str) -> float:
+    """Evaluate a job of `priority` and return the time it took to get a response."""
+    body = json.dumps({"args": ["-c", "pass"], "priority": priority}).encode("utf-8")
+    req = urllib.request.Request(f"http://{BIND}/eval", body)
+    req.add_header("Content-Type", "application/json")
+
+    start = time.monotonic()
+    with urllib.request.urlopen(req, timeout=30) as response:
+        response.read()
+    return time.monotonic() - start
+
+
+class AdmissionTests(TestCase):
+    def test_interactive_overtakes_batch_backlog(self):
+        """An interactive request is served before a backlog of batch requests sent earlier."""
+        # The deployed Gunicorn config, serving an app whose evaluations only sleep.
+        config = Path("config/gunicorn.conf.py").read_text(encoding="utf-8")
+        with tempfile.NamedTemporaryFile("w", suffix=".py") as f:
+            f.write(f"{config}\nbind = {BIND!r}\n")
+            f.write('wsgi_app = "tests.scheduling.sleeping_app:create_app()"\n')
+            f.flush()
+
+            with run_gunicorn(f.name), Pool(BATCH_JOBS) as pool:
+                batch = pool.map_async(evaluate, ["batch"] * BATCH_JOBS)
+                # Let the batch requests queue up for the only slot.
+                time.sleep(JOB_DURATION * 3)
+
+                interactive = evaluate("interactive")
+                batch.get(timeout=60)
+
+        # Behind the whole backlog, it would take BATCH_JOBS * JOB_DURATION.
+        self.assertLess(interactive, JOB_DURATION * 5)
@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+from snekbox.scheduling import TokenBucket
+
+
+class TokenBucketTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = 0.0
+        self.bucket = TokenBucket(10, 2, clock=lambda: self.now)
+
+    def test_invalid_arguments(self):
+        for capacity, rate in ((0, 1), (1, 0), (-1, 1)):
+            with self.subTest(capacity=capacity, rate=rate):
+                with self.assertRaises(ValueError):
+                    TokenBucket(capacity, rate)
+
+    def test_starts_full(self):
+        self.assertEqual(self.bucket.tokens, 10)
+        self.assertTrue(self.bucket.full)
+        self.assertEqual(self.bucket.retry_after(), 0)
+
+    def test_refill_is_capped(self):
+        self.bucket.consume(4)
+        self.now = 1.0
+        self.assertEqual(self.bucket.tokens, 8)
+        self.now = 100.0
+        self.assertEqual(self.bucket.tokens, 10)
+
+    def test_debt_retry_after(self):
+        self.bucket.consume(14)
+        self.assertEqual(self.bucket.tokens, -4)
+        self.assertAlmostEqual(self.bucket.retry_after(), 2, places=2)
+
+        self.now = 2.5
+        self.assertEqual(self.bucket.retry_after(), 0)
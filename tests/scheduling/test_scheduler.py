@@ -0,0 +1,234 @@
+import threading
+import time
+from unittest import TestCase, mock
+
+from snekbox.scheduling import DeadlineExceededError, Priority, QuotaExceededError, Scheduler
+
+
+class SchedulerTests(TestCase):
+    def _start(
+        self,
+        scheduler: Scheduler,
+        priority: Priority,
+        started: list,
+        release: threading.Event,
+        client: str = "test",
+    ):
+        def target():
+            with scheduler.slot(priority, client) as job:
+                started.append(priority if client == "test" else client)
+                release.wait(5)
+                job.cpu_time = 1
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+    def _wait_for(self, predicate, timeout: float = 5):
+        end = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > end:
+                self.fail("Timed out waiting for condition")
+            time.sleep(0.01)
+
+    def test_invalid_arguments(self):
+        cases = [(0, 0), (2, 2), (2, -1)]
+        for capacity, reserved in cases:
+            with self.subTest(capacity=capacity, reserved=reserved):
+                with self.assertRaises(ValueError):
+                    Scheduler(capacity, reserved)
+
+    def test_batch_cannot_use_reserved_slots(self):
+        scheduler = Scheduler(2, reserved_interactive=1)
+        started, release = [], threading.Event()
+
+        threads = [self._start(scheduler, Priority.BATCH, started, release) for _ in range(2)]
+        self._wait_for(lambda: len(started) == 1)
+        self._wait_for(lambda: scheduler.stats()["lanes"]["batch"]["queued"] == 1)
+
+        # The reserved slot is still available for an interactive job.
+        threads.append(self._start(scheduler, Priority.INTERACTIVE, started, release))
+        self._wait_for(lambda: len(started) == 2)
+        self.assertEqual(started, [Priority.BATCH, Priority.INTERACTIVE])
+
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(started), 3)
+
+    def test_resize_starts_queued_jobs(self):
+        scheduler = Scheduler(1)
+        started, release = [], threading.Event()
+
+        threads = [self._start(scheduler, Priority.INTERACTIVE, started, release) for _ in range(2)]
+        self._wait_for(lambda: len(started) == 1)
+        self._wait_for(lambda: scheduler.stats()["lanes"]["interactive"]["queued"] == 1)
+
+        scheduler.resize(2)
+        self._wait_for(lambda: len(started) == 2)
+        self.assertEqual(scheduler.running, 2)
+
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+    def test_resize_keeps_a_batch_slot(self):
+        scheduler = Scheduler(3, reserved_interactive=2)
+
+        scheduler.resize(2)
+        self.assertEqual(scheduler.reserved_interactive, 1)
+
+        scheduler.resize(4)
+        self.assertEqual(scheduler.reserved_interactive, 2)
+
+        with self.assertRaises(ValueError):
+            scheduler.resize(0)
+
+    def test_interactive_starts_before_queued_batch(self):
+        scheduler = Scheduler(1)
+        started, release = [], threading.Event()
+        hold = threading.Event()
+
+        blocker = self._start(scheduler, Priority.INTERACTIVE, [], hold)
+        self._wait_for(lambda: scheduler.stats()["running"] == 1)
+
+        threads = [self._start(scheduler, Priority.BATCH, started, release)]
+        self._wait_for(lambda: scheduler.stats()["lanes"]["batch"]["queued"] == 1)
+        threads.append(self._start(scheduler, Priority.INTERACTIVE, started, release))
+        self._wait_for(lambda: scheduler.stats()["lanes"]["interactive"]["queued"] == 1)
+
+        release.set()
+        hold.set()
+        for thread in (blocker, *threads):
+            thread.join(5)
+        self.assertEqual(started, [Priority.INTERACTIVE, Priority.BATCH])
+
+    def test_stats_records_wait_times(self):
+        scheduler = Scheduler(2, reserved_interactive=1)
+        with scheduler.slot(Priority.BATCH):
+            stats = scheduler.stats()
+            self.assertEqual(stats["running"], 1)
+            self.assertEqual(stats["lanes"]["batch"]["running"], 1)
+
+        stats = scheduler.stats()
+        self.assertEqual(stats["running"], 0)
+        self.assertEqual(stats["lanes"]["batch"]["started"], 1)
+        self.assertEqual(stats["lanes"]["interactive"]["started"], 0)
+        self.assertGreaterEqual(stats["lanes"]["batch"]["wait_time_max"], 0)
+
+    def test_fair_share_between_clients(self):
+        scheduler = Scheduler(1)
+        started, release = [], threading.Event()
+        hold = threading.Event()
+
+        blocker = self._start(scheduler, Priority.INTERACTIVE, [], hold, client="blocker")
+        self._wait_for(lambda: scheduler.stats()["running"] == 1)
+
+        # Client "a" queues two jobs before "b" queues one; "b" still starts second.
+        threads = []
+        for client in ("a", "a", "b"):
+            queued = len(threads)
+            threads.append(self._start(scheduler, Priority.INTERACTIVE, started, release, client))
+            self._wait_for(lambda: scheduler.stats()["lanes"]["interactive"]["queued"] > queued)
+
+        release.set()
+        hold.set()
+        for thread in (blocker, *threads):
+            thread.join(5)
+        self.assertEqual(started, ["a", "b", "a"])
+
+    def test_weighted_fair_share(self):
+        scheduler = Scheduler(1, client_weights={"heavy": 3})
+        started, release = [], threading.Event()
+        hold = threading.Event()
+
+        blocker = self._start(scheduler, Priority.INTERACTIVE, [], hold, client="blocker")
+        self._wait_for(lambda: scheduler.stats()["running"] == 1)
+
+        threads = []
+        for client in ("heavy", "heavy", "heavy", "light", "light"):
+            queued = len(threads)
+            threads.append(self._start(scheduler, Priority.INTERACTIVE, started, release, client))
+            self._wait_for(lambda: scheduler.stats()["lanes"]["interactive"]["queued"] > queued)
+
+        release.set()
+        hold.set()
+        for thread in (blocker, *threads):
+            thread.join(5)
+        self.assertEqual(started, ["heavy", "light", "heavy", "heavy", "light"])
+
+    def test_idle_clients_are_forgotten(self):
+        scheduler = Scheduler(1)
+        with scheduler.slot(client="a") as job:
+            self.assertIn("a", scheduler.stats()["clients"])
+            job.cpu_time = 2
+
+        self.assertEqual(scheduler.stats()["clients"], {})
+
+    def test_clients_forgotten_once_quota_refills(self):
+        scheduler = Scheduler(1, cpu_quota=1, cpu_quota_rate=20)
+        for name in ("a", "b", "c"):
+            with scheduler.slot(client=name) as job:
+                job.cpu_time = 0.5
+        # Their buckets weren't full yet when their jobs finished.
+        self.assertEqual(len(scheduler._clients), 3)
+
+        time.sleep(0.1)
+        self.assertEqual(scheduler.stats()["clients"], {})
+
+    def test_clients_swept_on_admission(self):
+        scheduler = Scheduler(1, cpu_quota=1, cpu_quota_rate=20)
+        with scheduler.slot(client="a") as job:
+            job.cpu_time = 0.5
+        time.sleep(0.1)
+
+        with mock.patch("snekbox.scheduling.scheduler.CLIENT_SWEEP_INTERVAL", 0):
+            with scheduler.slot(client="b"):
+                self.assertEqual(list(scheduler._clients), ["b"])
+
+    def test_quota_exceeded(self):
+        scheduler = Scheduler(2, cpu_quota=1, cpu_quota_rate=0.5)
+        with scheduler.slot(client="a") as job:
+            job.cpu_time = 3
+
+        with self.assertRaises(QuotaExceededError) as cm:
+            with scheduler.slot(client="a"):
+                pass
+        self.assertEqual(cm.exception.client, "a")
+        self.assertGreater(cm.exception.retry_after, 0)
+
+        # Other clients have their own quota.
+        with scheduler.slot(client="b"):
+            pass
+
+        stats = scheduler.stats()["clients"]
+        self.assertEqual(stats["a"]["active"], 0)
+        self.assertEqual(stats["a"]["cpu_time"], 3)
+        self.assertLess(stats["a"]["quota"], 0)
+        self.assertNotIn("b", stats)
+
+    def test_deadline_exceeded_in_queue(self):
+        scheduler = Scheduler(1)
+        release = threading.Event()
+        blocker = self._start(scheduler, Priority.INTERACTIVE, [], release)
+        self._wait_for(lambda: scheduler.stats()["running"] == 1)
+
+        with self.assertRaises(DeadlineExceededError):
+            with scheduler.slot(deadline=time.monotonic() + 0.05):
+                self.fail("The job should not have started")
+
+        stats = scheduler.stats()
+        self.assertEqual(stats["lanes"]["interactive"]["queued"], 0)
+        self.assertNotIn("anonymous", stats["clients"])
+
+        release.set()
+        blocker.join(5)
+
+    def test_deadline_not_exceeded(self):
+        scheduler = Scheduler(1)
+        with scheduler.slot(deadline=time.monotonic() + 5):
+            pass
+
+    def test_invalid_weight(self):
+        with self.assertRaises(ValueError):
+            Scheduler(1, client_weights={"a": 0})
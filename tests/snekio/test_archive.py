@@ -0,0 +1,202 @@
+import io
+import stat
+import struct
+import tarfile
+import zipfile
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, mock
+
+from snekbox.snekio import (
+    ArchiveFormat,
+    FileAttachment,
+    HomeArchive,
+    IllegalPathError,
+    MemFS,
+    ParsingError,
+    write_archive,
+)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.files = {"a.txt": b"hello", "dir/b.bin": bytes(range(256)) * 1000, "empty": b""}
+
+    def attachments(self) -> list[FileAttachment]:
+        return [FileAttachment(path, content) for path, content in self.files.items()]
+
+    def read_tar(self, archive: FileAttachment) -> dict[str, bytes]:
+        with tarfile.open(fileobj=io.BytesIO(archive.content)) as tar:
+            return {member.name: tar.extractfile(member).read() for member in tar}
+
+    def read_zip(self, archive: FileAttachment) -> dict[str, bytes]:
+        with zipfile.ZipFile(io.BytesIO(archive.content)) as zf:
+            return {name: zf.read(name) for name in zf.namelist()}
+
+    def test_formats(self):
+        cases = [
+            (ArchiveFormat.TAR, False, "output.tar", self.read_tar),
+            (ArchiveFormat.TAR, True, "output.tar.gz", self.read_tar),
+            (ArchiveFormat.ZIP, False, "output.zip", self.read_zip),
+            (ArchiveFormat.ZIP, True, "output.zip", self.read_zip),
+        ]
+        for archive_format, compress, name, read in cases:
+            with self.subTest(archive_format=archive_format, compress=compress):
+                archive = write_archive(self.attachments(), archive_format, compress)
+                try:
+                    self.assertEqual(archive.path, name)
+                    self.assertEqual(read(archive), self.files)
+                finally:
+                    archive.close()
+
+    def test_compress(self):
+        for archive_format in ArchiveFormat:
+            with self.subTest(archive_format=archive_format):
+                plain = write_archive(self.attachments(), archive_format)
+                compressed = write_archive(self.attachments(), archive_format, compress=True)
+                self.assertLess(compressed.size, plain.size)
+                plain.close()
+                compressed.close()
+
+    def test_empty(self):
+        for archive_format in ArchiveFormat:
+            with self.subTest(archive_format=archive_format):
+                self.assertIsNone(write_archive([], archive_format))
+
+    def test_mapped_files_closed(self):
+        """Files found while walking should be packed and unmapped one at a time."""
+        with MemFS(10 * 1024 * 1024) as memfs:
+            for path, content in self.files.items():
+                file = memfs.output / path
+                file.parent.mkdir(parents=True, exist_ok=True)
+                file.write_bytes(content)
+
+            packed = []
+
+            def files():
+                for file in memfs.files(None, mapped=True):
+                    if packed:
+                        self.assertTrue(packed[-1]._mapping is None or packed[-1]._mapping.closed)
+                    packed.append(file)
+                    yield file
+
+            archive = write_archive(files(), ArchiveFormat.TAR)
+
+        try:
+            self.assertEqual(self.read_tar(archive), self.files)
+            self.assertEqual(len(packed), 3)
+        finally:
+            archive.close()
+
+
+def make_tar(members: dict[str, bytes | None], mode: str = "w") -> io.BytesIO:
+    """Return a tar of `members`, where a content of None makes a directory."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as tar:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            if content is None:
+                info.type = tarfile.DIRTYPE
+                tar.addfile(info)
+            else:
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+    return buffer
+
+
+class HomeArchiveTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.home = Path(tmp.name)
+        self.members = {"./main.py": b"print(1)", "pkg/": None, "pkg/sub/mod.py": b"x = 1"}
+
+    def make_zip(self) -> io.BytesIO:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for name, content in self.members.items():
+                zf.writestr(name, b"" if content is None else content)
+        return buffer
+
+    def test_extract(self):
+        cases = [
+            (make_tar(self.members), ArchiveFormat.TAR),
+            (make_tar(self.members, "w:gz"), ArchiveFormat.TAR),
+            (self.make_zip(), ArchiveFormat.ZIP),
+        ]
+        for i, (file, archive_format) in enumerate(cases):
+            with self.subTest(archive_format=archive_format):
+                home = self.home / str(i)
+                home.mkdir()
+                archive = HomeArchive(file, archive_format)
+                self.assertEqual(archive.files, 2)
+
+                written = archive.extract_to(home)
+                self.assertEqual(set(written), {home / "main.py", home / "pkg/sub/mod.py"})
+                self.assertEqual((home / "main.py").read_bytes(), b"print(1)")
+                self.assertEqual((home / "pkg/sub/mod.py").read_bytes(), b"x = 1")
+                for path, mtime in written.items():
+                    st = path.stat()
+                    self.assertEqual(stat.S_IMODE(st.st_mode), 0o777)
+                    self.assertEqual(st.st_mtime, mtime)
+
+                archive.close()
+                self.assertTrue(file.closed)
+
+    def test_illegal_paths(self):
+        cases = ["/etc/passwd", "../escape.py", "pkg/../../escape.py", "./"]
+        for name in cases:
+            with self.subTest(name=name), self.assertRaises(IllegalPathError):
+                HomeArchive(make_tar({name: b"x"}), ArchiveFormat.TAR)
+
+        self.members = {"../escape.py": b"x"}
+        with self.assertRaises(IllegalPathError):
+            HomeArchive(self.make_zip(), ArchiveFormat.ZIP)
+
+    def test_links_rejected(self):
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w") as tar:
+            info = tarfile.TarInfo("link")
+            info.type = tarfile.SYMTYPE
+            info.linkname = "/etc/passwd"
+            tar.addfile(info)
+
+        with self.assertRaises(IllegalPathError):
+            HomeArchive(buffer, ArchiveFormat.TAR)
+
+    def test_invalid_archive(self):
+        for archive_format in ArchiveFormat:
+            with self.subTest(archive_format=archive_format), self.assertRaises(ParsingError):
+                HomeArchive(io.BytesIO(b"not an archive" * 100), archive_format)
+
+    def patch_zip(self, offsets: tuple[int, int], value: int) -> io.BytesIO:
+        """Make a zip and set a field at `offsets` in its local and central headers to `value`."""
+        data = bytearray(self.make_zip().getvalue())
+        for signature, offset in zip((b"PK\x03\x04", b"PK\x01\x02"), offsets):
+            start = data.find(signature)
+            while start != -1:
+                struct.pack_into("<H", data, start + offset, value)
+                start = data.find(signature, start + 1)
+        return io.BytesIO(data)
+
+    def test_encrypted_zip(self):
+        self.members = {"main.py": b"print(1)"}
+        file = self.patch_zip((6, 8), 0x1)
+        with self.assertRaisesRegex(ParsingError, "encrypted"):
+            HomeArchive(file, ArchiveFormat.ZIP)
+        self.assertTrue(file.closed)
+
+    def test_unsupported_zip_compression(self):
+        self.members = {"main.py": b"print(1)"}
+        file = self.patch_zip((8, 10), 99)
+        with self.assertRaisesRegex(ParsingError, "unsupported compression method 99"):
+            HomeArchive(file, ArchiveFormat.ZIP)
+        self.assertTrue(file.closed)
+
+    def test_no_host_paths_resolved(self):
+        """Validation should be lexical, so paths are never resolved on the host."""
+        with mock.patch("pathlib.Path.resolve") as resolve:
+            HomeArchive(make_tar(self.members), ArchiveFormat.TAR)
+        resolve.assert_not_called()
@@ -0,0 +1,94 @@
+import hashlib
+import io
+import os
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from snekbox.snekio import BlobStore, BlobTooLargeError
+from snekbox.snekio.store import STALE_UPLOAD_AGE, UPLOAD_PREFIX
+
+
+class BlobStoreTests(TestCase):
+    def setUp(self):
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.store = BlobStore(self.root / "blobs", max_size=10, max_blob_size=6)
+
+    def test_add(self):
+        digest, size = self.store.add(io.BytesIO(b"hello"))
+        self.assertEqual(digest, hashlib.sha256(b"hello").hexdigest())
+        self.assertEqual(size, 5)
+        self.assertIn(digest, self.store)
+        self.assertEqual((self.root / "blobs" / digest).read_bytes(), b"hello")
+
+    def test_add_duplicate(self):
+        self.store.add(io.BytesIO(b"hello"))
+        self.store.add(io.BytesIO(b"hello"))
+
+        self.assertEqual(self.store.stats()["count"], 1)
+        self.assertEqual(self.store.stats()["size"], 5)
+        self.assertEqual(len(list((self.root / "blobs").iterdir())), 1)
+
+    def test_too_large(self):
+        with self.assertRaises(BlobTooLargeError):
+            self.store.add(io.BytesIO(b"1234567"))
+        self.assertEqual(list((self.root / "blobs").iterdir()), [])
+
+    def test_evicts_least_recently_used(self):
+        first, _ = self.store.add(io.BytesIO(b"aaaa"))
+        second, _ = self.store.add(io.BytesIO(b"bbbb"))
+        self.store.open(first, "a").close()
+        third, _ = self.store.add(io.BytesIO(b"cccc"))
+
+        self.assertIn(first, self.store)
+        self.assertNotIn(second, self.store)
+        self.assertIn(third, self.store)
+        self.assertEqual(self.store.stats()["evicted"], 1)
+
+    def test_open_missing(self):
+        with self.assertRaises(KeyError):
+            self.store.open("0" * 64, "a")
+        self.assertEqual(self.store.stats()["misses"], 1)
+
+    def test_evicted_while_open(self):
+        """An open blob should stay readable after it's evicted."""
+        digest, _ = self.store.add(io.BytesIO(b"aaaa"))
+        attachment = self.store.open(digest, "dir/a.txt")
+        self.addCleanup(attachment.close)
+        self.store.add(io.BytesIO(b"bbbbbb"))
+        self.store.add(io.BytesIO(b"cccc"))
+        self.assertNotIn(digest, self.store)
+
+        path = attachment.save_to(self.root / "home")
+        self.assertEqual(path, self.root / "home" / "dir" / "a.txt")
+        self.assertEqual(path.read_bytes(), b"aaaa")
+
+    def test_existing_blobs_kept(self):
+        blobs = self.root / "blobs"
+        old = hashlib.sha256(b"old").hexdigest()
+        (blobs / old).write_bytes(b"old")
+        (blobs / "keep").write_bytes(b"other")
+
+        store = BlobStore(blobs, max_size=10, max_blob_size=6)
+        self.assertIn(old, store)
+        self.assertEqual(store.stats()["size"], 3)
+        self.assertEqual({p.name for p in blobs.iterdir()}, {old, "keep"})
+
+        # Blobs from a previous run are the least recently used.
+        store.add(io.BytesIO(b"aaaaaa"))
+        store.add(io.BytesIO(b"bbbb"))
+        self.assertNotIn(old, store)
+
+    def test_stale_uploads_removed(self):
+        blobs = self.root / "blobs"
+        stale, fresh = blobs / f"{UPLOAD_PREFIX}stale", blobs / f"{UPLOAD_PREFIX}fresh"
+        stale.write_bytes(b"stale")
+        fresh.write_bytes(b"fresh")
+        old = time.time() - STALE_UPLOAD_AGE - 1
+        os.utime(stale, (old, old))
+
+        BlobStore(blobs, max_size=10, max_blob_size=6)
+        self.assertEqual([p.name for p in blobs.iterdir()], [fresh.name])
@@ -0,0 +1,49 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from snekbox.snekio.bundles import Bundle, load_bundles
+
+
+class BundleTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+
+    def test_directory(self):
+        (self.root / "sub").mkdir()
+        (self.root / "a.txt").write_bytes(b"hello")
+        (self.root / "sub" / "b.txt").write_bytes(b"world!")
+
+        bundle = Bundle.from_path("data", self.root)
+        self.assertEqual(bundle.files, 2)
+        self.assertEqual(bundle.size, 11)
+        self.assertEqual(str(bundle.mount_point), "/bundles/data")
+
+    def test_file(self):
+        file = self.root / "words.txt"
+        file.write_bytes(b"hello")
+
+        bundle = Bundle.from_path("words.txt", file)
+        self.assertEqual((bundle.files, bundle.size), (1, 5))
+
+    def test_invalid(self):
+        (self.root / "a:b").mkdir()
+        cases = [
+            ("..", self.root),
+            ("a/b", self.root),
+            ("", self.root),
+            ("data", self.root / "missing"),
+            ("data", self.root / "a:b"),
+        ]
+        for name, path in cases:
+            with self.subTest(name=name, path=path), self.assertRaises(ValueError):
+                Bundle.from_path(name, path)
+
+    def test_load_bundles(self):
+        self.assertEqual(load_bundles(None), {})
+        bundles = load_bundles({"data": self.root})
+        self.assertEqual(list(bundles), ["data"])
+        self.assertEqual(bundles["data"].path, self.root.resolve())
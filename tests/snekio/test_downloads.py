@@ -0,0 +1,108 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, mock
+
+from snekbox.snekio import DownloadStore, FileAttachment
+from snekbox.snekio.store import STALE_UPLOAD_AGE, UPLOAD_PREFIX
+
+
+class DownloadStoreTests(TestCase):
+    def setUp(self):
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.store = DownloadStore(self.root / "downloads", max_size=10, ttl=60)
+        self.addCleanup(self.store.close)
+
+    def test_add(self):
+        download = self.store.add(FileAttachment("dir/plot.png", b"hello"))
+        self.assertEqual(download.sha256, hashlib.sha256(b"hello").hexdigest())
+        self.assertEqual(download.mime_type, "image/png")
+        self.assertEqual(download.size, 5)
+        self.assertEqual((self.root / "downloads" / download.token).read_bytes(), b"hello")
+
+        opened, file = self.store.open(download.token)
+        with file:
+            self.assertEqual(file.read(), b"hello")
+        self.assertEqual(opened, download)
+        self.assertEqual(self.store.stats()["served"], 1)
+
+    def test_unknown_mime_type(self):
+        download = self.store.add(FileAttachment("data", b""))
+        self.assertEqual(download.mime_type, "application/octet-stream")
+
+    def test_too_large(self):
+        download = self.store.add(FileAttachment("a.txt", b"12345678901"))
+        self.assertIsNone(download.token)
+        self.assertEqual(download.size, 11)
+        self.assertEqual(list((self.root / "downloads").iterdir()), [])
+
+    def test_evicts_oldest(self):
+        first = self.store.add(FileAttachment("a", b"aaaa"))
+        second = self.store.add(FileAttachment("b", b"bbbb"))
+        third = self.store.add(FileAttachment("c", b"cccc"))
+
+        with self.assertRaises(KeyError):
+            self.store.open(first.token)
+        self.store.open(second.token)[1].close()
+        self.store.open(third.token)[1].close()
+        stats = self.store.stats()
+        self.assertEqual((stats["count"], stats["size"], stats["evicted"]), (2, 8, 1))
+
+    def test_expires(self):
+        download = self.store.add(FileAttachment("a", b"aaaa"))
+        with mock.patch("time.monotonic", return_value=download.expires):
+            with self.assertRaises(KeyError):
+                self.store.open(download.token)
+            self.assertEqual(self.store.stats()["expired"], 1)
+        self.assertEqual(list((self.root / "downloads").iterdir()), [])
+
+    def test_open_survives_eviction(self):
+        download = self.store.add(FileAttachment("a", b"aaaa"))
+        _, file = self.store.open(download.token)
+        self.store.add(FileAttachment("b", b"b" * 10))
+        with file:
+            self.assertEqual(file.read(), b"aaaa")
+
+    def test_leftovers_indexed(self):
+        downloads = self.root / "downloads"
+        stale, fresh = downloads / f"{UPLOAD_PREFIX}stale", downloads / f"{UPLOAD_PREFIX}fresh"
+        stale.write_bytes(b"stale")
+        fresh.write_bytes(b"fresh")
+        old = time.time() - STALE_UPLOAD_AGE - 1
+        os.utime(stale, (old, old))
+        expired, kept = downloads / ("a" * 32), downloads / ("b" * 32)
+        expired.write_bytes(b"aa")
+        os.utime(expired, (old, old))
+        kept.write_bytes(b"bbbb")
+
+        store = DownloadStore(downloads, max_size=10, ttl=60)
+        self.addCleanup(store.close)
+        stats = store.stats()
+        self.assertEqual((stats["count"], stats["size"], stats["expired"]), (1, 4, 1))
+        self.assertEqual({p.name for p in downloads.iterdir()}, {fresh.name, kept.name})
+        with self.assertRaises(KeyError):
+            store.open(kept.name)
+
+        # Leftovers count towards the size limit and are the first to be evicted.
+        store.add(FileAttachment("a", b"a" * 8))
+        self.assertFalse(kept.exists())
+        self.assertEqual(store.stats()["evicted"], 1)
+
+    def test_purged_periodically(self):
+        patcher = mock.patch("snekbox.snekio.downloads.PURGE_INTERVAL", 0.01)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        store = DownloadStore(self.root / "periodic", max_size=10, ttl=0.05)
+        self.addCleanup(store.close)
+        download = store.add(FileAttachment("a", b"aaaa"))
+
+        path = self.root / "periodic" / download.token
+        deadline = time.monotonic() + 5
+        while path.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(path.exists())
+        self.assertEqual(store.counters["expired"], 1)
@@ -4,7 +4,7 @@ from contextlib import ExitStack
 from unittest import TestCase, mock
 from uuid import uuid4
 
-from snekbox.snekio import MemFS
+from snekbox.snekio import FileAttachment, MemFS
 
 UUID_TEST = uuid4()
 
@@ -63,3 +63,70 @@ class MemFSTests(TestCase):
         with self.assertWarns(ResourceWarning):
             del memfs
         self.assertFalse(path.exists())
+
+    def test_reset(self):
+        """Reset should remove all files and restore the home and output directories."""
+        with MemFS(1024**2, output="home/output") as memfs:
+            (memfs.output / "file.txt").write_text("hello")
+            (memfs.home / "dir").mkdir()
+            (memfs.home / "link").symlink_to("/etc")
+            memfs.output.chmod(0o700)
+            self.assertFalse(memfs.is_pristine())
+
+            memfs.reset()
+            self.assertTrue(memfs.is_pristine())
+            self.assertEqual(list(memfs.output.iterdir()), [])
+
+    def test_reset_deep_tree(self):
+        """Reset shouldn't be limited by the recursion limit."""
+        with MemFS(1024**2) as memfs:
+            path = memfs.home
+            for _ in range(1500):
+                path /= "a"
+                path.mkdir()
+
+            memfs.reset()
+            self.assertTrue(memfs.is_pristine())
+
+    def test_files_limit(self):
+        """No more than `limit` files should be returned."""
+        with MemFS(1024**2) as memfs:
+            for i in range(10):
+                (memfs.output / f"file{i}.txt").write_text(str(i))
+
+            self.assertEqual(len(memfs.files_list(limit=3, pattern="**/*")), 3)
+            self.assertEqual(len(memfs.files_list(limit=None, pattern="**/*")), 10)
+
+    def test_files_output_symlink(self):
+        """An output directory replaced by a symlink shouldn't be followed."""
+        with MemFS(1024**2, output="home/output") as memfs:
+            memfs.output.rmdir()
+            memfs.output.symlink_to("/etc")
+
+            self.assertEqual(memfs.files_list(limit=10, pattern="**/*"), [])
+
+    def test_files_mapped(self):
+        """Mapped files should be closed if listing them fails."""
+        with MemFS(1024**2) as memfs:
+            (memfs.output / "a.txt").write_text("a")
+            (memfs.output / "b.txt").write_text("b")
+
+            files = memfs.files_list(limit=10, pattern="**/*", mapped=True)
+            self.assertEqual([bytes(f.content) for f in files], [b"a", b"b"])
+            for file in files:
+                file.close()
+            self.assertTrue(all(f._mapping.closed for f in files))
+
+            created = []
+            original = FileAttachment.from_path
+
+            def from_path(*args, **kwargs):
+                if created:
+                    raise TimeoutError
+                created.append(original(*args, **kwargs))
+                return created[-1]
+
+            with mock.patch.object(FileAttachment, "from_path", side_effect=from_path):
+                with self.assertRaises(TimeoutError):
+                    memfs.files_list(limit=10, pattern="**/*", mapped=True)
+            self.assertTrue(created[0]._mapping.closed)
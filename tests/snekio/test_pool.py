@@ -0,0 +1,117 @@
+import logging
+import os
+import threading
+from unittest import TestCase
+
+from snekbox.snekio import MemFSLimitError, MemFSPool
+
+
+class MemFSPoolTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        logging.getLogger("snekbox.utils.pool").setLevel(logging.ERROR)
+        self.pool = MemFSPool(1024**2, size=2)
+        self.addCleanup(self.pool.close)
+
+    def _drain(self):
+        """Wait for the background thread to finish recycling and preparing instances."""
+        self.pool._executor.submit(lambda: None).result(5)
+
+    def test_instance_is_reused(self):
+        with self.pool.acquire() as memfs:
+            path = memfs.path
+        self._drain()
+
+        with self.pool.acquire() as memfs:
+            self.assertIn(memfs.path, {path, *(fs.path for fs in self.pool._idle)})
+        self.assertGreaterEqual(self.pool.counters["reused"], 1)
+
+    def test_next_instance_prepared(self):
+        with self.pool.acquire():
+            self._drain()
+            self.assertEqual(len(self.pool._idle), 1)
+
+    def test_no_data_leaks(self):
+        with self.pool.acquire() as memfs:
+            (memfs.home / "secret.txt").write_text("secret")
+            (memfs.home / "dir").mkdir()
+            os.setxattr(memfs.home, "user.secret", b"1")
+            memfs.home.chmod(0o700)
+        self._drain()
+
+        for memfs in self.pool._idle:
+            self.assertTrue(memfs.is_pristine())
+            self.assertEqual(list(memfs.home.iterdir()), [])
+            self.assertEqual(os.listxattr(memfs.home), [])
+
+    def test_tampered_instance_discarded(self):
+        with self.pool.acquire() as memfs:
+            path = memfs.path
+            # An open file survives deletion and still uses space.
+            file = open(memfs.home / "held.txt", "w")
+            self.addCleanup(file.close)
+            file.write("x" * 10_000)
+            file.flush()
+        self._drain()
+
+        self.assertEqual(self.pool.counters["discarded"], 1)
+        self.assertFalse(path.exists())
+        self.assertNotIn(path, [fs.path for fs in self.pool._idle])
+
+    def test_pool_size_limit(self):
+        with self.pool.acquire(), self.pool.acquire(), self.pool.acquire():
+            pass
+        self._drain()
+
+        self.assertEqual(len(self.pool._idle), 2)
+        self.assertGreaterEqual(self.pool.counters["discarded"], 1)
+
+    def test_disabled(self):
+        pool = MemFSPool(1024**2, size=0)
+        self.addCleanup(pool.close)
+
+        with pool.acquire() as memfs:
+            path = memfs.path
+        self.assertFalse(path.exists())
+        self.assertEqual(pool.stats()["idle"], 0)
+
+    def test_close_unmounts_idle(self):
+        with self.pool.acquire() as memfs:
+            path = memfs.path
+        self.pool.close()
+
+        self.assertFalse(path.exists())
+        self.assertEqual(self.pool.stats()["idle"], 0)
+
+    def test_limit(self):
+        pool = MemFSPool(1024**2, size=1, limit=1)
+        self.addCleanup(pool.close)
+
+        with pool.acquire():
+            self.assertEqual(pool.stats()["held"], 1)
+            with self.assertRaises(MemFSLimitError):
+                with pool.acquire(timeout=0.01):
+                    pass
+        self.assertEqual(pool.stats()["held"], 0)
+
+    def test_limit_waits_for_release(self):
+        pool = MemFSPool(1024**2, size=1, limit=1)
+        self.addCleanup(pool.close)
+        held = pool.acquire()
+        held.__enter__()
+
+        timer = threading.Timer(0.05, held.__exit__, (None, None, None))
+        timer.start()
+        self.addCleanup(timer.join)
+        with pool.acquire(timeout=5) as memfs:
+            self.assertTrue(memfs.path.exists())
+
+    def test_raising_limit_wakes_waiters(self):
+        pool = MemFSPool(1024**2, size=1, limit=0)
+        self.addCleanup(pool.close)
+
+        timer = threading.Timer(0.05, setattr, (pool, "limit", 1))
+        timer.start()
+        self.addCleanup(timer.join)
+        with pool.acquire(timeout=5):
+            self.assertEqual(pool.stats()["limit"], 1)
@@ -0,0 +1,92 @@
+import errno
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from textwrap import dedent
+from unittest import TestCase, mock
+
+from google.protobuf import text_format
+
+from snekbox.config_pb2 import NsJailConfig
+from snekbox.snekio import SandboxRoot
+
+
+class SandboxRootTests(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory(prefix="snekbox_tests")
+        self.addCleanup(self.temp_dir.cleanup)
+        temp = Path(self.temp_dir.name)
+
+        self.lib = temp / "lib"
+        self.lib.mkdir()
+        (self.lib / "libc.so").write_text("libc")
+        self.cache = temp / "ld.so.cache"
+        self.cache.write_text("cache")
+
+        self.config = text_format.Parse(
+            dedent(
+                f"""
+                mount {{ src: "{self.lib}" dst: "/usr/lib" is_bind: true rw: false }}
+                mount {{ src: "{self.cache}" dst: "/etc/ld.so.cache" is_bind: true }}
+                mount {{ src: "{temp}/missing" dst: "/lib64" is_bind: true mandatory: false }}
+                mount {{ dst: "/dev/shm" fstype: "tmpfs" rw: true options: "size=1m" }}
+                mount {{ src: "{self.lib}" dst: "/var/lib" is_bind: true rw: true }}
+                """
+            ),
+            NsJailConfig(),
+        )
+        self.root = SandboxRoot(temp / "root", self.config, [("home", True), ("/bundles/a", False)])
+        self.addCleanup(self.root.cleanup)
+
+    def test_split_mounts(self):
+        """Only read-only binds are consolidated, and missing optional ones are dropped."""
+        self.assertEqual(
+            self.root.binds, [(self.lib, Path("/usr/lib")), (self.cache, Path("/etc/ld.so.cache"))]
+        )
+
+        root, *remaining = self.root.config.mount
+        self.assertEqual(
+            (root.src, root.dst, root.is_bind, root.rw), (str(self.root.path), "/", True, False)
+        )
+        self.assertEqual([mount.dst for mount in remaining], ["/dev/shm", "/var/lib"])
+
+    def test_build(self):
+        """The binds and mount points are in a read-only tree, and the config mounts it."""
+        config_path = self.root.build()
+        path = self.root.path
+
+        self.assertTrue(path.is_mount())
+        self.assertEqual((path / "usr/lib/libc.so").read_text(), "libc")
+        self.assertEqual((path / "etc/ld.so.cache").read_text(), "cache")
+        self.assertFalse((path / "lib64").exists())
+        for directory in ("home", "dev/shm", "var/lib"):
+            self.assertTrue((path / directory).is_dir(), directory)
+        self.assertTrue((path / "bundles/a").is_file())
+
+        for target in (path / "new", path / "usr/lib/new"):
+            with self.subTest(target=target), self.assertRaises(OSError) as cm:
+                target.touch()
+            self.assertEqual(cm.exception.errno, errno.EROFS)
+
+        config = text_format.Parse(config_path.read_text(), NsJailConfig())
+        self.assertEqual(config, self.root.config)
+
+    def test_reuse(self):
+        """A tree with the same mounts is reused, and one with different mounts is replaced."""
+        self.root.build()
+
+        same = SandboxRoot(self.root.path, self.config, [("home", True), ("/bundles/a", False)])
+        with mock.patch.object(same, "_mount") as mount:
+            same.build()
+        mount.assert_not_called()
+
+        SandboxRoot(self.root.path, self.config, [("home", True)]).build()
+        self.assertTrue(self.root.path.is_mount())
+        self.assertFalse((self.root.path / "bundles").exists())
+
+    def test_cleanup(self):
+        """The tree is unmounted and the derived config removed."""
+        config_path = self.root.build()
+        self.root.cleanup()
+
+        self.assertFalse(self.root.path.is_mount())
+        self.assertFalse(config_path.exists())
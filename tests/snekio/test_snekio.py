@@ -1,3 +1,6 @@
+from base64 import b64encode
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from unittest import TestCase
 
 from snekbox import snekio
@@ -56,3 +59,33 @@ class SnekIOTests(TestCase):
             with self.assertRaises(error) as cm:
                 FileAttachment.from_dict(data)
             self.assertEqual(str(cm.exception), msg)
+
+    def test_file_from_path_mapped(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp, "dir", "file.bin")
+            path.parent.mkdir()
+            path.write_bytes(b"abcdefgh")
+
+            attachment = FileAttachment.from_path(path, relative_to=Path(tmp), mapped=True)
+            self.assertIsInstance(attachment.content, memoryview)
+            self.assertEqual(attachment, FileAttachment("dir/file.bin", b"abcdefgh"))
+            attachment.close()
+            attachment.close()
+
+            path.write_bytes(b"")
+            empty = FileAttachment.from_path(path, mapped=True)
+            self.assertEqual(empty.content, b"")
+
+    def test_file_iter_base64(self):
+        cases = [b"", b"a", b"ab", b"abc", b"abcd", bytes(range(256)) * 10]
+        for content in cases:
+            for chunk_size in (3, 6, 300):
+                with self.subTest(size=len(content), chunk_size=chunk_size):
+                    attachment = FileAttachment("file", content)
+                    chunks = list(attachment.iter_base64(chunk_size))
+                    self.assertEqual(b"".join(chunks), b64encode(content))
+                    self.assertEqual(len(b"".join(chunks)), attachment.encoded_size)
+                    self.assertTrue(all(len(chunk) <= chunk_size // 3 * 4 for chunk in chunks))
+
+        with self.assertRaises(ValueError):
+            next(FileAttachment("file", b"abc").iter_base64(4))
@@ -0,0 +1,74 @@
+import glob
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, mock
+
+from snekbox.snekio import DepthLimitError, GlobMatcher
+from snekbox.snekio.walk import walk_files
+
+TREE = [
+    "a.txt",
+    "_private.txt",
+    ".hidden",
+    "b/c.py",
+    "b/_d.txt",
+    "b/e/f.txt",
+    "b/e/.g",
+    ".dir/h.txt",
+    "_dir/i.txt",
+    "j/k/l/m.py",
+]
+
+
+class WalkTests(TestCase):
+    def setUp(self):
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        for name in TREE:
+            path = self.root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(name)
+
+    def _walk(self, pattern: str, **kwargs) -> list[str]:
+        return sorted(path for _, path in walk_files(self.root, GlobMatcher(pattern), **kwargs))
+
+    def test_matches_glob(self):
+        """The matcher should select the same files as glob."""
+        patterns = ["**/*", "**/[!_]*", "*", "*.txt", "b/*", "**/*.py", "b/**", "**/e/*", ".*"]
+        for pattern in patterns:
+            with self.subTest(pattern=pattern):
+                expected = sorted(
+                    path
+                    for path in glob.glob(pattern, root_dir=self.root, recursive=True)
+                    if (self.root / path).is_file()
+                )
+                self.assertEqual(self._walk(pattern), expected)
+
+    def test_prunes_directories(self):
+        """Directories which can't contain matches shouldn't be scanned."""
+        with mock.patch("snekbox.snekio.walk.os.scandir", side_effect=os.scandir) as scandir:
+            self.assertEqual(self._walk("j/**/*.py"), ["j/k/l/m.py"])
+
+        scanned = [
+            Path(c.args[0]).relative_to(self.root).as_posix() for c in scandir.call_args_list
+        ]
+        self.assertEqual(sorted(scanned), [".", "j", "j/k", "j/k/l"])
+
+    def test_symlinked_directories_not_followed(self):
+        (self.root / "loop").symlink_to(self.root)
+        (self.root / "link.txt").symlink_to(self.root / "a.txt")
+
+        files = self._walk("**/*")
+        self.assertIn("link.txt", files)
+        self.assertFalse(any(path.startswith("loop/") for path in files))
+
+    def test_depth_limit(self):
+        self.assertEqual(self._walk("**/*.py", max_depth=3), ["b/c.py", "j/k/l/m.py"])
+        with self.assertRaises(DepthLimitError):
+            self._walk("**/*.py", max_depth=2)
+
+    def test_deadline(self):
+        with self.assertRaises(TimeoutError):
+            self._walk("**/*", deadline=0)
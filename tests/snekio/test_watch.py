@@ -0,0 +1,166 @@
+import os
+import queue
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, mock
+
+from snekbox.snekio import FileAttachment, GlobMatcher, MemFS, OutputWatcher
+from snekbox.snekio.watch import Inotify, open_output_file
+
+TIMEOUT = 5
+
+
+class OutputWatcherTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.memfs = MemFS(10 * 1024 * 1024)
+        self.addCleanup(self.memfs.cleanup)
+        self.delivered: queue.SimpleQueue[FileAttachment] = queue.SimpleQueue()
+
+    def watcher(self, pattern: str = "**/[!_]*", **kwargs) -> OutputWatcher:
+        return OutputWatcher(self.memfs, GlobMatcher(pattern), self.delivered.put, None, **kwargs)
+
+    def write(self, path: str, content: bytes) -> Path:
+        file = self.memfs.output / path
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_bytes(content)
+        return file
+
+    def next_file(self) -> FileAttachment:
+        return self.delivered.get(timeout=TIMEOUT)
+
+    def test_delivers_closed_files(self):
+        with self.watcher() as watcher:
+            self.write("a.txt", b"hello")
+            self.assertEqual(self.next_file(), FileAttachment("a.txt", b"hello"))
+
+            (self.memfs.output / "dir").mkdir()
+            time.sleep(0.2)  # Let the new directory be watched.
+            self.write("dir/b.txt", b"nested")
+            self.assertEqual(self.next_file(), FileAttachment("dir/b.txt", b"nested"))
+
+            self.assertEqual(watcher.finish(), [])
+
+    def test_redelivers_changed_files(self):
+        with self.watcher() as watcher:
+            file = self.write("a.txt", b"first")
+            self.assertEqual(self.next_file().content, b"first")
+
+            os.utime(file, (0, 0))
+            file.write_bytes(b"second")
+            self.assertEqual(self.next_file().content, b"second")
+            self.assertEqual(watcher.finish(), [])
+
+    def test_unclosed_files_found_after_exit(self):
+        """Files still open at exit should be the only ones read afterwards."""
+        with self.watcher() as watcher:
+            self.write("done.txt", b"done")
+            self.next_file()
+            with open(self.memfs.output / "open.txt", "wb") as f:
+                f.write(b"partial")
+                f.flush()
+                time.sleep(0.2)
+                with mock.patch.object(self.memfs, "files_list") as files_list:
+                    files = watcher.finish()
+
+            files_list.assert_not_called()
+            self.assertEqual(
+                [(f.path, bytes(f.content)) for f in files], [("open.txt", b"partial")]
+            )
+            for file in files:
+                file.close()
+
+    def test_pattern_and_input_files(self):
+        self.write("input.py", b"print(1)")
+        exclude = {self.memfs.output / "input.py": (self.memfs.output / "input.py").stat().st_mtime}
+        with self.watcher("*.txt", exclude_files=exclude) as watcher:
+            self.write("ignored.py", b"x")
+            os.utime(self.memfs.output / "input.py")
+            self.write("kept.txt", b"y")
+            self.assertEqual(self.next_file().path, "kept.txt")
+            self.assertEqual(watcher.finish(), [])
+        self.assertTrue(self.delivered.empty())
+
+    def test_limit(self):
+        watcher = OutputWatcher(self.memfs, GlobMatcher("**/*"), self.delivered.put, 1)
+        with watcher:
+            self.write("a.txt", b"a")
+            self.next_file()
+            self.write("b.txt", b"b")
+            self.assertEqual(watcher.finish(), [])
+        self.assertTrue(self.delivered.empty())
+
+    def test_rewrites_count_once_towards_limits(self):
+        """A file delivered again should replace its previous version in the limits."""
+        memfs = MemFS(1024**2)
+        self.addCleanup(memfs.cleanup)
+        self.memfs = memfs
+        watcher = OutputWatcher(memfs, GlobMatcher("**/*"), self.delivered.put, 2)
+        with watcher:
+            file = self.write("log.txt", b"")
+            for i in range(1, 5):
+                os.utime(file, (0, 0))
+                file.write_bytes(b"x" * (200 * 1024 * i))
+                self.assertEqual(len(self.next_file().content), 200 * 1024 * i)
+
+            self.write("other.txt", b"other")
+            self.assertEqual(self.next_file(), FileAttachment("other.txt", b"other"))
+            self.write("extra.txt", b"extra")
+            self.assertEqual(watcher.finish(), [])
+        self.assertTrue(self.delivered.empty())
+
+    def test_files_in_new_directories_found_after_exit(self):
+        """Files written before their directory is watched should be found after exit."""
+        add_watch = Inotify.add_watch
+
+        def write_then_watch(inotify: Inotify, path: Path, mask: int) -> int:
+            if path.name == "dir":
+                self.write("dir/a.txt", b"a")
+            return add_watch(inotify, path, mask)
+
+        with mock.patch.object(Inotify, "add_watch", write_then_watch):
+            with self.watcher() as watcher:
+                (self.memfs.output / "dir").mkdir()
+                time.sleep(0.2)
+                files = watcher.finish()
+
+        self.assertTrue(self.delivered.empty())
+        self.assertEqual([f.path for f in files], ["dir/a.txt"])
+        for file in files:
+            file.close()
+
+    def test_overflow_walks_output(self):
+        with self.watcher() as watcher:
+            self.write("a.txt", b"a")
+            self.next_file()
+            watcher._stop()
+            watcher._overflowed = True
+            self.write("b.txt", b"b")
+            files = watcher.finish()
+
+        self.assertEqual([f.path for f in files], ["b.txt"])
+        for file in files:
+            file.close()
+
+
+class OpenOutputFileTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        (self.root / "dir").mkdir()
+        (self.root / "dir/file").write_bytes(b"content")
+
+    def test_regular_file(self):
+        with open_output_file(self.root, "dir/file") as file:
+            self.assertEqual(file.read(), b"content")
+
+    def test_rejected(self):
+        os.symlink(self.root / "dir", self.root / "link")
+        os.symlink(self.root / "dir/file", self.root / "dir/file_link")
+        os.mkfifo(self.root / "fifo")
+        for path in ("link/file", "dir/file_link", "fifo", "dir", "missing"):
+            with self.subTest(path=path):
+                self.assertIsNone(open_output_file(self.root, path))
@@ -0,0 +1,72 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase, mock
+
+from snekbox import host
+from snekbox.nsjail import NsJail
+
+
+class HostTests(TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.config_path = shutil.copy2(host.DEFAULT_CONFIG_PATH, temp_dir.name)
+
+        patcher = mock.patch.dict(host._preloaded, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch("snekbox.host.limits.cgroup.init", return_value=1)
+        self.cgroup_init = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_preloaded_host_is_shared(self):
+        """The host is only initialised once, when it's preloaded."""
+        preloaded = host.preload(self.config_path)
+
+        self.assertIs(host.get(self.config_path), preloaded)
+        self.assertIs(host.get(str(Path(self.config_path).resolve())), preloaded)
+        self.cgroup_init.assert_called_once()
+
+    def test_changed_config(self):
+        """A changed config is initialised again, but not kept in place of the preloaded host."""
+        preloaded = host.preload(self.config_path)
+        with open(self.config_path, "a", encoding="utf-8") as f:
+            f.write("\nrlimit_nofile: 64\n")
+
+        changed = host.get(self.config_path)
+        self.assertIsNot(changed, preloaded)
+        self.assertEqual(changed.config.rlimit_nofile, 64)
+        self.assertIsNot(host.get(self.config_path), changed)
+
+    def test_not_preloaded(self):
+        """Each host is initialised separately if none was preloaded."""
+        self.assertIsNot(host.get(self.config_path), host.get(self.config_path))
+        self.assertEqual(self.cgroup_init.call_count, 2)
+
+    def test_nsjail_args(self):
+        cases = (
+            (1, False, ()),
+            (2, False, ("--use_cgroupv2",)),
+            (
+                2,
+                True,
+                ("--use_cgroupv2", "--cgroup_mem_memsw_max", "0", "--cgroup_mem_swap_max", "-1"),
+            ),
+        )
+        for cgroup_version, ignore_swap_limits, expected in cases:
+            with self.subTest(cgroup_version=cgroup_version, ignore_swap_limits=ignore_swap_limits):
+                self.cgroup_init.return_value = cgroup_version
+                with mock.patch(
+                    "snekbox.host.limits.swap.should_ignore_limit", return_value=ignore_swap_limits
+                ):
+                    self.assertEqual(host.Host.init(self.config_path).nsjail_args, expected)
+
+    def test_nsjail_uses_preloaded_host(self):
+        preloaded = host.preload(self.config_path)
+        nsjail = NsJail(config_path=self.config_path)
+
+        self.assertIs(nsjail.host, preloaded)
+        self.assertIs(nsjail.config, preloaded.config)
+        self.assertIs(nsjail.interpreters, preloaded.interpreters)
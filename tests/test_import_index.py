@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from scripts import import_index
+
+CHECK_FINDER = "import sys; print(any(type(f).__name__ == 'IndexFinder' for f in sys.meta_path))"
+
+
+class ImportIndexTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        self.env = {"PYTHONUSERBASE": str(self.root / "user_base"), "PYTHONDONTWRITEBYTECODE": "1"}
+        self.site = Path(self.python("import site; print(site.getusersitepackages())"))
+        (self.site / "pkg").mkdir(parents=True)
+        (self.site / "pkg" / "__init__.py").write_text("")
+        (self.site / "pkg" / "sub.py").write_text("")
+        (self.site / "mod.py").write_text("")
+        self.python(path=import_index.__file__)
+
+    def python(self, code: str | None = None, path: str | None = None, cwd: Path | None = None):
+        args = [sys.executable, path] if path else [sys.executable, "-c", code]
+        result = subprocess.run(
+            args, env=self.env, cwd=cwd or self.root, capture_output=True, check=True, text=True
+        )
+        return result.stdout.strip()
+
+    def test_finds_modules(self):
+        code = "import pkg.sub, mod, json; print(pkg.sub.__file__, mod.__file__, json.__name__)"
+        self.assertEqual(self.python(CHECK_FINDER), "True")
+        self.assertEqual(
+            self.python(code).split(),
+            [str(self.site / "pkg" / "sub.py"), str(self.site / "mod.py"), "json"],
+        )
+
+    def test_unindexed_entries_shadow(self):
+        """Modules in the script's directory should still take precedence."""
+        home = self.root / "home"
+        home.mkdir()
+        (home / "mod.py").write_text("")
+        self.assertEqual(
+            self.python("import mod; print(mod.__file__)", cwd=home), str(home / "mod.py")
+        )
+
+    def test_invalidated_by_changes(self):
+        (self.site / "new.py").write_text("")
+        self.assertEqual(self.python(CHECK_FINDER), "False")
+        self.assertEqual(self.python("import new; print(new.__name__)"), "new")
+
+        self.python(path=import_index.__file__)
+        self.assertEqual(self.python(CHECK_FINDER), "True")
+
+    def test_index_per_interpreter(self):
+        """Rebuilding should keep the indexes of other interpreters sharing the site-packages."""
+        module = self.site / f"{import_index.MODULE_NAME}.py"
+        indexes = import_index._read_indexes(module)
+        self.assertEqual(list(indexes), [sys.prefix])
+
+        source = module.read_text()
+        module.write_text(source.replace(repr(indexes), repr({**indexes, "/other": {}})))
+        self.python(path=import_index.__file__)
+        self.assertEqual(sorted(import_index._read_indexes(module)), sorted([sys.prefix, "/other"]))
+        self.assertTrue(os.path.isfile(self.site / f"{import_index.MODULE_NAME}.pth"))
@@ -1,16 +1,24 @@
+import contextlib
 import io
 import logging
 import shutil
 import sys
+import tarfile
 import tempfile
+import threading
+import time
 import unittest
 import unittest.mock
 from itertools import product
 from pathlib import Path
 from textwrap import dedent
 
+from snekbox import host
+from snekbox.interpreters import BytecodeCache, Environment, Interpreter
 from snekbox.nsjail import DEFAULT_EXECUTABLE_PATH, NsJail
-from snekbox.snekio import FileAttachment
+from snekbox.result import EvalResult
+from snekbox.scheduling import DeadlineExceededError
+from snekbox.snekio import ArchiveFormat, FileAttachment
 from snekbox.snekio.filesystem import Size
 
 
@@ -41,6 +49,72 @@ class NsJailTests(unittest.TestCase):
                 self.assertEqual(result.stdout, "test\n")
                 self.assertEqual(result.stderr, None)
 
+    def test_duration_and_cpu_time(self):
+        result = self.eval_code("sum(range(10_000_000))")
+
+        self.assertEqual(result.returncode, 0)
+        self.assertGreater(result.cpu_time, 0)
+        self.assertGreater(result.duration, 0)
+
+    def test_cancelled_before_start(self):
+        result = self.nsjail.python3(["-c", "print('test')"], cancelled=lambda: True)
+
+        self.assertEqual(result.returncode, None)
+        self.assertEqual(result.stdout, "Cancelled: the job was cancelled")
+        self.assertEqual(self.nsjail.counters["cancelled"], 1)
+
+    def test_cancelled_while_running_returns_143(self):
+        deadline = time.monotonic() + 0.5
+        start = time.monotonic()
+        result = self.nsjail.python3(
+            ["-c", "while True: pass"], cancelled=lambda: time.monotonic() > deadline
+        )
+
+        self.assertEqual(result.returncode, 143)
+        self.assertLess(time.monotonic() - start, self.nsjail.config.time_limit)
+        self.assertEqual(self.nsjail.counters["cancelled"], 1)
+
+    def test_deadline_returns_137(self):
+        start = time.monotonic()
+        result = self.nsjail.python3(["-c", "while True: pass"], deadline=start + 0.25)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(result.returncode, 137)
+        self.assertLess(elapsed, 1)
+        self.assertEqual(self.nsjail.counters["deadline_killed"], 1)
+
+    def test_deadline_cleans_up_jail(self):
+        marker = "snekbox-deadline-test"
+        code = dedent(
+            f"""
+            import subprocess, sys
+            subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)", "{marker}"])
+            while True: pass
+            """
+        ).strip()
+
+        result = self.eval_file(code, deadline=time.monotonic() + 0.5)
+
+        self.assertEqual(result.returncode, 137)
+        self.assertEqual(self.nsjail.counters["deadline_killed"], 1)
+        for cmdline in Path("/proc").glob("[0-9]*/cmdline"):
+            with self.subTest(cmdline=str(cmdline)), contextlib.suppress(OSError):
+                self.assertNotIn(marker.encode(), cmdline.read_bytes())
+
+        config = self.nsjail.config
+        for parent in (
+            Path(config.cgroupv2_mount),
+            Path(config.cgroup_mem_mount, config.cgroup_mem_parent),
+            Path(config.cgroup_pids_mount, config.cgroup_pids_parent),
+        ):
+            with self.subTest(parent=str(parent)):
+                self.assertEqual(list(parent.glob("NSJAIL.*")), [])
+
+    def test_deadline_passed_before_start(self):
+        with self.assertRaises(DeadlineExceededError):
+            self.nsjail.python3(["-c", "print('test')"], deadline=time.monotonic())
+        self.assertEqual(self.nsjail.counters["expired"], 1)
+
     def test_timeout_returns_137(self):
         code = "while True: pass"
 
@@ -163,6 +237,23 @@ class NsJailTests(unittest.TestCase):
                 self.assertIn("Read-only file system", result.stdout)
                 self.assertEqual(result.stderr, None)
 
+    def test_bundles(self):
+        with tempfile.TemporaryDirectory() as directory:
+            Path(directory, "data.txt").write_text("hello")
+            nsjail = NsJail(memfs_instance_size=2 * Size.MiB, bundles={"data": directory})
+
+            code = dedent(
+                """
+                print(open('/bundles/data/data.txt').read())
+                open('/bundles/data/data.txt', 'w')
+                """
+            ).strip()
+            result = nsjail.python3(["-c", code], bundles=["data"])
+
+        self.assertEqual(result.returncode, 1)
+        self.assertTrue(result.stdout.startswith("hello\n"))
+        self.assertIn("Read-only file system", result.stdout)
+
     def test_write(self):
         code = dedent(
             """
@@ -212,6 +303,48 @@ class NsJailTests(unittest.TestCase):
         self.assertEqual(len(result.files), 1)
         self.assertEqual(result.files[0].content, b"a")
 
+    def test_write_archive(self):
+        code = dedent(
+            """
+            from pathlib import Path
+
+            Path("dir").mkdir()
+            Path("dir/a.txt").write_text("a")
+            Path("b.txt").write_text("b")
+            Path("_hidden.txt").write_text("c")
+            """
+        ).strip()
+
+        result = self.eval_file(code, archive=ArchiveFormat.TAR)
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual([file.path for file in result.files], ["output.tar"])
+        with tarfile.open(fileobj=io.BytesIO(result.files[0].content)) as tar:
+            self.assertEqual(sorted(tar.getnames()), ["b.txt", "dir/a.txt"])
+        result.close()
+
+    def test_on_file(self):
+        """Closed files should be delivered while the code runs, and the rest found after."""
+        code = dedent(
+            """
+            import time
+            from pathlib import Path
+
+            Path("done.txt").write_text("done")
+            time.sleep(0.5)
+            f = open("open.txt", "w")
+            f.write("open")
+            f.flush()
+            """
+        ).strip()
+
+        delivered = []
+        result = self.eval_file(code, on_file=delivered.append)
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(delivered, [FileAttachment("done.txt", b"done")])
+        self.assertEqual([file.path for file in result.files], ["open.txt"])
+        self.assertEqual(bytes(result.files[0].content), b"open")
+        result.close()
+
     def test_forkbomb_resource_unavailable(self):
         # Using the production max PIDs causes processes to be killed due to
         # memory instead of PID allocation exhaustion.
@@ -238,21 +371,13 @@ class NsJailTests(unittest.TestCase):
     def test_file_parsing_timeout(self):
         code = dedent(
             """
-            import os
-            data = "a" * 1024
-            size = 32 * 1024 * 1024
-
-            with open("file", "w") as f:
-                for _ in range(size // 1024):
-                    f.write(data)
-
-            for i in range(100):
-                os.symlink("file", f"file{i}")
+            for i in range(100_000):
+                open(f"_{i}", "w").close()
             """
         ).strip()
-        # A value higher than the actual memory needed is used to avoid the limit
-        # on total file size being reached before the timeout when reading.
-        nsjail = NsJail(memfs_instance_size=128 * Size.MiB, files_timeout=0.1)
+        # Files starting with an underscore don't match the pattern, so the walk goes through
+        # all of them without reaching the files limit.
+        nsjail = NsJail(memfs_instance_size=32 * Size.MiB, files_timeout=0.05)
         result = nsjail.python3(["-c", code])
         self.assertEqual(result.returncode, None)
         self.assertEqual(
@@ -598,6 +723,116 @@ class NsJailArgsTests(unittest.TestCase):
         self.assertEqual(self.nsjail.read_chunk_size, self.read_chunk_size)
 
 
+class NsJailInterpreterArgsTests(unittest.TestCase):
+    def setUp(self):
+        logging.getLogger("snekbox.nsjail").setLevel(logging.WARNING)
+        self.nsjail = NsJail()
+        self.nsjail.parallel_threads = 4
+
+    @staticmethod
+    def interpreter(free_threading: bool = False, jit: bool = False) -> Interpreter:
+        return Interpreter("3.14", "/path", "/real", "3.14.0", "cpython", free_threading, jit)
+
+    def test_gil_interpreter(self):
+        for jit, free_threading in product((None, False, True), repeat=2):
+            with self.subTest(jit=jit, free_threading=free_threading):
+                args = self.nsjail._interpreter_args(self.interpreter(), jit, free_threading)
+                self.assertEqual(args, [])
+
+    def test_jit(self):
+        interpreter = self.interpreter(jit=True)
+        self.assertEqual(self.nsjail._interpreter_args(interpreter, None, None), [])
+        self.assertEqual(
+            self.nsjail._interpreter_args(interpreter, True, None), ["--env", "PYTHON_JIT=1"]
+        )
+        self.assertEqual(
+            self.nsjail._interpreter_args(interpreter, False, None), ["--env", "PYTHON_JIT=0"]
+        )
+
+    def test_free_threading(self):
+        pids_max = self.nsjail.config.cgroup_pids_max
+        for free_threading in (None, True):
+            with self.subTest(free_threading=free_threading):
+                args = self.nsjail._interpreter_args(
+                    self.interpreter(free_threading=True), None, free_threading
+                )
+                self.assertEqual("PYTHON_GIL=0" in args, bool(free_threading))
+                self.assertEqual(args[args.index("--max_cpus") + 1], "4")
+                self.assertEqual(args[args.index("--cgroup_pids_max") + 1], str(pids_max + 4))
+                for name in self.nsjail.thread_vars:
+                    self.assertIn(f"{name}=4", args)
+
+    def test_free_threading_with_gil(self):
+        args = self.nsjail._interpreter_args(self.interpreter(free_threading=True), None, False)
+        self.assertEqual(args, ["--env", "PYTHON_GIL=1"])
+
+    def test_environment(self):
+        environment = Environment("scientific", Path("/environments/scientific"), frozenset())
+        args = self.nsjail._build_args(
+            ["-c", "pass"], [], "log", "/home", DEFAULT_EXECUTABLE_PATH, environment=environment
+        )
+
+        mount = "/environments/scientific:/environments/scientific"
+        self.assertEqual(args[args.index(mount) - 1], "--bindmount_ro")
+        self.assertIn("PYTHONUSERBASE=/environments/scientific", args)
+
+    def test_sandbox_root(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        nsjail = NsJail(sandbox_root=f"{temp_dir.name}/root")
+        self.addCleanup(nsjail.sandbox_root.cleanup)
+        args = nsjail._build_args(["-c", "pass"], [], "log", "/home", DEFAULT_EXECUTABLE_PATH)
+
+        self.assertEqual(args[args.index("--config") + 1], f"{temp_dir.name}/root.cfg")
+        self.assertTrue(Path(temp_dir.name, "root", "home").is_dir())
+
+    def test_netns_pool(self):
+        args = self.nsjail._build_args(["-c", "pass"], [], "log", "/home", DEFAULT_EXECUTABLE_PATH)
+        self.assertIsNone(self.nsjail.netns_pool)
+        self.assertNotIn("--disable_clone_newnet", args)
+
+        nsjail = NsJail(netns_pool_size=1)
+        self.addCleanup(nsjail.netns_pool.close)
+        args = nsjail._build_args(["-c", "pass"], [], "log", "/home", DEFAULT_EXECUTABLE_PATH)
+        self.assertIn("--disable_clone_newnet", args)
+
+    def test_thread_vars(self):
+        self.assertIn("OMP_NUM_THREADS", self.nsjail.thread_vars)
+        self.assertNotIn("PYTHONUSERBASE", self.nsjail.thread_vars)
+
+
+class NsJailReadyTests(unittest.TestCase):
+    def setUp(self):
+        for patcher in (
+            unittest.mock.patch("snekbox.host.limits.cgroup.init", return_value=1),
+            unittest.mock.patch.dict(host._preloaded, clear=True),
+            unittest.mock.patch.object(NsJail, "_warmup_eval", return_value=EvalResult([], 0, "")),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_ready_once_bytecode_built(self):
+        """The bytecode is built in the background, and then the interpreters are warmed up."""
+        built = threading.Event()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+
+        with unittest.mock.patch.object(
+            BytecodeCache, "_update_all", side_effect=lambda _: built.wait(5)
+        ):
+            nsjail = NsJail(pycache_path=temp_dir.name, warmup=True)
+            self.assertFalse(nsjail.ready)
+            self.assertFalse(nsjail.warmup.wait(0.1))
+
+            built.set()
+            self.assertTrue(nsjail.warmup.wait(5))
+
+        self.assertTrue(nsjail.ready)
+
+    def test_ready_without_bytecode(self):
+        self.assertTrue(NsJail().ready)
+
+
 class NsJailCgroupTests(unittest.TestCase):
     # This should still pass for v2, even if this test isn't relevant.
     def test_cgroupv1(self):
@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+from snekbox.utils.pool import Pool
+
+
+class Counter:
+    def __init__(self):
+        self.closed = False
+
+
+class CounterPool(Pool[Counter]):
+    def __init__(self, size: int = 1):
+        super().__init__(size, thread_name_prefix="counter-pool")
+
+    def _new(self) -> Counter:
+        return Counter()
+
+    def _reset(self, item: Counter) -> bool:
+        return not item.closed
+
+    def _close(self, item: Counter) -> None:
+        item.closed = True
+
+
+class PoolTests(TestCase):
+    def test_missing_hook_fails_on_creation(self):
+        class IncompletePool(Pool[Counter]):
+            def _new(self) -> Counter:
+                return Counter()
+
+        with self.assertRaises(TypeError):
+            IncompletePool(1, thread_name_prefix="incomplete")
+
+    def test_resource_is_reused(self):
+        pool = CounterPool()
+        self.addCleanup(pool.close)
+
+        with pool.acquire():
+            pass
+        pool._executor.submit(lambda: None).result(5)
+        with pool.acquire() as item:
+            self.assertFalse(item.closed)
+        self.assertEqual(pool.counters["reused"], 1)